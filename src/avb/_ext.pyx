@@ -1,6 +1,11 @@
 # cython: language_level=3, distutils: language = c++, boundscheck=False, profile=False
 
 from libcpp.vector cimport vector
+from libc.string cimport memcpy
+from cpython cimport array
+from cpython.ref cimport PyObject
+from cpython.dict cimport PyDict_GetItem
+from cpython.list cimport PyList_GET_ITEM, PyList_GET_SIZE
 cimport cython
 
 IF UNAME_SYSNAME == "Windows":
@@ -17,19 +22,22 @@ IF UNAME_SYSNAME == "Windows":
         ctypedef unsigned long long int uint64_t
         ctypedef   signed long long int int64_t
 ELSE:
-    from libc.stdint cimport (uint8_t, int16_t, uint32_t, int32_t, uint64_t, int64_t)
+    from libc.stdint cimport (uint8_t, uint16_t, int16_t, uint32_t, int32_t, uint64_t, int64_t)
 
 from datetime import datetime
+from functools import partial
 import uuid
 
 from .utils import AVBObjectRef
 from . import utils
 from .mobid import MobID
+from .ioctx import AVBIOContext, exp10_pretty
 from . import core
 
 cdef extern from "" namespace "Properties":
     struct ChildData:
         const char *name
+        PropertyType type
         vector[Properties] data
 
 cdef extern from "_ext_core.cpp" nogil:
@@ -41,6 +49,15 @@ cdef extern from "_ext_core.cpp" nogil:
         TRKG,
         TRACK,
         PARAM,
+        CONTROL_POINT,
+        CONTROL_POINT_PROPERTY,
+        BIN_ITEM,
+        SIFT_ITEM,
+        ASPI_PLUGIN,
+        ASPI_PLUGIN_CHUNK,
+        EQUALIZER_BAND,
+        DICT,
+        LIST,
 
     cdef enum AttrType:
         INT_ATTR,
@@ -48,6 +65,18 @@ cdef extern from "_ext_core.cpp" nogil:
         OBJ_ATTR,
         BOB_ATTR,
 
+    cdef enum:
+        TRACK_LABEL_FLAG
+        TRACK_ATTRIBUTES_FLAG
+        TRACK_COMPONENT_FLAG
+        TRACK_FILLER_PROXY_FLAG
+        TRACK_BOB_DATA_FLAG
+        TRACK_CONTROL_CODE_FLAG
+        TRACK_CONTROL_SUB_CODE_FLAG
+        TRACK_START_POS_FLAG
+        TRACK_READ_ONLY_FLAG
+        TRACK_SESSION_ATTR_FLAG
+
     cdef enum ControlPointType:
         ParamControlPointType,
 
@@ -67,6 +96,7 @@ cdef extern from "_ext_core.cpp" nogil:
 
     cdef struct IntArrayData:
         const char *name
+        int stride
         vector[int64_t] data
 
     cdef struct DoubleData:
@@ -121,6 +151,7 @@ cdef extern from "_ext_core.cpp" nogil:
         const uint8_t *ptr
         const uint8_t *end
         const char *error_message
+        bint big_endian
 
     cdef struct Properties:
         PropertyType type
@@ -137,6 +168,16 @@ cdef extern from "_ext_core.cpp" nogil:
         vector[ControlPointData] control_points
         vector[IntArrayData] arrays
         vector[BytesData] bytearrays
+        vector[const char *] order
+
+    cdef struct CompositionSummary:
+        vector[uint8_t] name
+        int32_t length
+        uint32_t last_modified
+        uint8_t mob_type_id
+        int32_t usage_code
+        bint has_mob_id
+        uint8_t mob_id[32]
 
     cdef int read_attributes(Buffer *f, vector[AttrData] &d) except+
     cdef int read_comp(Buffer *f, Properties *p) except+
@@ -149,10 +190,61 @@ cdef extern from "_ext_core.cpp" nogil:
     cdef int read_trackeffect(Buffer *f, Properties *p) except+
     cdef int read_selector(Buffer *f, Properties *p) except+
     cdef int read_composition(Buffer *f, Properties *p) except+
+    cdef int read_composition_summary(Buffer *f, CompositionSummary *c) except+
     cdef int read_media_descriptor(Buffer *f, Properties *p) except+
     cdef int read_did_descriptor(Buffer *f, Properties *p) except+
     cdef int read_cdci_descriptor(Buffer *f, Properties *p) except+
     cdef int read_effectparamlist(Buffer *f, Properties *p) except+
+    cdef int read_parameterlist(Buffer *f, Properties *p) except+
+    cdef int read_timecrumblist(Buffer *f, Properties *p) except+
+    cdef int read_timecode(Buffer *f, Properties *p) except+
+    cdef int read_edgecode(Buffer *f, Properties *p) except+
+    cdef int read_controlclip(Buffer *f, Properties *p) except+
+    cdef int read_trackgroup_only(Buffer *f, Properties *p) except+
+    cdef int read_panvolume(Buffer *f, Properties *p) except+
+    cdef int read_audiosuite(Buffer *f, Properties *p) except+
+    cdef int read_equalizer(Buffer *f, Properties *p) except+
+    cdef int read_capturemask(Buffer *f, Properties *p) except+
+    cdef int read_strobe(Buffer *f, Properties *p) except+
+    cdef int read_motioneffect(Buffer *f, Properties *p) except+
+    cdef int read_repeat(Buffer *f, Properties *p) except+
+    cdef int read_essencegroup(Buffer *f, Properties *p) except+
+    cdef int read_transitioneffect(Buffer *f, Properties *p) except+
+    cdef int read_binviewsetting(Buffer *f, Properties *p) except+
+    cdef int read_bin(Buffer *f, Properties *p) except+
+    cdef int read_binfirst(Buffer *f, Properties *p) except+
+    cdef int read_tape_descriptor(Buffer *f, Properties *p) except+
+    cdef int read_empty_media_descriptor(Buffer *f, Properties *p) except+
+    cdef int read_media_file_descriptor_only(Buffer *f, Properties *p) except+
+    cdef int read_multi_descriptor(Buffer *f, Properties *p) except+
+    cdef int read_wave_descriptor(Buffer *f, Properties *p) except+
+    cdef int read_aifc_descriptor(Buffer *f, Properties *p) except+
+    cdef int read_pcma_descriptor(Buffer *f, Properties *p) except+
+    cdef int read_mpga_descriptor(Buffer *f, Properties *p) except+
+    cdef int read_mpgi_descriptor(Buffer *f, Properties *p) except+
+    cdef int read_jpeg_descriptor(Buffer *f, Properties *p) except+
+    cdef int read_rgba_descriptor(Buffer *f, Properties *p) except+
+    cdef int read_data_descriptor_only(Buffer *f, Properties *p) except+
+    cdef int read_ancdata_descriptor(Buffer *f, Properties *p) except+
+    cdef int read_file_locator(Buffer *f, Properties *p) except+
+    cdef int read_url_locator(Buffer *f, Properties *p) except+
+    cdef int read_msm_locator(Buffer *f, Properties *p) except+
+    cdef int read_graphic_effect(Buffer *f, Properties *p) except+
+    cdef int read_shapelist(Buffer *f, Properties *p) except+
+    cdef int read_colorcorrection(Buffer *f, Properties *p) except+
+    cdef int read_cfuserparam(Buffer *f, Properties *p) except+
+    cdef int read_position_only(Buffer *f, Properties *p) except+
+    cdef int read_bob_position_only(Buffer *f, Properties *p) except+
+    cdef int read_did_position_only(Buffer *f, Properties *p) except+
+    cdef int read_mpg_position(Buffer *f, Properties *p) except+
+    cdef int read_binref(Buffer *f, Properties *p) except+
+    cdef int read_mobref(Buffer *f, Properties *p) except+
+    cdef int read_marker(Buffer *f, Properties *p) except+
+    cdef int read_tracker_manager(Buffer *f, Properties *p) except+
+    cdef int read_tracker_data_slot(Buffer *f, Properties *p) except+
+    cdef int read_tracker_parameter_slot(Buffer *f, Properties *p) except+
+    cdef int read_tracker_data(Buffer *f, Properties *p) except+
+    cdef int read_tracker_parameter(Buffer *f, Properties *p) except+
 
 cdef class AVBPropertyData(dict):
 
@@ -303,7 +395,10 @@ cdef void strings2dict(dict d, Properties *p):
 
         if data_size > 0:
             ptr = <const char *>&item.data[0]
-            d[item.name.decode('utf-8')] = ptr[:data_size].decode("macroman")
+            if item.type == UTF8:
+                d[item.name.decode('utf-8')] = ptr[:data_size].decode("utf-8")
+            else:
+                d[item.name.decode('utf-8')] = ptr[:data_size].decode("macroman")
         else:
             d[item.name.decode('utf-8')] = u""
 
@@ -320,10 +415,31 @@ cdef void children2dict(object root, dict d, Properties *p):
         for child_properties in item.data:
             pdata = process_poperties(root, &child_properties)
 
+            if child_properties.type == DICT:
+                plist.append(dict(pdata))
+                continue
+            elif child_properties.type == LIST:
+                plist.append(list(pdata.values()))
+                continue
+
             if child_properties.type == TRACK:
                 obj_class = utils.AVBClassName_dict['Track']
             elif child_properties.type == PARAM:
                 obj_class = utils.AVBClassName_dict['EffectParam']
+            elif child_properties.type == CONTROL_POINT:
+                obj_class = utils.AVBClassName_dict['ControlPoint']
+            elif child_properties.type == CONTROL_POINT_PROPERTY:
+                obj_class = utils.AVBClassName_dict['ControlPointProperty']
+            elif child_properties.type == BIN_ITEM:
+                obj_class = utils.AVBClassName_dict['BinItem']
+            elif child_properties.type == SIFT_ITEM:
+                obj_class = utils.AVBClassName_dict['SiftItem']
+            elif child_properties.type == ASPI_PLUGIN:
+                obj_class = utils.AVBClassName_dict['ASPIPlugin']
+            elif child_properties.type == ASPI_PLUGIN_CHUNK:
+                obj_class = utils.AVBClassName_dict['ASPIPluginChunk']
+            elif child_properties.type == EQUALIZER_BAND:
+                obj_class = utils.AVBClassName_dict['EqualizerBand']
 
             object_instance = obj_class.__new__(obj_class, root=root)
             object_instance.property_data = pdata
@@ -333,15 +449,13 @@ cdef void children2dict(object root, dict d, Properties *p):
 
 cdef void int_array2dict(dict d, Properties *p):
     cdef IntArrayData item
+    cdef list values
+    cdef int i
     for item in p.arrays:
-        name = item.name.decode('utf-8')
-        if name in ('valid_box', 'essence_box', 'source_box', 'framing_box'):
-            d[name] = [ [item.data[0], item.data[1]],
-                        [item.data[2], item.data[3]],
-                        [item.data[4], item.data[5]],
-                        [item.data[6], item.data[7]],]
-        else:
-            d[name] = item.data
+        values = item.data
+        if item.stride > 1:
+            values = [values[i:i+item.stride] for i in range(0, len(values), item.stride)]
+        d[item.name.decode('utf-8')] = values
 
 cdef void bytearray2dict(dict d, Properties *p):
     cdef BytesData item
@@ -355,8 +469,21 @@ cdef void bytearray2dict(dict d, Properties *p):
         else:
             d[item.name.decode('utf-8')] = bytearray()
 
+# property names by the address of their C string
+cdef dict property_names = {}
+
 cdef dict process_poperties(object root, Properties *p):
     cdef dict result = AVBPropertyData()
+    cdef const char *name
+
+    # the values are added grouped by type below, keys added first keep the
+    # read order, which is the order python reads and walk_references use
+    for name in p.order:
+        key = property_names.get(<size_t>name, None)
+        if key is None:
+            key = name.decode('utf-8')
+            property_names[<size_t>name] = key
+        result[key] = None
 
     if p.refs.size():
         refs2dict(root, result, p)
@@ -388,12 +515,13 @@ cdef dict process_poperties(object root, Properties *p):
     return result
 
 
-def read_attr_data(root, object_instance, const unsigned char[:] data):
+def read_attr_data(root, object_instance, const unsigned char[:] data, bint big_endian=False):
     cdef Buffer buf
     buf.root = &data[0]
     buf.ptr =  &data[0]
     buf.end = &data[-1]
     buf.error_message = ""
+    buf.big_endian = big_endian
 
     cdef AttrData item
     cdef vector[AttrData] d
@@ -453,12 +581,13 @@ def read_attr_data(root, object_instance, const unsigned char[:] data):
 #     print("children",       p.children.size())
 #     print("control_points", p.control_points.size())
 
-def read_sequence_data(root, object_instance, const unsigned char[:] data):
+def read_sequence_data(root, object_instance, const unsigned char[:] data, bint big_endian=False):
     cdef Buffer buf
     buf.root = &data[0]
     buf.ptr =  &data[0]
     buf.end = &data[-1]
     buf.error_message = ""
+    buf.big_endian = big_endian
 
     cdef Properties p
     cdef int ret
@@ -472,12 +601,13 @@ def read_sequence_data(root, object_instance, const unsigned char[:] data):
 
     object_instance.property_data = result
 
-def read_sourceclip_data(root, object_instance, const unsigned char[:] data):
+def read_sourceclip_data(root, object_instance, const unsigned char[:] data, bint big_endian=False):
     cdef Buffer buf
     buf.root = &data[0]
     buf.ptr =  &data[0]
     buf.end = &data[-1]
     buf.error_message = ""
+    buf.big_endian = big_endian
 
     cdef Properties p
     cdef int ret
@@ -491,12 +621,13 @@ def read_sourceclip_data(root, object_instance, const unsigned char[:] data):
 
     object_instance.property_data = result
 
-def read_paramclip_data(root, object_instance, const unsigned char[:] data):
+def read_paramclip_data(root, object_instance, const unsigned char[:] data, bint big_endian=False):
     cdef Buffer buf
     buf.root = &data[0]
     buf.ptr =  &data[0]
     buf.end = &data[-1]
     buf.error_message = ""
+    buf.big_endian = big_endian
 
     cdef Properties p
     cdef int ret
@@ -513,12 +644,13 @@ def read_paramclip_data(root, object_instance, const unsigned char[:] data):
 
     object_instance.property_data = result
 
-def read_paramitem_data(root, object_instance, const unsigned char[:] data):
+def read_paramitem_data(root, object_instance, const unsigned char[:] data, bint big_endian=False):
     cdef Buffer buf
     buf.root = &data[0]
     buf.ptr =  &data[0]
     buf.end = &data[-1]
     buf.error_message = ""
+    buf.big_endian = big_endian
 
     cdef Properties p
     cdef int ret
@@ -533,12 +665,13 @@ def read_paramitem_data(root, object_instance, const unsigned char[:] data):
 
     object_instance.property_data = result
 
-def read_trackref_data(root, object_instance, const unsigned char[:] data):
+def read_trackref_data(root, object_instance, const unsigned char[:] data, bint big_endian=False):
     cdef Buffer buf
     buf.root = &data[0]
     buf.ptr =  &data[0]
     buf.end = &data[-1]
     buf.error_message = ""
+    buf.big_endian = big_endian
 
     cdef Properties p
     cdef int ret
@@ -552,12 +685,13 @@ def read_trackref_data(root, object_instance, const unsigned char[:] data):
 
     object_instance.property_data = result
 
-def read_filler_data(root, object_instance, const unsigned char[:] data):
+def read_filler_data(root, object_instance, const unsigned char[:] data, bint big_endian=False):
     cdef Buffer buf
     buf.root = &data[0]
     buf.ptr =  &data[0]
     buf.end = &data[-1]
     buf.error_message = ""
+    buf.big_endian = big_endian
 
     cdef Properties p
     cdef int ret
@@ -571,12 +705,13 @@ def read_filler_data(root, object_instance, const unsigned char[:] data):
 
     object_instance.property_data = result
 
-def reads_selector_data(root, object_instance, const unsigned char[:] data):
+def reads_selector_data(root, object_instance, const unsigned char[:] data, bint big_endian=False):
     cdef Buffer buf
     buf.root = &data[0]
     buf.ptr =  &data[0]
     buf.end = &data[-1]
     buf.error_message = ""
+    buf.big_endian = big_endian
 
     cdef Properties p
     cdef int ret
@@ -590,12 +725,13 @@ def reads_selector_data(root, object_instance, const unsigned char[:] data):
 
     object_instance.property_data = result
 
-def read_composition_data(root, object_instance, const unsigned char[:] data):
+def read_composition_data(root, object_instance, const unsigned char[:] data, bint big_endian=False):
     cdef Buffer buf
     buf.root = &data[0]
     buf.ptr =  &data[0]
     buf.end = &data[-1]
     buf.error_message = ""
+    buf.big_endian = big_endian
 
     cdef Properties p
     cdef int ret
@@ -613,12 +749,107 @@ def read_composition_data(root, object_instance, const unsigned char[:] data):
 
     object_instance.property_data = result
 
-def read_media_descriptor_data(root, object_instance, const unsigned char[:] data):
+def read_composition_summaries(const unsigned char[:] data, Py_ssize_t count, bint big_endian=False):
+    """
+    Reads name, mob_type_id, usage_code, mob_id, last_modified and length of
+    count neighbouring CMPO chunks, headers included, at the start of data.
+    Returns a list with a tuple of them per chunk.
+    """
+    cdef vector[CompositionSummary] summaries
+    cdef Py_ssize_t end = data.shape[0]
+    cdef Py_ssize_t offset = 0
+    cdef Py_ssize_t i = 0
+    cdef Py_ssize_t j
+    cdef const unsigned char *ptr
+    cdef uint32_t size
+    cdef Buffer buf
+    cdef int ret = 0
+
+    buf.error_message = ""
+    buf.big_endian = big_endian
+
+    with nogil:
+        summaries.resize(count)
+        while i < count:
+            if offset + 8 > end:
+                buf.error_message = "chunk header past end of data"
+                ret = -1
+                break
+
+            ptr = &data[offset]
+            if big_endian:
+                size = <uint32_t>ptr[4] << 24 | ptr[5] << 16 | ptr[6] << 8 | ptr[7]
+            else:
+                size = ptr[4] | ptr[5] << 8 | ptr[6] << 16 | <uint32_t>ptr[7] << 24
+
+            if size == 0 or offset + 8 + size > end:
+                buf.error_message = "chunk data past end of data"
+                ret = -1
+                break
+
+            buf.root = ptr + 8
+            buf.ptr = ptr + 8
+            buf.end = ptr + 8 + size - 1
+            ret = read_composition_summary(&buf, &summaries[i])
+            if ret < 0:
+                break
+
+            if buf.ptr != buf.end + 1:
+                buf.error_message = "chunk data left after summary"
+                ret = -1
+                break
+
+            offset += 8 + size
+            i += 1
+
+    if ret < 0:
+        raise ValueError("Error reading CMPO %d: %s" % (i, buf.error_message.decode("utf-8")))
+
+    cdef list result = []
+    cdef CompositionSummary *c
+    cdef const char *name_ptr
+    cdef Py_ssize_t name_start
+    cdef Py_ssize_t name_end
+    cdef bint ascii
+    for i in range(count):
+        c = &summaries[i]
+        name = None
+        name_start = 0
+        name_end = c.name.size()
+        while name_start < name_end and c.name[name_start] == 0:
+            name_start += 1
+        while name_end > name_start and c.name[name_end - 1] == 0:
+            name_end -= 1
+
+        if name_end > name_start:
+            name_ptr = <const char *>&c.name[0]
+            # macroman matches ascii below 0x80, and ascii decodes much faster
+            ascii = True
+            for j in range(name_start, name_end):
+                if c.name[j] >= 0x80:
+                    ascii = False
+                    break
+            if ascii:
+                name = name_ptr[name_start:name_end].decode("ascii")
+            else:
+                name = name_ptr[name_start:name_end].decode("macroman")
+
+        mob_id = None
+        if c.has_mob_id:
+            mob_id = MobID(bytes_le=(<const char *>c.mob_id)[:32])
+
+        result.append((name, c.mob_type_id, c.usage_code, mob_id,
+                       datetime.fromtimestamp(c.last_modified), c.length))
+
+    return result
+
+def read_media_descriptor_data(root, object_instance, const unsigned char[:] data, bint big_endian=False):
     cdef Buffer buf
     buf.root = &data[0]
     buf.ptr =  &data[0]
     buf.end = &data[-1]
     buf.error_message = ""
+    buf.big_endian = big_endian
 
     cdef Properties p
     cdef int ret
@@ -633,12 +864,13 @@ def read_media_descriptor_data(root, object_instance, const unsigned char[:] dat
 
     object_instance.property_data = result
 
-def read_did_descriptor_data(root, object_instance, const unsigned char[:] data):
+def read_did_descriptor_data(root, object_instance, const unsigned char[:] data, bint big_endian=False):
     cdef Buffer buf
     buf.root = &data[0]
     buf.ptr =  &data[0]
     buf.end = &data[-1]
     buf.error_message = ""
+    buf.big_endian = big_endian
 
     cdef Properties p
     cdef int ret
@@ -654,12 +886,13 @@ def read_did_descriptor_data(root, object_instance, const unsigned char[:] data)
     object_instance.property_data = result
 
 
-def read_cdci_descriptor_data(root, object_instance, const unsigned char[:] data):
+def read_cdci_descriptor_data(root, object_instance, const unsigned char[:] data, bint big_endian=False):
     cdef Buffer buf
     buf.root = &data[0]
     buf.ptr =  &data[0]
     buf.end = &data[-1]
     buf.error_message = ""
+    buf.big_endian = big_endian
 
     cdef Properties p
     cdef int ret
@@ -674,12 +907,13 @@ def read_cdci_descriptor_data(root, object_instance, const unsigned char[:] data
 
     object_instance.property_data = result
 
-def read_trackeffect_data(root, object_instance, const unsigned char[:] data):
+def read_trackeffect_data(root, object_instance, const unsigned char[:] data, bint big_endian=False):
     cdef Buffer buf
     buf.root = &data[0]
     buf.ptr =  &data[0]
     buf.end = &data[-1]
     buf.error_message = ""
+    buf.big_endian = big_endian
 
     cdef Properties p
     cdef int ret
@@ -696,12 +930,13 @@ def read_trackeffect_data(root, object_instance, const unsigned char[:] data):
     # print_property_sizes(&p)
     object_instance.property_data = result
 
-def read_effectparamlist_data(root, object_instance, const unsigned char[:] data):
+def read_effectparamlist_data(root, object_instance, const unsigned char[:] data, bint big_endian=False):
     cdef Buffer buf
     buf.root = &data[0]
     buf.ptr =  &data[0]
     buf.end = &data[-1]
     buf.error_message = ""
+    buf.big_endian = big_endian
 
     cdef Properties p
     cdef int ret
@@ -716,6 +951,109 @@ def read_effectparamlist_data(root, object_instance, const unsigned char[:] data
     object_instance.property_data = result
 
 
+def scan_headers(const unsigned char[:] data, Py_ssize_t data_pos, Py_ssize_t pos, Py_ssize_t count,
+                 bint little_endian, array.array positions, array.array sizes, bytearray class_ids):
+    """
+    Walks up to count object headers starting at file position pos. data holds
+    the file contents starting at file position data_pos. The position, size and
+    class id of every header that fits in data is appended to positions, sizes
+    and class_ids. Returns the position after the last chunk and the number of headers read.
+    """
+    cdef vector[unsigned long] header_positions
+    cdef vector[unsigned long] header_sizes
+    cdef vector[uint8_t] header_class_ids
+
+    cdef Py_ssize_t end = data.shape[0]
+    cdef Py_ssize_t offset
+    cdef Py_ssize_t n = 0
+    cdef const unsigned char *ptr
+    cdef uint32_t size
+
+    if positions.ob_descr.typecode != b'L' or sizes.ob_descr.typecode != b'L':
+        raise TypeError("positions and sizes must be array('L')")
+
+    with nogil:
+        header_positions.reserve(count)
+        header_sizes.reserve(count)
+        header_class_ids.reserve(count * 4)
+
+        while n < count:
+            offset = pos - data_pos
+            if offset < 0 or offset + 8 > end:
+                break
+
+            ptr = &data[offset]
+            if little_endian:
+                header_class_ids.push_back(ptr[3])
+                header_class_ids.push_back(ptr[2])
+                header_class_ids.push_back(ptr[1])
+                header_class_ids.push_back(ptr[0])
+                size = ptr[4] | ptr[5] << 8 | ptr[6] << 16 | <uint32_t>ptr[7] << 24
+            else:
+                header_class_ids.push_back(ptr[0])
+                header_class_ids.push_back(ptr[1])
+                header_class_ids.push_back(ptr[2])
+                header_class_ids.push_back(ptr[3])
+                size = <uint32_t>ptr[4] << 24 | ptr[5] << 16 | ptr[6] << 8 | ptr[7]
+
+            header_positions.push_back(pos)
+            header_sizes.push_back(size)
+            pos += 8 + size
+            n += 1
+
+    if n:
+        # positions last, readers check it without the scan lock
+        array.extend_buffer(sizes, <char *> header_sizes.data(), n)
+        class_ids.extend((<char *> header_class_ids.data())[:n * 4])
+        array.extend_buffer(positions, <char *> header_positions.data(), n)
+
+    return pos, n
+
+ctypedef int (*read_properties_func)(Buffer *f, Properties *p) nogil except +
+
+cdef class PropertiesReader:
+    """
+    Fast reader for classes without a dedicated read_*_data function.
+    The properties are decoded by func and stored on the object instance,
+    list classes get the "items" reflist extended into them instead.
+    """
+    cdef read_properties_func func
+    cdef str class_id
+    cdef bint is_list
+
+    def __call__(self, root, object_instance, const unsigned char[:] data, bint big_endian=False):
+        cdef Buffer buf
+        buf.root = &data[0]
+        buf.ptr =  &data[0]
+        buf.end = &data[-1]
+        buf.error_message = ""
+        buf.big_endian = big_endian
+
+        cdef Properties p
+        cdef int ret
+        with nogil:
+            ret = self.func(&buf, &p)
+
+        if ret < 0:
+            raise ValueError("Error reading %s: %s" % (self.class_id, buf.error_message.decode("utf-8")))
+
+        if buf.ptr != buf.end + 1:
+            raise ValueError("Error reading %s: %d bytes not read" % (self.class_id, buf.end + 1 - buf.ptr))
+
+        cdef RefListData item
+        if self.is_list:
+            for item in p.reflists:
+                list.extend(object_instance, item.data)
+        else:
+            object_instance.property_data = process_poperties(root, &p)
+
+cdef PropertiesReader properties_reader(bytes class_id, read_properties_func func, bint is_list=False):
+    cdef PropertiesReader reader = PropertiesReader.__new__(PropertiesReader)
+    reader.func = func
+    reader.class_id = class_id.decode("ascii")
+    reader.is_list = is_list
+    return reader
+
 READERS = {
 b'CMPO': read_composition_data,
 b'TKFX': read_trackeffect_data,
@@ -731,4 +1069,664 @@ b'PRIT': read_paramitem_data,
 b'TRKR': read_trackref_data,
 b'FXPS': read_effectparamlist_data,
 b'ATTR': read_attr_data,
+b'PRLS': properties_reader(b'PRLS', read_parameterlist, True),
+b'TMCS': properties_reader(b'TMCS', read_timecrumblist, True),
+b'TCCP': properties_reader(b'TCCP', read_timecode),
+b'ECCP': properties_reader(b'ECCP', read_edgecode),
+b'CTRL': properties_reader(b'CTRL', read_controlclip),
+b'TRKG': properties_reader(b'TRKG', read_trackgroup_only),
+b'PVOL': properties_reader(b'PVOL', read_panvolume),
+b'ASPI': properties_reader(b'ASPI', read_audiosuite),
+b'EQMB': properties_reader(b'EQMB', read_equalizer),
+b'MASK': properties_reader(b'MASK', read_capturemask),
+b'STRB': properties_reader(b'STRB', read_strobe),
+b'SPED': properties_reader(b'SPED', read_motioneffect),
+b'REPT': properties_reader(b'REPT', read_repeat),
+b'RSET': properties_reader(b'RSET', read_essencegroup),
+b'TNFX': properties_reader(b'TNFX', read_transitioneffect),
+b'BVst': properties_reader(b'BVst', read_binviewsetting),
+b'ABIN': properties_reader(b'ABIN', read_bin),
+b'BINF': properties_reader(b'BINF', read_binfirst),
+b'MDTP': properties_reader(b'MDTP', read_tape_descriptor),
+b'MDFM': properties_reader(b'MDFM', read_empty_media_descriptor),
+b'MDNG': properties_reader(b'MDNG', read_empty_media_descriptor),
+b'MDFL': properties_reader(b'MDFL', read_media_file_descriptor_only),
+b'MULD': properties_reader(b'MULD', read_multi_descriptor),
+b'WAVE': properties_reader(b'WAVE', read_wave_descriptor),
+b'AIFC': properties_reader(b'AIFC', read_aifc_descriptor),
+b'PCMA': properties_reader(b'PCMA', read_pcma_descriptor),
+b'MPGA': properties_reader(b'MPGA', read_mpga_descriptor),
+b'MPGI': properties_reader(b'MPGI', read_mpgi_descriptor),
+b'JPED': properties_reader(b'JPED', read_jpeg_descriptor),
+b'RGBA': properties_reader(b'RGBA', read_rgba_descriptor),
+b'DATD': properties_reader(b'DATD', read_data_descriptor_only),
+b'ANCD': properties_reader(b'ANCD', read_ancdata_descriptor),
+b'FILE': properties_reader(b'FILE', read_file_locator),
+b'WINF': properties_reader(b'WINF', read_file_locator),
+b'URLL': properties_reader(b'URLL', read_url_locator),
+b'MSML': properties_reader(b'MSML', read_msm_locator),
+b'GRFX': properties_reader(b'GRFX', read_graphic_effect),
+b'SHLP': properties_reader(b'SHLP', read_shapelist),
+b'CCFX': properties_reader(b'CCFX', read_colorcorrection),
+b'AVUP': properties_reader(b'AVUP', read_cfuserparam),
+b'APOS': properties_reader(b'APOS', read_position_only),
+b'ABOB': properties_reader(b'ABOB', read_bob_position_only),
+b'DIDP': properties_reader(b'DIDP', read_did_position_only),
+b'MPGP': properties_reader(b'MPGP', read_mpg_position),
+b'MCBR': properties_reader(b'MCBR', read_binref),
+b'MCMR': properties_reader(b'MCMR', read_mobref),
+b'TMBC': properties_reader(b'TMBC', read_marker),
+b'TKMN': properties_reader(b'TKMN', read_tracker_manager),
+b'TKDS': properties_reader(b'TKDS', read_tracker_data_slot),
+b'TKPS': properties_reader(b'TKPS', read_tracker_parameter_slot),
+b'TKDA': properties_reader(b'TKDA', read_tracker_data),
+b'TKPA': properties_reader(b'TKPA', read_tracker_parameter),
+}
+
+BE_READERS = {class_id: partial(reader, big_endian=True) for class_id, reader in READERS.items()}
+
+# writers
+
+cdef inline uint32_t le32(const uint8_t *p) nogil:
+    return (<uint32_t>p[0]) | (<uint32_t>p[1] << 8) | (<uint32_t>p[2] << 16) | (<uint32_t>p[3] << 24)
+
+cdef inline uint16_t le16(const uint8_t *p) nogil:
+    return (<uint16_t>p[0]) | (<uint16_t>p[1] << 8)
+
+cdef inline object prop(object obj, object d, str name):
+    # raw property value, refs are not dereferenced
+    cdef PyObject *value = PyDict_GetItem(d, name)
+    if value == NULL:
+        return getattr(obj, name)
+    return <object> value
+
+ctypedef int (*write_object_func)(ChunkWriter w, object obj) except -1
+
+cdef class ChunkWriter:
+    """
+    Growing buffer AVBFile.write serializes chunks into. WRITERS append
+    whole chunks (fourcc, size and data) in the byte order of the file being
+    written, the buffer is handed to the file object with flush.
+    """
+    cdef vector[uint8_t] buf
+    cdef readonly bint big_endian
+    cdef dict ref_mapping
+    cdef bint copy_refs
+
+    def __cinit__(self, root, bint big_endian=False):
+        self.big_endian = big_endian
+        self.ref_mapping = root.ref_mapping
+        self.copy_refs = root.debug_copy_refs
+
+    def __len__(self):
+        return self.buf.size()
+
+    def write(self, const unsigned char[:] data):
+        if data.shape[0]:
+            self.raw(&data[0], data.shape[0])
+
+    def flush(self, f):
+        if self.buf.size():
+            f.write((<char *> self.buf.data())[:self.buf.size()])
+            self.buf.clear()
+
+    cdef inline void raw(self, const uint8_t *data, size_t size):
+        cdef size_t pos = self.buf.size()
+        self.buf.resize(pos + size)
+        memcpy(self.buf.data() + pos, data, size)
+
+    cdef inline void u8(self, uint8_t value):
+        self.buf.push_back(value)
+
+    cdef inline void boolean(self, bint value):
+        if value:
+            self.u8(0x01)
+        else:
+            self.u8(0x00)
+
+    cdef void u16(self, uint16_t value):
+        if self.big_endian:
+            self.buf.push_back(value >> 8)
+            self.buf.push_back(value & 0xFF)
+        else:
+            self.buf.push_back(value & 0xFF)
+            self.buf.push_back(value >> 8)
+
+    cdef void u32(self, uint32_t value):
+        if self.big_endian:
+            self.u16(value >> 16)
+            self.u16(value & 0xFFFF)
+        else:
+            self.u16(value & 0xFFFF)
+            self.u16(value >> 16)
+
+    cdef inline void s16(self, int16_t value):
+        self.u16(<uint16_t> value)
+
+    cdef inline void s32(self, int32_t value):
+        self.u32(<uint32_t> value)
+
+    cdef void double(self, double value):
+        # doubles are always little endian
+        cdef uint64_t v
+        cdef int i
+        memcpy(&v, &value, 8)
+        for i in range(8):
+            self.buf.push_back((v >> (i * 8)) & 0xFF)
+
+    cdef void fourcc(self, bytes value):
+        cdef const uint8_t *p = value
+        cdef int i
+        assert len(value) == 4
+        for i in range(4):
+            self.buf.push_back(p[i] if self.big_endian else p[3 - i])
+
+    cdef int data(self, const uint8_t[:] value) except -1:
+        if value.shape[0]:
+            self.raw(&value[0], value.shape[0])
+        return 0
+
+    cdef int string(self, object value) except -1:
+        if not value:
+            self.u16(0)
+            return 0
+        cdef bytes data = value.encode('macroman')
+        self.u16(len(data))
+        self.data(data)
+        return 0
+
+    cdef int ref(self, object value) except -1:
+        cdef object key
+        if value is None:
+            self.u32(0)
+            return 0
+
+        if isinstance(value, (AVBObjectRef, int)):
+            key = value.index if isinstance(value, AVBObjectRef) else value
+            if key <= 0:
+                self.u32(0)
+                return 0
+            if self.copy_refs:
+                self.u32(key)
+                return 0
+        elif self.copy_refs:
+            self.u32(value.index)
+            return 0
+        else:
+            key = value.instance_id
+
+        index = self.ref_mapping.get(key, None)
+        if index is None:
+            raise Exception("object not written yet")
+        self.u32(index)
+        return 0
+
+    cdef int exp10(self, object value) except -1:
+        cdef int exponent = 0
+        while int(value) != value:
+            if abs(value * 10) >= 0x7FFFFFFF:
+                break
+            if exponent <= -6:
+                break
+            value *= 10
+            exponent -= 1
+
+        pretty = exp10_pretty.get(value, None)
+        if pretty is not None:
+            self.s32(pretty[0])
+            self.s16(pretty[1])
+        else:
+            self.s32(int(value))
+            self.s16(exponent)
+        return 0
+
+    cdef int datetime(self, object value) except -1:
+        self.u32(AVBIOContext.datetime_to_timestamp(value))
+        return 0
+
+    cdef int raw_uuid(self, object value) except -1:
+        self.data(value.bytes if self.big_endian else value.bytes_le)
+        return 0
+
+    cdef void material(self, const uint8_t *p):
+        # uuid stored as bytes_le
+        self.u8(72)
+        self.u32(le32(p))
+        self.u8(70)
+        self.u16(le16(p + 4))
+        self.u8(70)
+        self.u16(le16(p + 6))
+        self.u8(65)
+        self.s32(8)
+        self.raw(p + 8, 8)
+
+    cdef int mob_id(self, object value) except -1:
+        cdef const uint8_t[:] data = value.bytes_le
+        cdef const uint8_t *p = &data[0]
+        cdef int i
+        self.u8(65)
+        self.s32(12)
+        self.raw(p, 12)
+        for i in range(12, 16):
+            self.u8(68)
+            self.u8(p[i])
+        self.material(p + 16)
+        return 0
+
+    cdef int write_chunk(self, bytes class_id, write_object_func func, object obj) except -1:
+        cdef size_t start = self.buf.size()
+        cdef uint32_t size
+
+        self.fourcc(class_id)
+        self.u32(0)
+        try:
+            func(self, obj)
+        except:
+            self.buf.resize(start)
+            raise
+
+        size = self.buf.size() - start - 8
+        if self.big_endian:
+            self.buf[start + 4] = size >> 24
+            self.buf[start + 5] = (size >> 16) & 0xFF
+            self.buf[start + 6] = (size >> 8) & 0xFF
+            self.buf[start + 7] = size & 0xFF
+        else:
+            self.buf[start + 4] = size & 0xFF
+            self.buf[start + 5] = (size >> 8) & 0xFF
+            self.buf[start + 6] = (size >> 16) & 0xFF
+            self.buf[start + 7] = size >> 24
+        return 0
+
+cdef int write_component(ChunkWriter w, object obj, object d) except -1:
+    w.u8(0x02)
+    w.u8(0x03)
+    w.ref(prop(obj, d, 'left_bob'))
+    w.ref(prop(obj, d, 'right_bob'))
+    w.s16(prop(obj, d, 'media_kind_id'))
+    w.exp10(prop(obj, d, 'edit_rate'))
+
+    value = prop(obj, d, 'name')
+    if value:
+        w.string(value)
+    else:
+        w.u16(0xFFFF)
+
+    value = prop(obj, d, 'effect_id')
+    if value:
+        w.string(value)
+    else:
+        w.u16(0xFFFF)
+
+    w.ref(prop(obj, d, 'attributes'))
+    w.ref(prop(obj, d, 'session_attrs'))
+    w.ref(prop(obj, d, 'precomputed'))
+
+    if 'param_list' in d:
+        w.u8(0x01)
+        w.u8(0x01)
+        w.u8(72)
+        w.ref(prop(obj, d, 'param_list'))
+    return 0
+
+cdef int write_clip(ChunkWriter w, object obj, object d) except -1:
+    write_component(w, obj, d)
+    w.u8(0x02)
+    w.u8(0x01)
+    w.u32(prop(obj, d, 'length'))
+    return 0
+
+cdef int write_sequence(ChunkWriter w, object obj) except -1:
+    cdef object d = obj.property_data
+    cdef object components = prop(obj, d, 'components')
+    cdef Py_ssize_t i
+
+    write_component(w, obj, d)
+    w.u8(0x02)
+    w.u8(0x03)
+
+    w.u32(len(components))
+    if isinstance(components, list):
+        # AVBRefList items are read raw so nothing gets dereferenced
+        for i in range(PyList_GET_SIZE(components)):
+            w.ref(<object> PyList_GET_ITEM(components, i))
+    else:
+        for c in components:
+            w.ref(c)
+
+    w.u8(0x03)
+    return 0
+
+cdef int write_sourceclip(ChunkWriter w, object obj) except -1:
+    cdef object d = obj.property_data
+    cdef const uint8_t[:] mob_id
+
+    write_clip(w, obj, d)
+    w.u8(0x02)
+    w.u8(0x03)
+
+    mob_id = prop(obj, d, 'mob_id').bytes_le
+    w.u32(le32(&mob_id[16]))
+    w.u32(le32(&mob_id[20]))
+
+    w.s16(prop(obj, d, 'track_id'))
+    w.s32(prop(obj, d, 'start_time'))
+
+    if 'mob_id' in d:
+        w.u8(0x01)
+        w.u8(0x01)
+        w.mob_id(prop(obj, d, 'mob_id'))
+
+    w.u8(0x03)
+    return 0
+
+cdef int write_filler(ChunkWriter w, object obj) except -1:
+    write_clip(w, obj, obj.property_data)
+    w.u8(0x02)
+    w.u8(0x01)
+    w.u8(0x03)
+    return 0
+
+cdef int write_trackref(ChunkWriter w, object obj) except -1:
+    cdef object d = obj.property_data
+    write_clip(w, obj, d)
+    w.u8(0x02)
+    w.u8(0x01)
+    w.s16(prop(obj, d, 'relative_scope'))
+    w.s16(prop(obj, d, 'relative_track'))
+    w.u8(0x03)
+    return 0
+
+cdef int write_timecode(ChunkWriter w, object obj) except -1:
+    cdef object d = obj.property_data
+    cdef int i
+    write_clip(w, obj, d)
+    w.u8(0x02)
+    w.u8(0x01)
+    w.u32(prop(obj, d, 'flags'))
+    w.u16(prop(obj, d, 'fps'))
+    for i in range(6):
+        w.u8(0)
+    w.u32(prop(obj, d, 'start'))
+    w.u8(0x03)
+    return 0
+
+cdef int write_paramclip(ChunkWriter w, object obj) except -1:
+    cdef object d = obj.property_data
+    cdef int value_type
+    cdef int pp_type
+
+    write_clip(w, obj, d)
+    w.u8(0x02)
+    w.u8(0x01)
+
+    value_type = prop(obj, d, 'value_type')
+    w.s32(prop(obj, d, 'interp_kind'))
+    w.s16(value_type)
+
+    control_points = prop(obj, d, 'control_points')
+    w.s32(len(control_points))
+
+    for cp in control_points:
+        cp_data = cp.property_data
+        offset = prop(cp, cp_data, 'offset')
+        w.s32(offset[0])
+        w.s32(offset[1])
+        w.s32(prop(cp, cp_data, 'timescale'))
+
+        if value_type == CP_TYPE_INT:
+            w.s32(prop(cp, cp_data, 'value'))
+        elif value_type == CP_TYPE_DOUBLE:
+            w.double(prop(cp, cp_data, 'value'))
+        elif value_type == CP_TYPE_REFERENCE:
+            w.ref(prop(cp, cp_data, 'value'))
+        else:
+            raise ValueError("unknown value type: %d" % value_type)
+
+        pp_list = prop(cp, cp_data, 'pp')
+        w.s16(len(pp_list))
+        for pp in pp_list:
+            pp_data = pp.property_data
+            pp_type = prop(pp, pp_data, 'type')
+            w.s16(prop(pp, pp_data, 'code'))
+            w.s16(pp_type)
+
+            if pp_type == CP_TYPE_DOUBLE:
+                w.double(prop(pp, pp_data, 'value'))
+            elif pp_type == CP_TYPE_INT:
+                w.s32(prop(pp, pp_data, 'value'))
+            else:
+                raise ValueError("unknown PP type: %d" % pp_type)
+
+    if 'extrap_kind' in d:
+        w.u8(0x01)
+        w.u8(0x01)
+        w.u8(71)
+        w.s32(prop(obj, d, 'extrap_kind'))
+
+    if 'fields' in d:
+        w.u8(0x01)
+        w.u8(0x02)
+        w.u8(71)
+        w.s32(prop(obj, d, 'fields'))
+
+    w.u8(0x03)
+    return 0
+
+cdef int write_trackgroup(ChunkWriter w, object obj, object d) except -1:
+    cdef object td
+    cdef uint16_t flags
+
+    write_component(w, obj, d)
+    w.u8(0x02)
+    w.u8(0x08)
+
+    w.u8(prop(obj, d, 'mc_mode'))
+    w.s32(prop(obj, d, 'length'))
+    w.s32(prop(obj, d, 'num_scalars'))
+
+    tracks = prop(obj, d, 'tracks')
+    w.s32(len(tracks))
+
+    for track in tracks:
+        td = track.property_data
+        flags = 0
+        if 'index' in td:
+            flags |= TRACK_LABEL_FLAG
+        if 'attributes' in td:
+            flags |= TRACK_ATTRIBUTES_FLAG
+        if 'session_attr' in td:
+            flags |= TRACK_SESSION_ATTR_FLAG
+        if 'component' in td:
+            flags |= TRACK_COMPONENT_FLAG
+        if 'filler_proxy' in td:
+            flags |= TRACK_FILLER_PROXY_FLAG
+        if 'bob_data' in td:
+            flags |= TRACK_BOB_DATA_FLAG
+        if 'control_code' in td:
+            flags |= TRACK_CONTROL_CODE_FLAG
+        if 'control_sub_code' in td:
+            flags |= TRACK_CONTROL_SUB_CODE_FLAG
+        if 'start_pos' in td:
+            flags |= TRACK_START_POS_FLAG
+        if 'read_only' in td:
+            flags |= TRACK_READ_ONLY_FLAG
+
+        w.u16(flags)
+        if flags & TRACK_LABEL_FLAG:
+            w.s16(prop(track, td, 'index'))
+        if flags & TRACK_ATTRIBUTES_FLAG:
+            w.ref(prop(track, td, 'attributes'))
+        if flags & TRACK_SESSION_ATTR_FLAG:
+            w.ref(prop(track, td, 'session_attr'))
+        if flags & TRACK_COMPONENT_FLAG:
+            w.ref(prop(track, td, 'component'))
+        if flags & TRACK_FILLER_PROXY_FLAG:
+            w.ref(prop(track, td, 'filler_proxy'))
+        if flags & TRACK_BOB_DATA_FLAG:
+            w.ref(prop(track, td, 'bob_data'))
+        if flags & TRACK_CONTROL_CODE_FLAG:
+            w.s16(prop(track, td, 'control_code'))
+        if flags & TRACK_CONTROL_SUB_CODE_FLAG:
+            w.s16(prop(track, td, 'control_sub_code'))
+        if flags & TRACK_START_POS_FLAG:
+            w.s32(prop(track, td, 'start_pos'))
+        if flags & TRACK_READ_ONLY_FLAG:
+            w.boolean(prop(track, td, 'read_only'))
+
+    if tracks:
+        w.u8(0x01)
+        w.u8(0x01)
+        for track in tracks:
+            w.u8(69)
+            if 'lock_number' in track.property_data:
+                w.s16(prop(track, track.property_data, 'lock_number'))
+            else:
+                w.s16(0)
+    return 0
+
+cdef int write_composition(ChunkWriter w, object obj) except -1:
+    cdef object d = obj.property_data
+    cdef const uint8_t[:] mob_id
+
+    write_trackgroup(w, obj, d)
+    w.u8(0x02)
+    w.u8(0x02)
+
+    mob_id = prop(obj, d, 'mob_id').bytes_le
+    w.u32(le32(&mob_id[16]))
+    w.u32(le32(&mob_id[20]))
+    w.datetime(prop(obj, d, 'last_modified'))
+
+    w.u8(prop(obj, d, 'mob_type_id'))
+    w.s32(prop(obj, d, 'usage_code'))
+    w.ref(prop(obj, d, 'descriptor'))
+
+    if 'creation_time' in d:
+        w.u8(0x01)
+        w.u8(0x01)
+        w.u8(71)
+        w.datetime(prop(obj, d, 'creation_time'))
+
+    if 'mob_id' in d:
+        w.u8(0x01)
+        w.u8(0x02)
+        w.mob_id(prop(obj, d, 'mob_id'))
+
+    w.u8(0x03)
+    return 0
+
+cdef int write_media_descriptor_only(ChunkWriter w, object obj, object d) except -1:
+    w.u8(0x02)
+    w.u8(0x03)
+
+    w.u8(prop(obj, d, 'mob_kind'))
+    w.ref(prop(obj, d, 'locator'))
+    w.boolean(prop(obj, d, 'intermediate'))
+    w.ref(prop(obj, d, 'physical_media'))
+
+    if 'uuid' in d:
+        w.u8(0x01)
+        w.u8(0x01)
+        w.u8(65)
+        w.s32(16)
+        w.raw_uuid(prop(obj, d, 'uuid'))
+
+    if 'wchar' in d:
+        w.u8(0x01)
+        w.u8(0x02)
+        w.u8(65)
+        w.s32(len(prop(obj, d, 'wchar')))
+        w.data(prop(obj, d, 'wchar'))
+
+    if 'attributes' in d:
+        w.u8(0x01)
+        w.u8(0x03)
+        w.u8(72)
+        w.ref(prop(obj, d, 'attributes'))
+    return 0
+
+cdef int write_media_descriptor(ChunkWriter w, object obj) except -1:
+    write_media_descriptor_only(w, obj, obj.property_data)
+    w.u8(0x03)
+    return 0
+
+cdef int write_media_file_descriptor(ChunkWriter w, object obj) except -1:
+    cdef object d = obj.property_data
+    write_media_descriptor_only(w, obj, d)
+    w.u8(0x02)
+    w.u8(0x03)
+    w.exp10(prop(obj, d, 'edit_rate'))
+    w.s32(prop(obj, d, 'length'))
+    w.s16(prop(obj, d, 'is_omfi'))
+    w.s32(prop(obj, d, 'data_offset'))
+    w.u8(0x03)
+    return 0
+
+cdef int write_attributes(ChunkWriter w, object obj) except -1:
+    cdef uint32_t attr_type
+
+    w.u8(0x02)
+    w.u8(0x01)
+    w.u32(len(obj))
+
+    for key in obj:
+        assert isinstance(key, str)
+        value = <object> PyDict_GetItem(obj, key)
+
+        if isinstance(value, int):
+            attr_type = INT_ATTR
+        elif isinstance(value, str):
+            attr_type = STR_ATTR
+        elif isinstance(value, bytearray):
+            attr_type = BOB_ATTR
+        elif isinstance(value, bytes):
+            raise ValueError("%s: bytes value type too ambiguous, use bytearray or unicode str" % key)
+        else:
+            attr_type = OBJ_ATTR
+
+        w.u32(attr_type)
+        w.string(key)
+
+        if attr_type == INT_ATTR:
+            w.s32(value)
+        elif attr_type == STR_ATTR:
+            w.string(value)
+        elif attr_type == OBJ_ATTR:
+            w.ref(value)
+        elif attr_type == BOB_ATTR:
+            w.u32(len(value))
+            w.data(value)
+
+    w.u8(0x03)
+    return 0
+
+cdef class ObjectWriter:
+    """
+    Fast writer appending the chunk of an object to a ChunkWriter, mirrors
+    the Python write method of the class.
+    """
+    cdef write_object_func func
+    cdef bytes class_id
+
+    def __call__(self, ChunkWriter out, obj):
+        out.write_chunk(self.class_id, self.func, obj)
+
+cdef ObjectWriter object_writer(bytes class_id, write_object_func func):
+    cdef ObjectWriter writer = ObjectWriter.__new__(ObjectWriter)
+    writer.func = func
+    writer.class_id = class_id
+    return writer
+
+WRITERS = {
+b'ATTR': object_writer(b'ATTR', write_attributes),
+b'SCLP': object_writer(b'SCLP', write_sourceclip),
+b'TRKR': object_writer(b'TRKR', write_trackref),
+b'CMPO': object_writer(b'CMPO', write_composition),
+b'MDES': object_writer(b'MDES', write_media_descriptor),
+b'MDFL': object_writer(b'MDFL', write_media_file_descriptor),
+b'FILL': object_writer(b'FILL', write_filler),
+b'TCCP': object_writer(b'TCCP', write_timecode),
+b'SEQU': object_writer(b'SEQU', write_sequence),
+b'PRCL': object_writer(b'PRCL', write_paramclip),
 }
@@ -1,5 +1,7 @@
 #include <vector>
 #include <math.h>
+#include <string.h>
+#include <algorithm>
 
 #ifdef _MSC_VER
 
@@ -40,6 +42,7 @@ struct Buffer {
     const uint8_t *ptr;
     const uint8_t *end;
     const char *error_message;
+    bool big_endian;
 };
 
 enum StringType {
@@ -68,6 +71,15 @@ enum PropertyType {
     TRKG,
     TRACK,
     PARAM,
+    CONTROL_POINT,
+    CONTROL_POINT_PROPERTY,
+    BIN_ITEM,
+    SIFT_ITEM,
+    ASPI_PLUGIN,
+    ASPI_PLUGIN_CHUNK,
+    EQUALIZER_BAND,
+    DICT,
+    LIST,
 };
 
 union IntDataValue {
@@ -88,6 +100,7 @@ struct DoubleData {
 
 struct IntArrayData {
     const char *name;
+    int stride;
     vector<int64_t> data;
 };
 
@@ -163,6 +176,19 @@ struct Properties {
     vector<ControlPointData> control_points;
     vector<IntArrayData> arrays;
     vector<BytesData> bytearrays;
+    // property names in the order they were read, property_data keeps it
+    vector<const char *> order;
+};
+
+// the CMPO fields a bin listing needs
+struct CompositionSummary {
+    vector<uint8_t> name;
+    int32_t length;
+    uint32_t last_modified;
+    uint8_t mob_type_id;
+    int32_t usage_code;
+    bool has_mob_id;
+    uint8_t mob_id[32];
 };
 
 static inline uint8_t read_u8(Buffer *f)
@@ -215,23 +241,86 @@ static inline uint64_t read_u64le(Buffer *f)
     return value1 | value2 << 32;
 }
 
-static inline double read_double_le(Buffer *f)
+static inline uint16_t read_u16be(Buffer *f)
+{
+    uint16_t value;
+    value =  read_u8(f) << 8;
+    value |= read_u8(f);
+    return value;
+}
+
+static inline uint32_t read_u32be(Buffer *f)
+{
+    uint32_t value;
+    value =  read_u16be(f) << 16;
+    value |= read_u16be(f);
+    return value;
+}
+
+static inline uint64_t read_u64be(Buffer *f)
+{
+    uint64_t value1 = read_u32be(f);
+    uint64_t value2 = read_u32be(f);
+    return value1 << 32 | value2;
+}
+
+// the byte order of the file being read
+
+static inline uint16_t read_u16(Buffer *f)
+{
+    return f->big_endian ? read_u16be(f) : read_u16le(f);
+}
+
+static inline uint32_t read_u32(Buffer *f)
+{
+    return f->big_endian ? read_u32be(f) : read_u32le(f);
+}
+
+static inline uint64_t read_u64(Buffer *f)
+{
+    return f->big_endian ? read_u64be(f) : read_u64le(f);
+}
+
+// NOTE: AVBIOContext reads doubles little endian in both byte orders
+static inline double read_double(Buffer *f)
 {
     uint64_t value = read_u64le(f);
-    return *(double*)&value;
+    double result;
+    memcpy(&result, &value, sizeof(result));
+    return result;
+}
+
+// uuids are stored as bytes_le, big endian files store the
+// first three fields in big endian order
+static inline void swap_uuid_fields(Buffer *f, uint8_t *d)
+{
+    if (!f->big_endian)
+        return;
+
+    std::swap(d[0], d[3]);
+    std::swap(d[1], d[2]);
+    std::swap(d[4], d[5]);
+    std::swap(d[6], d[7]);
 }
 
 static inline double read_exp10_encoded_float(Buffer *f)
 {
-    int32_t mantissa = (int32_t)read_u32le(f);
-    int16_t exp10 = (int16_t)read_u16le(f);
+    int32_t mantissa = (int32_t)read_u32(f);
+    int16_t exp10 = (int16_t)read_u16(f);
 
     return mantissa * pow(10.0, (int)exp10);
 }
 
+static inline void skip(Buffer *f, size_t size)
+{
+    if (size > (size_t)(f->end + 1 - f->ptr))
+        size = f->end + 1 - f->ptr;
+    f->ptr += size;
+}
+
 static inline void read_data32(Buffer *f, std::vector<uint8_t> &s)
 {
-    size_t size = read_u32le(f);
+    size_t size = read_u32(f);
     s.resize(size);
     for(size_t i =0; i < size; i++) {
         s[i] = read_u8(f);
@@ -240,7 +329,7 @@ static inline void read_data32(Buffer *f, std::vector<uint8_t> &s)
 
 static inline void read_data16(Buffer *f, std::vector<uint8_t> &s)
 {
-    uint16_t size = read_u16le(f);
+    uint16_t size = read_u16(f);
     if (size < 65535) {
         s.resize(size);
         for(int i =0; i < size; i++) {
@@ -258,6 +347,7 @@ static inline void add_string(Properties *p, Buffer *f, const char* name, String
     s.name = name;
     s.type = t;
     read_data16(f, s.data);
+    p->order.push_back(name);
 }
 
 static inline bool iter_ext(Buffer *f) {
@@ -277,6 +367,7 @@ static inline void add_object_ref(Properties *p, const char* name, uint64_t valu
     d.name = name;
     d.data.u64 = value;
     p->refs.push_back(d);
+    p->order.push_back(name);
 }
 
 static inline void add_uint(Properties *p, const char* name, uint64_t value)
@@ -286,6 +377,7 @@ static inline void add_uint(Properties *p, const char* name, uint64_t value)
     d.name = name;
     d.data.u64 = value;
     p->ints.push_back(d);
+    p->order.push_back(name);
 }
 
 static inline void add_int(Properties *p, const char* name, int64_t value)
@@ -296,6 +388,7 @@ static inline void add_int(Properties *p, const char* name, int64_t value)
     d.data.s64 = value;
     d.is_signed = true;
     p->ints.push_back(d);
+    p->order.push_back(name);
 }
 
 static inline void add_double(Properties *p, const char* name, double value)
@@ -305,6 +398,7 @@ static inline void add_double(Properties *p, const char* name, double value)
     d.name = name;
     d.data = value;
     p->doubles.push_back(d);
+    p->order.push_back(name);
 }
 
 
@@ -315,6 +409,7 @@ static inline void add_date(Properties *p, const char* name, uint64_t value)
     d.name = name;
     d.data.u64 = value;
     p->dates.push_back(d);
+    p->order.push_back(name);
 }
 
 static inline void add_bool(Properties *p, const char* name, bool value)
@@ -324,17 +419,16 @@ static inline void add_bool(Properties *p, const char* name, bool value)
     d.name = name;
     d.data = value;
     p->bools.push_back(d);
+    p->order.push_back(name);
 }
 
-static inline int read_mob_id(Properties *p, Buffer *f, const char* name)
+// reads a MobID into 32 bytes, material uuid in little endian field order
+static inline int read_mob_id_data(Buffer *f, uint8_t *m)
 {
-    BytesData mob_id;
-    mob_id.name = name;
-    mob_id.data.resize(32);
-    uint8_t *m = &mob_id.data[0];
+    uint8_t *material = m + 16;
 
     read_assert_tag(f, 65);
-    uint32_t smpte_label_len = read_u32le(f);
+    uint32_t smpte_label_len = read_u32(f);
 
     if(smpte_label_len != 12) {
         fprintf(stderr, "mob_id smpte_label_len 12 != %d\n", smpte_label_len);
@@ -374,7 +468,7 @@ static inline int read_mob_id(Properties *p, Buffer *f, const char* name)
     *m++ = read_u8(f);
 
     read_assert_tag(f, 65);
-    uint32_t data4len = read_u32le(f);
+    uint32_t data4len = read_u32(f);
     if(data4len != 8) {
         fprintf(stderr, "mob_id data4len 8 != %d\n", data4len);
         f->error_message = ASSERT_MESSAGE;
@@ -385,7 +479,21 @@ static inline int read_mob_id(Properties *p, Buffer *f, const char* name)
         *m++ = read_u8(f);
     }
 
+    // material
+    swap_uuid_fields(f, material);
+
+    return 0;
+}
+
+static inline int read_mob_id(Properties *p, Buffer *f, const char* name)
+{
+    BytesData mob_id;
+    mob_id.name = name;
+    mob_id.data.resize(32);
+
+    check(read_mob_id_data(f, &mob_id.data[0]));
     p->mob_ids.push_back(mob_id);
+    p->order.push_back(name);
 
     return 0;
 }
@@ -399,15 +507,19 @@ static inline int add_raw_uuid(Properties *p, const char * name, Buffer *f)
     for(int i =0; i < 16; i++) {
         d->data[i] = read_u8(f);
     }
+    swap_uuid_fields(f, &d->data[0]);
+    p->order.push_back(name);
 
     return 0;
 }
 
-static inline vector<int64_t> & add_int_array(Properties *p, const char * name)
+static inline vector<int64_t> & add_int_array(Properties *p, const char * name, int stride = 1)
 {
     p->arrays.push_back(IntArrayData());
     IntArrayData *d = &p->arrays[p->arrays.size()-1];
     d->name = name;
+    d->stride = stride;
+    p->order.push_back(name);
     return d->data;
 }
 
@@ -416,35 +528,120 @@ static inline vector<uint8_t> & add_bytearray(Properties *p, const char * name)
     p->bytearrays.push_back(BytesData());
     BytesData *d = &p->bytearrays[p->bytearrays.size()-1];
     d->name = name;
+    p->order.push_back(name);
+    return d->data;
+}
+
+static inline int read_bytes(Buffer *f, vector<uint8_t> &data, size_t size)
+{
+    if (size > (size_t)(f->end + 1 - f->ptr)) {
+        f->error_message = "read past end of chunk";
+        return -1;
+    }
+    data.assign(f->ptr, f->ptr + size);
+    f->ptr += size;
+    return 0;
+}
+
+static inline int add_bytes(Properties *p, Buffer *f, const char * name, size_t size)
+{
+    return read_bytes(f, add_bytearray(p, name), size);
+}
+
+// same as AVBIOContext.read_string, null bytes are stripped from both ends
+static inline void add_stripped_string(Properties *p, Buffer *f, const char* name, StringType t)
+{
+    add_string(p, f, name, t);
+    vector<uint8_t> &data = p->strings[p->strings.size()-1].data;
+
+    size_t start = 0;
+    size_t end = data.size();
+    while (end > start && data[end-1] == 0)
+        end--;
+    while (start < end && data[start] == 0)
+        start++;
+
+    data.erase(data.begin() + end, data.end());
+    data.erase(data.begin(), data.begin() + start);
+}
+
+static inline vector<uint32_t> & add_reflist(Properties *p, const char * name)
+{
+    p->reflists.push_back(RefListData());
+    RefListData *d = &p->reflists[p->reflists.size()-1];
+    d->name = name;
+    p->order.push_back(name);
     return d->data;
 }
 
+static inline vector<Properties> & add_children(Properties *p, const char * name, PropertyType type, size_t count)
+{
+    p->children.push_back(Properties::ChildData());
+    Properties::ChildData &child = p->children[p->children.size()-1];
+    child.name = name;
+    child.type = type;
+    child.data.resize(count);
+    p->order.push_back(name);
+    for (size_t i = 0; i < count; i++) {
+        child.data[i].type = type;
+    }
+    return child.data;
+}
+
+static inline int read_rect(Buffer *f, Properties *p, const char *name)
+{
+    if ((int16_t)read_u16(f) != 1) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+
+    vector<int64_t> &rect = add_int_array(p, name);
+    for (int i = 0; i < 4; i++) {
+        rect.push_back((int16_t)read_u16(f));
+    }
+    return 0;
+}
+
+static inline int read_rgb_color(Buffer *f, Properties *p, const char *name)
+{
+    if ((int16_t)read_u16(f) != 1) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+
+    vector<int64_t> &color = add_int_array(p, name);
+    for (int i = 0; i < 3; i++) {
+        color.push_back(read_u16(f));
+    }
+    return 0;
+}
+
 
 static int read_comp(Buffer *f, Properties *p)
 {
     read_assert_tag(f, 0x02);
     read_assert_tag(f, 0x03);
 
-    add_object_ref(p, "left_bob", read_u32le(f));
-    add_object_ref(p, "right_bob", read_u32le(f));
+    add_object_ref(p, "left_bob", read_u32(f));
+    add_object_ref(p, "right_bob", read_u32(f));
 
-    add_uint(p, "media_kind_id", read_u16le(f));
+    add_uint(p, "media_kind_id", read_u16(f));
 
     add_double(p, "edit_rate", read_exp10_encoded_float(f));
 
     add_string(p, f, "name", MACROMAN);
     add_string(p, f, "effect_id", MACROMAN);
 
-    add_object_ref(p, "attributes", read_u32le(f));
-    add_object_ref(p, "session_attrs", read_u32le(f));
-    add_object_ref(p, "precomputed", read_u32le(f));
+    add_object_ref(p, "attributes", read_u32(f));
+    add_object_ref(p, "session_attrs", read_u32(f));
+    add_object_ref(p, "precomputed", read_u32(f));
 
     while (iter_ext(f)) {
         uint8_t tag = read_u8(f);
         switch (tag) {
             case 0x01:
                 read_assert_tag(f, 72);
-                add_object_ref(p, "param_list", read_u32le(f));
+                add_object_ref(p, "param_list", read_u32(f));
                 break;
             default:
                 fprintf(stderr, "unknown ext tag: %d\n", tag);
@@ -462,13 +659,14 @@ static int read_sequence(Buffer *f, Properties *p)
     read_assert_tag(f, 0x02);
     read_assert_tag(f, 0x03);
 
-    uint32_t count = read_u32le(f);
+    uint32_t count = read_u32(f);
     p->reflists.push_back(RefListData());
     RefListData &reflist = p->reflists[p->reflists.size()-1];
     reflist.name = "components";
+    p->order.push_back(reflist.name);
     reflist.data.reserve(count);
     for (size_t i =0; i < count; i++) {
-        reflist.data.push_back(read_u32le(f));
+        reflist.data.push_back(read_u32(f));
     }
 
     read_assert_tag(f, 0x03);
@@ -480,7 +678,7 @@ static int read_clip(Buffer *f, Properties *p)
     read_comp(f, p);
     read_assert_tag(f, 0x02);
     read_assert_tag(f, 0x01);
-    add_uint(p, "length", read_u32le(f)); // should this be a int?
+    add_uint(p, "length", read_u32(f)); // should this be a int?
 
     return 0;
 }
@@ -502,12 +700,12 @@ static int read_sourceclip(Buffer *f, Properties *p)
     read_assert_tag(f, 0x03);
 
     //mob_id_hi
-    read_u32le(f);
+    read_u32(f);
     //mob_id_lo
-    read_u32le(f);
+    read_u32(f);
 
-    add_int(p, "track_id", (int16_t)read_u16le(f));
-    add_int(p, "start_time", (int32_t)read_u32le(f));
+    add_int(p, "track_id", (int16_t)read_u16(f));
+    add_int(p, "start_time", (int32_t)read_u32(f));
 
     while (iter_ext(f)) {
         uint8_t tag = read_u8(f);
@@ -533,35 +731,36 @@ static int read_paramclip(Buffer *f, Properties *p)
     read_assert_tag(f, 0x02);
     read_assert_tag(f, 0x01);
 
-    add_int(p, "interp_kind", (int32_t)read_u32le(f));
+    add_int(p, "interp_kind", (int32_t)read_u32(f));
 
-    ControlPointValueType value_type = (ControlPointValueType)read_u16le(f);
+    ControlPointValueType value_type = (ControlPointValueType)read_u16(f);
     add_int(p, "value_type", value_type);
 
-    uint32_t point_count = read_u32le(f);
+    uint32_t point_count = read_u32(f);
 
     p->control_points.resize(1);
     ControlPointData *cp_data = &p->control_points[0];
     cp_data->name = "control_points";
+    p->order.push_back(cp_data->name);
     cp_data->type = ParamControlPointType;
     cp_data->value_type = value_type;
     cp_data->data.resize(point_count);
 
     for (size_t i=0; i < point_count; i++) {
         ControlPoint *cp = &cp_data->data[i];
-        cp->offset_num = (int32_t)read_u32le(f);
-        cp->offset_den = (int32_t)read_u32le(f);
-        cp->timescale =  (int32_t)read_u32le(f);
+        cp->offset_num = (int32_t)read_u32(f);
+        cp->offset_den = (int32_t)read_u32(f);
+        cp->timescale =  (int32_t)read_u32(f);
 
         switch (value_type) {
             case CP_TYPE_INT:
-                cp->value = read_u32le(f);
+                cp->value = read_u32(f);
                 break;
             case CP_TYPE_DOUBLE:
-                cp->double_value = read_double_le(f);
+                cp->double_value = read_double(f);
                 break;
             case CP_TYPE_REFERENCE:
-                cp->value = read_u32le(f);
+                cp->value = read_u32(f);
                 break;
             default:
                 fprintf(stderr, "unknown value_type: %d\n", value_type);
@@ -569,18 +768,18 @@ static int read_paramclip(Buffer *f, Properties *p)
                 return -1;
         }
 
-        uint16_t pp_count = read_u16le(f);
+        uint16_t pp_count = read_u16(f);
         cp->pp.resize(pp_count);
         for(int j = 0; j < pp_count; j++) {
             ControlPointProperty *pp = &cp->pp[j];
-            pp->code = (int16_t)read_u16le(f);
-            pp->type = (ControlPointValueType)read_u16le(f);
+            pp->code = (int16_t)read_u16(f);
+            pp->type = (ControlPointValueType)read_u16(f);
             switch (pp->type) {
                 case CP_TYPE_INT:
-                    pp->value = read_u32le(f);
+                    pp->value = read_u32(f);
                     break;
                 case CP_TYPE_DOUBLE:
-                    pp->double_value = read_double_le(f);
+                    pp->double_value = read_double(f);
                     break;
                 default:
                     fprintf(stderr, "unknown value_type: %d\n", pp->type);
@@ -594,11 +793,11 @@ static int read_paramclip(Buffer *f, Properties *p)
         switch (tag) {
             case 0x01:
                 read_assert_tag(f, 71);
-                add_int(p, "extrap_kind", (int32_t)read_u32le(f));
+                add_int(p, "extrap_kind", (int32_t)read_u32(f));
                 break;
             case 0x02:
                 read_assert_tag(f, 71);
-                add_int(p, "fields", (int32_t)read_u32le(f));
+                add_int(p, "fields", (int32_t)read_u32(f));
                 break;
             default:
                 fprintf(stderr, "unknown ext tag: %d\n", tag);
@@ -617,17 +816,17 @@ static int read_paramitem(Buffer *f, Properties *p)
     read_assert_tag(f, 0x02);
     add_raw_uuid(p, "uuid", f);
 
-    int16_t value_type = read_u16le(f);
+    int16_t value_type = read_u16(f);
     add_int(p, "value_type", value_type);
     switch (value_type) {
         case 1:
-            add_int(p, "value", (int32_t)read_u32le(f));
+            add_int(p, "value", (int32_t)read_u32(f));
             break;
         case 2:
-            add_double(p, "value", read_double_le(f));
+            add_double(p, "value", read_double(f));
             break;
         case 4:
-            add_object_ref(p, "value", read_u32le(f));
+            add_object_ref(p, "value", read_u32(f));
             break;
         default:
             fprintf(stderr, "unknown value_type: %d\n", value_type);
@@ -637,7 +836,7 @@ static int read_paramitem(Buffer *f, Properties *p)
 
     add_string(p, f, "name", MACROMAN);
     add_bool(p, "enable", read_bool(f));
-    add_object_ref(p, "control_track", read_u32le(f));
+    add_object_ref(p, "control_track", read_u32(f));
 
     while (iter_ext(f)) {
         uint8_t tag = read_u8(f);
@@ -662,8 +861,8 @@ static int read_trackref(Buffer *f, Properties *p)
     read_assert_tag(f, 0x02);
     read_assert_tag(f, 0x01);
 
-    add_int(p, "relative_scope", (int16_t)read_u16le(f));
-    add_int(p, "relative_track", (int16_t)read_u16le(f));
+    add_int(p, "relative_scope", (int16_t)read_u16(f));
+    add_int(p, "relative_track", (int16_t)read_u16(f));
     read_assert_tag(f, 0x03);
 
     return 0;
@@ -676,48 +875,49 @@ static int read_trackgroup(Buffer *f, Properties *p)
     read_assert_tag(f, 0x08);
 
     add_int(p, "mc_mode", read_u8(f));
-    add_int(p, "length", (int32_t)read_u32le(f));
-    add_int(p, "num_scalars", (int32_t)read_u32le(f));
+    add_int(p, "length", (int32_t)read_u32(f));
+    add_int(p, "num_scalars", (int32_t)read_u32(f));
 
-    int32_t track_count =  (int32_t)read_u32le(f);
+    int32_t track_count =  (int32_t)read_u32(f);
 
     p->children.push_back(Properties::ChildData());
     Properties::ChildData &child = p->children[ p->children.size()-1];
     child.name = "tracks";
+    p->order.push_back(child.name);
     vector <Properties> &tracks = child.data;
     tracks.resize(track_count);
 
     for (int i = 0; i < track_count; i++) {
         Properties &track = tracks[i];
         track.type = TRACK;
-        uint16_t flags = read_u16le(f);
+        uint16_t flags = read_u16(f);
 
         if (flags & TRACK_LABEL_FLAG)
-            add_int(&track, "index", (int16_t)read_u16le(f));
+            add_int(&track, "index", (int16_t)read_u16(f));
 
         if (flags & TRACK_ATTRIBUTES_FLAG)
-            add_object_ref(&track, "attributes", read_u32le(f));
+            add_object_ref(&track, "attributes", read_u32(f));
 
         if (flags & TRACK_SESSION_ATTR_FLAG)
-            add_object_ref(&track, "session_attr", read_u32le(f));
+            add_object_ref(&track, "session_attr", read_u32(f));
 
         if (flags & TRACK_COMPONENT_FLAG)
-            add_object_ref(&track, "component", read_u32le(f));
+            add_object_ref(&track, "component", read_u32(f));
 
         if (flags & TRACK_FILLER_PROXY_FLAG)
-            add_object_ref(&track, "filler_proxy", read_u32le(f));
+            add_object_ref(&track, "filler_proxy", read_u32(f));
 
         if (flags & TRACK_BOB_DATA_FLAG)
-            add_object_ref(&track, "bob_data", read_u32le(f));
+            add_object_ref(&track, "bob_data", read_u32(f));
 
         if (flags & TRACK_CONTROL_CODE_FLAG)
-            add_int(&track, "control_code", (int16_t)read_u16le(f));
+            add_int(&track, "control_code", (int16_t)read_u16(f));
 
         if (flags & TRACK_CONTROL_SUB_CODE_FLAG)
-            add_int(&track, "control_sub_code", (int16_t)read_u16le(f));
+            add_int(&track, "control_sub_code", (int16_t)read_u16(f));
 
         if (flags & TRACK_START_POS_FLAG)
-            add_int(&track, "start_pos",  (int32_t)read_u32le(f));
+            add_int(&track, "start_pos",  (int32_t)read_u32(f));
 
         if (flags & TRACK_READ_ONLY_FLAG)
             add_bool(&track, "read_only", read_bool(f));
@@ -736,7 +936,7 @@ static int read_trackgroup(Buffer *f, Properties *p)
             case 0x01:
                 for (int i = 0; i < track_count; i++) {
                     read_assert_tag(f, 69);
-                    add_int(&tracks[i], "lock_number", (int16_t)read_u16le(f));
+                    add_int(&tracks[i], "lock_number", (int16_t)read_u16(f));
                 }
                 break;
             default:
@@ -749,33 +949,41 @@ static int read_trackgroup(Buffer *f, Properties *p)
     return 0;
 }
 
-static int read_trackeffect(Buffer *f, Properties *p)
+// fields shared by TKFX and TNFX
+static int read_effect_info(Buffer *f, Properties *p)
 {
-    read_trackgroup(f, p);
-    read_assert_tag(f, 0x02);
-    read_assert_tag(f, 0x06);
-
-    add_int(p, "left_length",       (int32_t)read_u32le(f));
-    add_int(p, "right_length",      (int32_t)read_u32le(f));
-
-    add_int(p, "info_version",      (int16_t)read_u16le(f));
-    add_int(p, "info_current",      (int32_t)read_u32le(f));
-    add_int(p, "info_smooth",       (int32_t)read_u32le(f));
-    add_int(p, "info_color_item",   (int16_t)read_u16le(f));
-    add_int(p, "info_quality",      (int16_t)read_u16le(f));
+    add_int(p, "left_length",       (int32_t)read_u32(f));
+    add_int(p, "right_length",      (int32_t)read_u32(f));
+
+    add_int(p, "info_version",      (int16_t)read_u16(f));
+    add_int(p, "info_current",      (int32_t)read_u32(f));
+    add_int(p, "info_smooth",       (int32_t)read_u32(f));
+    add_int(p, "info_color_item",   (int16_t)read_u16(f));
+    add_int(p, "info_quality",      (int16_t)read_u16(f));
     add_int(p, "info_is_reversed",  (int8_t)read_u8(f));
     add_bool(p, "info_aspect_on",   read_bool(f));
 
-    add_object_ref(p, "keyframes",       read_u32le(f));
+    add_object_ref(p, "keyframes",       read_u32(f));
     add_bool(p, "info_force_software",   read_bool(f));
     add_bool(p, "info_never_hardware",   read_bool(f));
 
+    return 0;
+}
+
+static int read_trackeffect(Buffer *f, Properties *p)
+{
+    read_trackgroup(f, p);
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x06);
+
+    read_effect_info(f, p);
+
     while (iter_ext(f)) {
         uint8_t tag = read_u8(f);
         switch (tag) {
             case 0x02:
                 read_assert_tag(f, 72);
-                add_object_ref(p, "trackman", read_u32le(f));
+                add_object_ref(p, "trackman", read_u32(f));
                 break;
             default:
                 fprintf(stderr, "unknown ext tag: %d\n", tag);
@@ -794,7 +1002,7 @@ static int read_selector(Buffer *f, Properties *p)
     read_assert_tag(f, 0x01);
 
     add_bool(p, "is_ganged", read_bool(f));
-    add_uint(p, "selected",  read_u16le(f));
+    add_uint(p, "selected",  read_u16(f));
 
     read_assert_tag(f, 0x03);
 
@@ -808,21 +1016,21 @@ static int read_composition(Buffer *f, Properties *p)
     read_assert_tag(f, 0x02);
 
     //mob_hi
-    read_u32le(f);
+    read_u32(f);
     //mob_lo
-    read_u32le(f);
+    read_u32(f);
 
-    add_date(p, "last_modified", read_u32le(f));
+    add_date(p, "last_modified", read_u32(f));
     add_uint(p, "mob_type_id", read_u8(f));
-    add_int(p, "usage_code", read_u32le(f));
-    add_object_ref(p, "descriptor", read_u32le(f));
+    add_int(p, "usage_code", read_u32(f));
+    add_object_ref(p, "descriptor", read_u32(f));
 
     while (iter_ext(f)) {
         uint8_t tag = read_u8(f);
         switch (tag) {
             case 0x01:
                 read_assert_tag(f, 71);
-                add_date(p, "creation_time", read_u32le(f));
+                add_date(p, "creation_time", read_u32(f));
                 break;
             case 0x02:
                 read_mob_id(p, f, "mob_id");
@@ -839,22 +1047,136 @@ static int read_composition(Buffer *f, Properties *p)
     return 0;
 }
 
+// name, mob_type_id, usage_code, mob_id, last_modified and length of a CMPO
+static int read_composition_summary(Buffer *f, CompositionSummary *c)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x03);
+
+    // left_bob, right_bob, media_kind_id, edit_rate
+    skip(f, 4 + 4 + 2 + 6);
+    read_data16(f, c->name);
+    // effect_id
+    uint16_t size = read_u16(f);
+    if (size < 65535)
+        skip(f, size);
+    // attributes, session_attrs, precomputed
+    skip(f, 4 + 4 + 4);
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 72);
+                skip(f, 4);
+                break;
+            default:
+                fprintf(stderr, "unknown ext tag: %d\n", tag);
+                f->error_message = ASSERT_MESSAGE;
+                return -1;
+        }
+    }
+
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x08);
+
+    // mc_mode
+    skip(f, 1);
+    c->length = (int32_t)read_u32(f);
+    // num_scalars
+    skip(f, 4);
+
+    int32_t track_count =  (int32_t)read_u32(f);
+    for (int i = 0; i < track_count; i++) {
+        uint16_t flags = read_u16(f);
+
+        if (flags & TRACK_UNKNOWN_FLAGS) {
+            fprintf(stderr, "Unknown Track Flag: %d\n", flags);
+            f->error_message = ASSERT_MESSAGE;
+            return -1;
+        }
+
+        size_t track_size = 0;
+        if (flags & TRACK_LABEL_FLAG)            track_size += 2;
+        if (flags & TRACK_ATTRIBUTES_FLAG)       track_size += 4;
+        if (flags & TRACK_SESSION_ATTR_FLAG)     track_size += 4;
+        if (flags & TRACK_COMPONENT_FLAG)        track_size += 4;
+        if (flags & TRACK_FILLER_PROXY_FLAG)     track_size += 4;
+        if (flags & TRACK_BOB_DATA_FLAG)         track_size += 4;
+        if (flags & TRACK_CONTROL_CODE_FLAG)     track_size += 2;
+        if (flags & TRACK_CONTROL_SUB_CODE_FLAG) track_size += 2;
+        if (flags & TRACK_START_POS_FLAG)        track_size += 4;
+        if (flags & TRACK_READ_ONLY_FLAG)        track_size += 1;
+        skip(f, track_size);
+    }
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                // lock_number, tag and int16 per track
+                skip(f, 3 * track_count);
+                break;
+            default:
+                fprintf(stderr, "unknown ext tag: %d\n", tag);
+                f->error_message = ASSERT_MESSAGE;
+                return -1;
+        }
+    }
+
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x02);
+
+    // mob_hi, mob_lo
+    skip(f, 4 + 4);
+
+    c->last_modified = read_u32(f);
+    c->mob_type_id = read_u8(f);
+    c->usage_code = (int32_t)read_u32(f);
+    // descriptor
+    skip(f, 4);
+
+    c->has_mob_id = false;
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 71);
+                skip(f, 4);
+                break;
+            case 0x02:
+                check(read_mob_id_data(f, c->mob_id));
+                c->has_mob_id = true;
+                break;
+            default:
+                fprintf(stderr, "unknown ext tag: %d\n", tag);
+                f->error_message = ASSERT_MESSAGE;
+                return -1;
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+
+    return 0;
+}
+
 static int read_media_descriptor(Buffer *f,  Properties *p)
 {
     read_assert_tag(f, 0x02);
     read_assert_tag(f, 0x03);
 
     add_uint(p, "mob_kind", read_u8(f));
-    add_object_ref(p, "locator", read_u32le(f));
+    add_object_ref(p, "locator", read_u32(f));
     add_bool(p, "intermediate", read_bool(f));
-    add_object_ref(p, "physical_media", read_u32le(f));
+    add_object_ref(p, "physical_media", read_u32(f));
 
     while (iter_ext(f)) {
         uint8_t tag = read_u8(f);
 
         if(tag == 0x01) {
             read_assert_tag(f, 65);
-            uint32_t uuid_len = read_u32le(f);
+            uint32_t uuid_len = read_u32(f);
             if (uuid_len != 16) {
                 fprintf(stderr, "bad uuid len: %d\n", uuid_len);
                 f->error_message = ASSERT_MESSAGE;
@@ -867,7 +1189,7 @@ static int read_media_descriptor(Buffer *f,  Properties *p)
             read_data32(f, data);
         } else if (tag == 0x03 ) {
             read_assert_tag(f, 72);
-            add_object_ref(p, "attributes", read_u32le(f));
+            add_object_ref(p, "attributes", read_u32(f));
         } else {
             fprintf(stderr, "unknown ext tag: %d\n", tag);
             f->error_message = ASSERT_MESSAGE;
@@ -885,9 +1207,9 @@ static int read_media_file_descriptor(Buffer *f,  Properties *p)
     read_assert_tag(f, 0x03);
 
     add_double(p, "edit_rate", read_exp10_encoded_float(f));
-    add_int(p, "length",      (int32_t)read_u32le(f));
-    add_int(p, "is_omfi",     (int16_t)read_u16le(f));
-    add_int(p, "data_offset", (int32_t)read_u32le(f));
+    add_int(p, "length",      (int32_t)read_u32(f));
+    add_int(p, "is_omfi",     (int16_t)read_u16(f));
+    add_int(p, "data_offset", (int32_t)read_u32(f));
 
     return 0;
 }
@@ -898,176 +1220,175 @@ static int read_did_descriptor(Buffer *f,  Properties *p)
     read_assert_tag(f, 0x02);
     read_assert_tag(f, 0x02);
 
-    add_int(p, "stored_height",      (int32_t)read_u32le(f));
-    add_int(p, "stored_width",       (int32_t)read_u32le(f));
+    add_int(p, "stored_height",      (int32_t)read_u32(f));
+    add_int(p, "stored_width",       (int32_t)read_u32(f));
 
-    add_int(p, "sampled_height",     (int32_t)read_u32le(f));
-    add_int(p, "sampled_width",      (int32_t)read_u32le(f));
+    add_int(p, "sampled_height",     (int32_t)read_u32(f));
+    add_int(p, "sampled_width",      (int32_t)read_u32(f));
 
-    add_int(p, "sampled_x_offset",   (int32_t)read_u32le(f));
-    add_int(p, "sampled_y_offset",   (int32_t)read_u32le(f));
+    add_int(p, "sampled_x_offset",   (int32_t)read_u32(f));
+    add_int(p, "sampled_y_offset",   (int32_t)read_u32(f));
 
-    add_int(p, "display_height",     (int32_t)read_u32le(f));
-    add_int(p, "display_width",      (int32_t)read_u32le(f));
+    add_int(p, "display_height",     (int32_t)read_u32(f));
+    add_int(p, "display_width",      (int32_t)read_u32(f));
 
-    add_int(p, "display_x_offset",   (int32_t)read_u32le(f));
-    add_int(p, "display_y_offset",   (int32_t)read_u32le(f));
+    add_int(p, "display_x_offset",   (int32_t)read_u32(f));
+    add_int(p, "display_y_offset",   (int32_t)read_u32(f));
 
-    add_int(p, "frame_layout",       (int16_t)read_u16le(f));
+    add_int(p, "frame_layout",       (int16_t)read_u16(f));
 
     vector<int64_t> &aspect = add_int_array(p, "aspect_ratio");
-    aspect.push_back((int32_t)read_u32le(f));
-    aspect.push_back((int32_t)read_u32le(f));
+    aspect.push_back((int32_t)read_u32(f));
+    aspect.push_back((int32_t)read_u32(f));
 
     vector<int64_t> &line_map = add_int_array(p, "line_map");
 
-    size_t line_map_byte_size = read_u32le(f);
+    size_t line_map_byte_size = read_u32(f);
     for (size_t i = 0; i < line_map_byte_size/4; i++) {
-        line_map.push_back((int32_t)read_u32le(f));
+        line_map.push_back((int32_t)read_u32(f));
     }
 
-    add_int(p, "alpha_transparency",   (int32_t)read_u32le(f));
+    add_int(p, "alpha_transparency",   (int32_t)read_u32(f));
     add_bool(p, "uniformness",         read_bool(f));
-    add_int(p, "did_image_size",       (int32_t)read_u32le(f));
+    add_int(p, "did_image_size",       (int32_t)read_u32(f));
 
-    add_object_ref(p, "next_did_desc", read_u32le(f));
+    add_object_ref(p, "next_did_desc", read_u32(f));
 
     vector<uint8_t> &compress_method = add_bytearray(p, "compress_method");
-    compress_method.resize(4);
-    compress_method[3] = read_u8(f);
-    compress_method[2] = read_u8(f);
-    compress_method[1] = read_u8(f);
-    compress_method[0] = read_u8(f);
+    check(read_bytes(f, compress_method, 4));
+    // fourcc
+    if (!f->big_endian)
+        std::reverse(compress_method.begin(), compress_method.end());
 
-    add_int(p, "resolution_id",          (int32_t)read_u32le(f));
-    add_int(p, "image_alignment_factor", (int32_t)read_u32le(f));
+    add_int(p, "resolution_id",          (int32_t)read_u32(f));
+    add_int(p, "image_alignment_factor", (int32_t)read_u32(f));
 
     while (iter_ext(f)) {
         uint8_t tag = read_u8(f);
 
         if(tag == 0x01) {
             read_assert_tag(f, 69);
-            add_int(p, "frame_index_byte_order", (int16_t)read_u16le(f));
+            add_int(p, "frame_index_byte_order", (int16_t)read_u16(f));
 
         } else if (tag == 0x02) {
             read_assert_tag(f, 71);
-            add_int(p, "frame_sample_size", (int32_t)read_u32le(f));
+            add_int(p, "frame_sample_size", (int32_t)read_u32(f));
 
         } else if (tag == 0x03) {
             read_assert_tag(f, 71);
-            add_int(p, "first_frame_offset", (int32_t)read_u32le(f));
+            add_int(p, "first_frame_offset", (int32_t)read_u32(f));
 
         } else if (tag == 0x04) {
             read_assert_tag(f, 71);
-            add_int(p, "client_fill_start", (int32_t)read_u32le(f));
+            add_int(p, "client_fill_start", (int32_t)read_u32(f));
 
             read_assert_tag(f, 71);
-            add_int(p, "client_fill_end", (int32_t)read_u32le(f));
+            add_int(p, "client_fill_end", (int32_t)read_u32(f));
 
         } else if (tag == 0x05) {
             read_assert_tag(f, 71);
-            add_int(p, "offset_to_rle_frame_index", (int32_t)read_u32le(f));
+            add_int(p, "offset_to_rle_frame_index", (int32_t)read_u32(f));
 
         } else if (tag == 0x06) {
             read_assert_tag(f, 71);
-            add_int(p, "frame_start_offset", (int32_t)read_u32le(f));
+            add_int(p, "frame_start_offset", (int32_t)read_u32(f));
 
         } else if (tag == 0x08) {
-            vector<int64_t> &valid_box = add_int_array(p, "valid_box");
+            vector<int64_t> &valid_box = add_int_array(p, "valid_box", 2);
             valid_box.reserve(8);
 
             read_assert_tag(f, 71);
-            valid_box.push_back((int32_t)read_u32le(f));
+            valid_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            valid_box.push_back((int32_t)read_u32le(f));
+            valid_box.push_back((int32_t)read_u32(f));
 
             read_assert_tag(f, 71);
-            valid_box.push_back((int32_t)read_u32le(f));
+            valid_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            valid_box.push_back((int32_t)read_u32le(f));
+            valid_box.push_back((int32_t)read_u32(f));
 
             read_assert_tag(f, 71);
-            valid_box.push_back((int32_t)read_u32le(f));
+            valid_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            valid_box.push_back((int32_t)read_u32le(f));
+            valid_box.push_back((int32_t)read_u32(f));
 
             read_assert_tag(f, 71);
-            valid_box.push_back((int32_t)read_u32le(f));
+            valid_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            valid_box.push_back((int32_t)read_u32le(f));
+            valid_box.push_back((int32_t)read_u32(f));
 
-            vector<int64_t> &essence_box = add_int_array(p, "essence_box");
+            vector<int64_t> &essence_box = add_int_array(p, "essence_box", 2);
             essence_box.reserve(8);
 
             read_assert_tag(f, 71);
-            essence_box.push_back((int32_t)read_u32le(f));
+            essence_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            essence_box.push_back((int32_t)read_u32le(f));
+            essence_box.push_back((int32_t)read_u32(f));
 
             read_assert_tag(f, 71);
-            essence_box.push_back((int32_t)read_u32le(f));
+            essence_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            essence_box.push_back((int32_t)read_u32le(f));
+            essence_box.push_back((int32_t)read_u32(f));
 
             read_assert_tag(f, 71);
-            essence_box.push_back((int32_t)read_u32le(f));
+            essence_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            essence_box.push_back((int32_t)read_u32le(f));
+            essence_box.push_back((int32_t)read_u32(f));
 
             read_assert_tag(f, 71);
-            essence_box.push_back((int32_t)read_u32le(f));
+            essence_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            essence_box.push_back((int32_t)read_u32le(f));
+            essence_box.push_back((int32_t)read_u32(f));
 
-            vector<int64_t> &source_box = add_int_array(p, "source_box");
+            vector<int64_t> &source_box = add_int_array(p, "source_box", 2);
             source_box.reserve(8);
 
             read_assert_tag(f, 71);
-            source_box.push_back((int32_t)read_u32le(f));
+            source_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            source_box.push_back((int32_t)read_u32le(f));
+            source_box.push_back((int32_t)read_u32(f));
 
             read_assert_tag(f, 71);
-            source_box.push_back((int32_t)read_u32le(f));
+            source_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            source_box.push_back((int32_t)read_u32le(f));
+            source_box.push_back((int32_t)read_u32(f));
 
             read_assert_tag(f, 71);
-            source_box.push_back((int32_t)read_u32le(f));
+            source_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            source_box.push_back((int32_t)read_u32le(f));
+            source_box.push_back((int32_t)read_u32(f));
 
             read_assert_tag(f, 71);
-            source_box.push_back((int32_t)read_u32le(f));
+            source_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            source_box.push_back((int32_t)read_u32le(f));
+            source_box.push_back((int32_t)read_u32(f));
 
         } else if (tag == 9) {
-            vector<int64_t> &framing_box = add_int_array(p, "framing_box");
+            vector<int64_t> &framing_box = add_int_array(p, "framing_box", 2);
             framing_box.reserve(8);
 
             read_assert_tag(f, 71);
-            framing_box.push_back((int32_t)read_u32le(f));
+            framing_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            framing_box.push_back((int32_t)read_u32le(f));
+            framing_box.push_back((int32_t)read_u32(f));
 
             read_assert_tag(f, 71);
-            framing_box.push_back((int32_t)read_u32le(f));
+            framing_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            framing_box.push_back((int32_t)read_u32le(f));
+            framing_box.push_back((int32_t)read_u32(f));
 
             read_assert_tag(f, 71);
-            framing_box.push_back((int32_t)read_u32le(f));
+            framing_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            framing_box.push_back((int32_t)read_u32le(f));
+            framing_box.push_back((int32_t)read_u32(f));
 
             read_assert_tag(f, 71);
-            framing_box.push_back((int32_t)read_u32le(f));
+            framing_box.push_back((int32_t)read_u32(f));
             read_assert_tag(f, 71);
-            framing_box.push_back((int32_t)read_u32le(f));
+            framing_box.push_back((int32_t)read_u32(f));
 
             read_assert_tag(f, 71);
-            add_int(p, "reformatting_option", (int32_t)read_u32le(f));
+            add_int(p, "reformatting_option", (int32_t)read_u32(f));
 
         } else if (tag == 10) {
             read_assert_tag(f, 80);
@@ -1100,33 +1421,33 @@ static int read_did_descriptor(Buffer *f,  Properties *p)
     return 0;
 }
 
-static int read_cdci_descriptor(Buffer *f, Properties *p)
+static int read_cdci_descriptor_body(Buffer *f, Properties *p)
 {
     read_did_descriptor(f, p);
     read_assert_tag(f, 0x02);
     read_assert_tag(f, 0x02);
 
-    add_uint(p, "horizontal_subsampling", read_u32le(f));
-    add_uint(p, "vertical_subsampling", read_u32le(f));
-    add_uint(p, "component_width", read_u32le(f));
+    add_uint(p, "horizontal_subsampling", read_u32(f));
+    add_uint(p, "vertical_subsampling", read_u32(f));
+    add_uint(p, "component_width", read_u32(f));
 
-    add_int(p, "color_sitting", (int16_t)read_u16le(f));
-    add_uint(p, "black_ref_level", read_u32le(f));
-    add_uint(p, "white_ref_level", read_u32le(f));
-    add_uint(p, "color_range", read_u32le(f));
+    add_int(p, "color_sitting", (int16_t)read_u16(f));
+    add_uint(p, "black_ref_level", read_u32(f));
+    add_uint(p, "white_ref_level", read_u32(f));
+    add_uint(p, "color_range", read_u32(f));
 
-    add_int(p, "frame_index_offset", (int64_t)read_u64le(f));
+    add_int(p, "frame_index_offset", (int64_t)read_u64(f));
 
     while (iter_ext(f)) {
         uint8_t tag = read_u8(f);
         switch (tag) {
             case 0x01:
                 read_assert_tag(f, 72);
-                add_uint(p, "alpha_sampled_width", read_u32le(f));
+                add_uint(p, "alpha_sampled_width", read_u32(f));
                 break;
             case 0x02:
                 read_assert_tag(f, 72);
-                add_uint(p, "ignore_bw", read_u32le(f));
+                add_uint(p, "ignore_bw", read_u32(f));
                 break;
             default:
                 fprintf(stderr, "unknown tag type: %d\n", tag);
@@ -1134,6 +1455,12 @@ static int read_cdci_descriptor(Buffer *f, Properties *p)
                 return -1;
         }
     }
+    return 0;
+}
+
+static int read_cdci_descriptor(Buffer *f, Properties *p)
+{
+    check(read_cdci_descriptor_body(f, p));
     read_assert_tag(f, 0x03);
     return 0;
 }
@@ -1143,15 +1470,16 @@ static int read_effectparamlist(Buffer *f, Properties *p)
     read_assert_tag(f, 0x02);
     read_assert_tag(f, 0x12);
 
-    add_int(p, "orig_length",    (int32_t)read_u32le(f));
-    add_int(p, "window_offset",  (int32_t)read_u32le(f));
+    add_int(p, "orig_length",    (int32_t)read_u32(f));
+    add_int(p, "window_offset",  (int32_t)read_u32(f));
 
-    uint32_t parameter_count = read_u32le(f);
-    add_int(p, "keyframe_size",  (int32_t)read_u32le(f));
+    uint32_t parameter_count = read_u32(f);
+    add_int(p, "keyframe_size",  (int32_t)read_u32(f));
 
     p->children.push_back(Properties::ChildData());
     Properties::ChildData &child = p->children[ p->children.size()-1];
     child.name = "parameters";
+    p->order.push_back(child.name);
 
     vector <Properties> &parameters = child.data;
     parameters.resize(parameter_count);
@@ -1161,53 +1489,53 @@ static int read_effectparamlist(Buffer *f, Properties *p)
         Properties &param = parameters[i];
         param.type = PARAM;
 
-        add_int(&param, "percent_time",  (int32_t)read_u32le(f));
-        add_int(&param, "level",         (int32_t)read_u32le(f));
-        add_int(&param, "pos_x",         (int32_t)read_u32le(f));
-        add_int(&param, "floor_x",       (int32_t)read_u32le(f));
-        add_int(&param, "ceil_x",        (int32_t)read_u32le(f));
-        add_int(&param, "pos_y",         (int32_t)read_u32le(f));
-        add_int(&param, "floor_y",       (int32_t)read_u32le(f));
-        add_int(&param, "ceil_y",        (int32_t)read_u32le(f));
-        add_int(&param, "scale_x",       (int32_t)read_u32le(f));
-        add_int(&param, "scale_y",       (int32_t)read_u32le(f));
-
-        add_int(&param, "crop_left",      (int32_t)read_u32le(f));
-        add_int(&param, "crop_right",     (int32_t)read_u32le(f));
-        add_int(&param, "crop_top",       (int32_t)read_u32le(f));
-        add_int(&param, "crop_bottom",    (int32_t)read_u32le(f));
+        add_int(&param, "percent_time",  (int32_t)read_u32(f));
+        add_int(&param, "level",         (int32_t)read_u32(f));
+        add_int(&param, "pos_x",         (int32_t)read_u32(f));
+        add_int(&param, "floor_x",       (int32_t)read_u32(f));
+        add_int(&param, "ceil_x",        (int32_t)read_u32(f));
+        add_int(&param, "pos_y",         (int32_t)read_u32(f));
+        add_int(&param, "floor_y",       (int32_t)read_u32(f));
+        add_int(&param, "ceil_y",        (int32_t)read_u32(f));
+        add_int(&param, "scale_x",       (int32_t)read_u32(f));
+        add_int(&param, "scale_y",       (int32_t)read_u32(f));
+
+        add_int(&param, "crop_left",      (int32_t)read_u32(f));
+        add_int(&param, "crop_right",     (int32_t)read_u32(f));
+        add_int(&param, "crop_top",       (int32_t)read_u32(f));
+        add_int(&param, "crop_bottom",    (int32_t)read_u32(f));
 
         vector<int64_t> &box = add_int_array(&param, "box");
         box.reserve(4);
-        box.push_back((int32_t)read_u32le(f));
-        box.push_back((int32_t)read_u32le(f));
-        box.push_back((int32_t)read_u32le(f));
-        box.push_back((int32_t)read_u32le(f));
+        box.push_back((int32_t)read_u32(f));
+        box.push_back((int32_t)read_u32(f));
+        box.push_back((int32_t)read_u32(f));
+        box.push_back((int32_t)read_u32(f));
 
         add_bool(&param, "box_xscale", read_bool(f));
         add_bool(&param, "box_yscale", read_bool(f));
         add_bool(&param, "box_xpos",   read_bool(f));
         add_bool(&param, "box_ypos",   read_bool(f));
 
-        add_int(&param, "border_width",  (int32_t)read_u32le(f));
-        add_int(&param, "border_soft",   (int32_t)read_u32le(f));
+        add_int(&param, "border_width",  (int32_t)read_u32(f));
+        add_int(&param, "border_soft",   (int32_t)read_u32(f));
 
-        add_int(&param, "splill_gain2",   (int16_t)read_u16le(f));
-        add_int(&param, "splill_gain",    (int16_t)read_u16le(f));
-        add_int(&param, "splill_soft2",   (int16_t)read_u16le(f));
-        add_int(&param, "splill_soft",    (int16_t)read_u16le(f));
+        add_int(&param, "splill_gain2",   (int16_t)read_u16(f));
+        add_int(&param, "splill_gain",    (int16_t)read_u16(f));
+        add_int(&param, "splill_soft2",   (int16_t)read_u16(f));
+        add_int(&param, "splill_soft",    (int16_t)read_u16(f));
 
         add_int(&param, "enable_key_flags",   (int8_t)read_u8(f));
 
-        uint32_t color_count =read_u32le(f);
+        uint32_t color_count =read_u32(f);
         vector<int64_t> &colors = add_int_array(&param, "colors");
         colors.reserve(color_count);
 
         for (size_t j=0; j < color_count; j++) {
-            colors.push_back((int32_t)read_u32le(f));
+            colors.push_back((int32_t)read_u32(f));
         }
 
-        uint32_t param_size = read_u32le(f);
+        uint32_t param_size = read_u32(f);
         vector<uint8_t> &user_param = add_bytearray(&param, "user_param");
         user_param.resize(param_size);
         for (size_t j=0; j < param_size; j++) {
@@ -1229,7 +1557,7 @@ static int read_attributes(Buffer *f, std::vector<AttrData> &d)
     read_assert_tag(f, 0x02);
     read_assert_tag(f, 0x01);
 
-    size_t attr_count = read_u32le(f);
+    size_t attr_count = read_u32(f);
     d.resize(attr_count);
 
     if (attr_count == 0)
@@ -1238,17 +1566,17 @@ static int read_attributes(Buffer *f, std::vector<AttrData> &d)
     AttrData *ptr = &d[0];
 
     for(size_t i =0; i < attr_count; i++) {
-        ptr->type = (AttrType)read_u32le(f);
+        ptr->type = (AttrType)read_u32(f);
         read_data16(f, ptr->name);
         switch (ptr->type) {
             case INT_ATTR:
-                ptr->value = read_u32le(f);
+                ptr->value = read_u32(f);
                 break;
             case STR_ATTR:
                 read_data16(f, ptr->data);
                 break;
             case OBJ_ATTR:
-                ptr->value = read_u32le(f);
+                ptr->value = read_u32(f);
                 break;
             case BOB_ATTR:
                 read_data32(f, ptr->data);
@@ -1264,3 +1592,1385 @@ static int read_attributes(Buffer *f, std::vector<AttrData> &d)
 
     return 0;
 }
+
+#define unknown_ext_tag(f, tag) \
+    fprintf(stderr, "unknown ext tag: %d\n", tag); \
+    f->error_message = ASSERT_MESSAGE; \
+    return -1; \
+
+// list classes, the references are stored in a reflist named "items"
+
+static int read_parameterlist(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    int32_t count = (int32_t)read_u32(f);
+    vector<uint32_t> &items = add_reflist(p, "items");
+    for (int32_t i = 0; i < count; i++) {
+        items.push_back(read_u32(f));
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_timecrumblist(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    int16_t count = (int16_t)read_u16(f);
+    vector<uint32_t> &items = add_reflist(p, "items");
+    for (int16_t i = 0; i < count; i++) {
+        items.push_back(read_u32(f));
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+// components
+
+static int read_timecode(Buffer *f, Properties *p)
+{
+    check(read_clip(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    add_uint(p, "flags", read_u32(f));
+    add_uint(p, "fps", read_u16(f));
+
+    // unused
+    skip(f, 6);
+
+    add_uint(p, "start", read_u32(f));
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_edgecode(Buffer *f, Properties *p)
+{
+    check(read_clip(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    check(add_bytes(p, f, "header", 8));
+    add_uint(p, "film_kind", read_u8(f));
+    add_uint(p, "code_format", read_u8(f));
+    add_uint(p, "base_perf", read_u16(f));
+
+    // unused
+    read_u32(f);
+
+    add_int(p, "start_ec", (int32_t)read_u32(f));
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_controlclip(Buffer *f, Properties *p)
+{
+    check(read_clip(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x03);
+
+    add_int(p, "interp_kind", (int32_t)read_u32(f));
+    int32_t count = (int32_t)read_u32(f);
+    if (count < 0) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+
+    vector<Properties> &control_points = add_children(p, "control_points", CONTROL_POINT, count);
+    for (int32_t i = 0; i < count; i++) {
+        Properties &cp = control_points[i];
+
+        vector<int64_t> &offset = add_int_array(&cp, "offset");
+        offset.push_back((int32_t)read_u32(f));
+        offset.push_back((int32_t)read_u32(f));
+        add_int(&cp, "time_scale", (int32_t)read_u32(f));
+
+        // has value
+        read_assert_tag(f, 0x01);
+
+        vector<int64_t> &value = add_int_array(&cp, "value");
+        value.push_back((int32_t)read_u32(f));
+        value.push_back((int32_t)read_u32(f));
+
+        int16_t pp_count = (int16_t)read_u16(f);
+        if (pp_count < 0) {
+            f->error_message = ASSERT_MESSAGE;
+            return -1;
+        }
+
+        vector<Properties> &pp_list = add_children(&cp, "pp", CONTROL_POINT_PROPERTY, pp_count);
+        for (int16_t j = 0; j < pp_count; j++) {
+            Properties &pp = pp_list[j];
+            add_int(&pp, "code", (int16_t)read_u16(f));
+            vector<int64_t> &pp_value = add_int_array(&pp, "value");
+            pp_value.push_back((int32_t)read_u32(f));
+            pp_value.push_back((int32_t)read_u32(f));
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+// track groups
+
+static int read_trackgroup_only(Buffer *f, Properties *p)
+{
+    check(read_trackgroup(f, p));
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_panvolume(Buffer *f, Properties *p)
+{
+    check(read_trackeffect(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x05);
+
+    add_int(p, "level", (int32_t)read_u32(f));
+    add_int(p, "pan",   (int32_t)read_u32(f));
+    add_bool(p, "suppress_validation", read_bool(f));
+    add_bool(p, "level_set", read_bool(f));
+    add_bool(p, "pan_set", read_bool(f));
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 71);
+                add_int(p, "supports_seperate_gain", (int32_t)read_u32(f));
+                break;
+            case 0x02:
+                read_assert_tag(f, 71);
+                add_int(p, "is_trim_gain_effect", (int32_t)read_u32(f));
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_audiosuite(Buffer *f, Properties *p)
+{
+    check(read_trackeffect(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    int32_t plugin_count = (int32_t)read_u32(f);
+    if (plugin_count < 0) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+
+    vector<Properties> &plugins = add_children(p, "plugins", ASPI_PLUGIN, plugin_count);
+    for (int32_t i = 0; i < plugin_count; i++) {
+        Properties &plugin = plugins[i];
+        add_stripped_string(&plugin, f, "name", MACROMAN);
+        add_uint(&plugin, "manufacturer_id", read_u32(f));
+        add_uint(&plugin, "product_id", read_u32(f));
+        add_uint(&plugin, "plugin_id", read_u32(f));
+
+        int32_t chunk_count = (int32_t)read_u32(f);
+        if (chunk_count < 0) {
+            f->error_message = ASSERT_MESSAGE;
+            return -1;
+        }
+
+        vector<Properties> &chunks = add_children(&plugin, "chunks", ASPI_PLUGIN_CHUNK, chunk_count);
+        for (int32_t j = 0; j < chunk_count; j++) {
+            Properties &chunk = chunks[j];
+            int32_t chunk_size = (int32_t)read_u32(f);
+            if (chunk_size < 0) {
+                f->error_message = ASSERT_MESSAGE;
+                return -1;
+            }
+            add_int(&chunk, "version", (int32_t)read_u32(f));
+            add_uint(&chunk, "manufacturer_id", read_u32(f));
+            add_uint(&chunk, "product_id", read_u32(f));
+            add_uint(&chunk, "plugin_id", read_u32(f));
+            add_uint(&chunk, "chunk_id", read_u32(f));
+            add_stripped_string(&chunk, f, "name", MACROMAN);
+            check(add_bytes(&chunk, f, "data", chunk_size));
+        }
+    }
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                // mob_hi and mob_lo, unused
+                read_assert_tag(f, 71);
+                read_u32(f);
+                read_assert_tag(f, 71);
+                read_u32(f);
+                break;
+            case 0x02:
+                read_assert_tag(f, 77);
+                add_int(p, "mark_in", (int64_t)read_u64(f));
+                break;
+            case 0x03:
+                read_assert_tag(f, 77);
+                add_int(p, "mark_out", (int64_t)read_u64(f));
+                break;
+            case 0x04:
+                read_assert_tag(f, 72);
+                add_int(p, "tracks_to_affect", (int32_t)read_u32(f));
+                break;
+            case 0x05:
+                read_assert_tag(f, 71);
+                add_int(p, "rendering_mode", (int32_t)read_u32(f));
+                break;
+            case 0x06:
+                read_assert_tag(f, 71);
+                add_int(p, "padding_secs", (int32_t)read_u32(f));
+                break;
+            case 0x08:
+                check(read_mob_id(p, f, "mob_id"));
+                break;
+            case 0x09: {
+                read_assert_tag(f, 72);
+                uint32_t preset_path_length = read_u32(f);
+                if (preset_path_length > 0) {
+                    read_assert_tag(f, 65);
+                    if (read_u32(f) != preset_path_length) {
+                        f->error_message = ASSERT_MESSAGE;
+                        return -1;
+                    }
+                }
+                check(add_bytes(p, f, "preset_path", preset_path_length));
+                break;
+            }
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_equalizer(Buffer *f, Properties *p)
+{
+    check(read_trackeffect(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x05);
+
+    int32_t band_count = (int32_t)read_u32(f);
+    if (band_count < 0) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+
+    vector<Properties> &bands = add_children(p, "bands", EQUALIZER_BAND, band_count);
+    for (int32_t i = 0; i < band_count; i++) {
+        Properties &band = bands[i];
+        add_int(&band, "type", (int32_t)read_u32(f));
+        add_int(&band, "freq", (int32_t)read_u32(f));
+        add_int(&band, "gain", (int32_t)read_u32(f));
+        add_int(&band, "q",    (int32_t)read_u32(f));
+        add_bool(&band, "enable", read_bool(f));
+    }
+
+    add_bool(p, "effect_enable", read_bool(f));
+    add_stripped_string(p, f, "filter_name", MACROMAN);
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_timewarp(Buffer *f, Properties *p)
+{
+    check(read_trackgroup(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x02);
+
+    add_int(p, "phase_offset", (int32_t)read_u32(f));
+    return 0;
+}
+
+static int read_capturemask(Buffer *f, Properties *p)
+{
+    check(read_timewarp(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    add_bool(p, "is_double", read_bool(f));
+    add_uint(p, "mask_bits", read_u32(f));
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_strobe(Buffer *f, Properties *p)
+{
+    check(read_timewarp(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    add_int(p, "strobe_value", (int32_t)read_u32(f));
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_motioneffect(Buffer *f, Properties *p)
+{
+    check(read_timewarp(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x03);
+
+    vector<int64_t> &speed_ratio = add_int_array(p, "speed_ratio");
+    speed_ratio.push_back((int32_t)read_u32(f));
+    speed_ratio.push_back((int32_t)read_u32(f));
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 75);
+                add_double(p, "offset_adjust", read_double(f));
+                break;
+            case 0x02:
+                read_assert_tag(f, 72);
+                add_object_ref(p, "source_param_list", read_u32(f));
+                break;
+            case 0x03:
+                read_assert_tag(f, 66);
+                add_bool(p, "new_source_calculation", read_bool(f));
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_repeat(Buffer *f, Properties *p)
+{
+    check(read_timewarp(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_essencegroup(Buffer *f, Properties *p)
+{
+    check(read_trackgroup(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 71);
+                add_int(p, "rep_set_type", (int32_t)read_u32(f));
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_transitioneffect(Buffer *f, Properties *p)
+{
+    check(read_trackgroup(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    add_int(p, "cutpoint", (int32_t)read_u32(f));
+
+    // the rest is the same as TKFX
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x05);
+
+    read_effect_info(f, p);
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 72);
+                add_object_ref(p, "trackman", read_u32(f));
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+// bins
+
+static int read_binviewsetting(Buffer *f, Properties *p)
+{
+    // Setting
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x06);
+
+    add_stripped_string(p, f, "name", MACROMAN);
+    add_stripped_string(p, f, "kind", MACROMAN);
+    add_int(p, "attr_count", (int16_t)read_u16(f));
+    add_int(p, "attr_type",  (int16_t)read_u16(f));
+    add_object_ref(p, "attributes", read_u32(f));
+
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 10);
+
+    uint16_t column_count = read_u16(f);
+    vector<Properties> &columns = add_children(p, "columns", DICT, column_count);
+    for (int i = 0; i < column_count; i++) {
+        Properties &column = columns[i];
+        add_stripped_string(&column, f, "title", MACROMAN);
+        add_int(&column, "format", (int16_t)read_u16(f));
+        add_int(&column, "type",   (int16_t)read_u16(f));
+        add_bool(&column, "hidden", read_bool(f));
+    }
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01: {
+                read_assert_tag(f, 69);
+                int16_t count = (int16_t)read_u16(f);
+                if (count < 0) {
+                    f->error_message = ASSERT_MESSAGE;
+                    return -1;
+                }
+
+                vector<Properties> &descriptors = add_children(p, "format_descriptors", DICT, count);
+                for (int i = 0; i < count; i++) {
+                    Properties &d = descriptors[i];
+                    read_assert_tag(f, 69);
+                    add_int(&d, "vcid_free_column_id", (int16_t)read_u16(f));
+                    read_assert_tag(f, 71);
+                    int32_t size = (int32_t)read_u32(f);
+                    read_assert_tag(f, 76);
+                    // utf-8 seems to start with 4 null bytes
+                    read_u32(f);
+
+                    d.strings.push_back(StringData());
+                    StringData &s = d.strings[d.strings.size()-1];
+                    s.name = "format_descriptor";
+                    s.type = UTF8;
+                    d.order.push_back(s.name);
+                    check(read_bytes(f, s.data, size));
+                }
+                break;
+            }
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_bin_body(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x02);
+    uint8_t version = read_u8(f);
+    if (version != 0x0e && version != 0x0f) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+
+    add_bool(p, "large_bin", version == 0x0f);
+    add_object_ref(p, "view_setting", read_u32(f));
+    add_uint(p, "uid", read_u64(f));
+
+    uint32_t object_count;
+    if (version == 0x0e) {
+        object_count = read_u16(f);
+    } else {
+        // large bin size > max u16
+        object_count = read_u32(f);
+    }
+
+    if (object_count > (size_t)(f->end + 1 - f->ptr)) {
+        f->error_message = "read past end of chunk";
+        return -1;
+    }
+
+    vector<Properties> &items = add_children(p, "items", BIN_ITEM, object_count);
+    for (uint32_t i = 0; i < object_count; i++) {
+        Properties &item = items[i];
+        item.refs.reserve(1);
+        item.ints.reserve(3);
+        add_object_ref(&item, "mob", read_u32(f));
+        add_int(&item, "x", (int16_t)read_u16(f));
+        add_int(&item, "y", (int16_t)read_u16(f));
+        add_int(&item, "keyframe", (int32_t)read_u32(f));
+        add_bool(&item, "user_placed", read_bool(f));
+    }
+
+    add_int(p, "display_mask", (int32_t)read_u32(f));
+    add_int(p, "display_mode", (int16_t)read_u16(f));
+
+    add_bool(p, "sifted", read_bool(f));
+
+    vector<Properties> &sifted_settings = add_children(p, "sifted_settings", SIFT_ITEM, 6);
+    for (int i = 0; i < 6; i++) {
+        Properties &s = sifted_settings[i];
+        add_int(&s, "method", (int16_t)read_u16(f));
+        add_stripped_string(&s, f, "string", MACROMAN);
+        add_stripped_string(&s, f, "column", MACROMAN);
+    }
+
+    int16_t sort_column_count = (int16_t)read_u16(f);
+    if (sort_column_count < 0)
+        sort_column_count = 0;
+
+    // [direction, column]
+    vector<Properties> &sort_columns = add_children(p, "sort_columns", LIST, sort_column_count);
+    for (int i = 0; i < sort_column_count; i++) {
+        Properties &col = sort_columns[i];
+        add_uint(&col, "direction", read_u8(f));
+        add_stripped_string(&col, f, "column", MACROMAN);
+    }
+
+    add_int(p, "mac_font",        (int16_t)read_u16(f));
+    add_int(p, "mac_font_size",   (int16_t)read_u16(f));
+    add_int(p, "mac_image_scale", (int16_t)read_u16(f));
+
+    check(read_rect(f, p, "home_rect"));
+    check(read_rgb_color(f, p, "background_color"));
+    check(read_rgb_color(f, p, "forground_color"));
+
+    add_int(p, "ql_image_scale", (int16_t)read_u16(f));
+    add_object_ref(p, "attributes", read_u32(f));
+    add_bool(p, "was_iconic", read_bool(f));
+
+    return 0;
+}
+
+static int read_bin(Buffer *f, Properties *p)
+{
+    check(read_bin_body(f, p));
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_binfirst(Buffer *f, Properties *p)
+{
+    check(read_bin_body(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    add_int(p, "unknown_s32", (int32_t)read_u32(f));
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+// media descriptors
+
+static int read_tape_descriptor(Buffer *f, Properties *p)
+{
+    check(read_media_descriptor(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x02);
+
+    add_int(p, "cframe", (int16_t)read_u16(f));
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+// MDFM and MDNG
+static int read_empty_media_descriptor(Buffer *f, Properties *p)
+{
+    check(read_media_descriptor(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_media_file_descriptor_only(Buffer *f, Properties *p)
+{
+    check(read_media_file_descriptor(f, p));
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_multi_descriptor(Buffer *f, Properties *p)
+{
+    check(read_media_file_descriptor(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    int32_t count = (int32_t)read_u32(f);
+    vector<uint32_t> &descriptors = add_reflist(p, "descriptors");
+    for (int32_t i = 0; i < count; i++) {
+        descriptors.push_back(read_u32(f));
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_wave_descriptor(Buffer *f, Properties *p)
+{
+    check(read_media_file_descriptor(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    read_assert_tag(f, 'R');
+    read_assert_tag(f, 'I');
+    read_assert_tag(f, 'F');
+    read_assert_tag(f, 'F');
+
+    // NOTE: this is suppose to be LE
+    uint32_t size = read_u32le(f);
+    check(add_bytes(p, f, "summary", size));
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_aifc_descriptor(Buffer *f, Properties *p)
+{
+    check(read_media_file_descriptor(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    read_assert_tag(f, 'F');
+    read_assert_tag(f, 'O');
+    read_assert_tag(f, 'R');
+    read_assert_tag(f, 'M');
+
+    // NOTE: this is suppose to be BE
+    uint32_t size = read_u32be(f);
+    check(add_bytes(p, f, "summary", size));
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 71);
+                add_int(p, "data_pos", (int32_t)read_u32(f));
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+// fields shared by PCMA and MPGA
+static int read_audio_descriptor(Buffer *f, Properties *p)
+{
+    check(read_media_file_descriptor(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    add_uint(p, "channels", read_u16(f));
+    add_uint(p, "quantization_bits", read_u16(f));
+    add_double(p, "sample_rate", read_exp10_encoded_float(f));
+
+    add_bool(p, "locked", read_bool(f));
+    add_int(p, "audio_ref_level", (int16_t)read_u16(f));
+    add_int(p, "electro_spatial_formulation", (int32_t)read_u32(f));
+    add_uint(p, "dial_norm", read_u16(f));
+
+    add_uint(p, "coding_format", read_u32(f));
+    return 0;
+}
+
+static int read_pcma_descriptor(Buffer *f, Properties *p)
+{
+    check(read_audio_descriptor(f, p));
+
+    add_uint(p, "block_align", read_u32(f));
+
+    add_uint(p, "sequence_offset", read_u16(f));
+    add_uint(p, "average_bps", read_u32(f));
+    add_bool(p, "has_peak_envelope_data", read_bool(f));
+
+    add_int(p, "peak_envelope_version",    (int32_t)read_u32(f));
+    add_int(p, "peak_envelope_format",     (int32_t)read_u32(f));
+    add_int(p, "points_per_peak_value",    (int32_t)read_u32(f));
+    add_int(p, "peak_envelope_block_size", (int32_t)read_u32(f));
+    add_int(p, "peak_channel_count",       (int32_t)read_u32(f));
+    add_int(p, "peak_frame_count",         (int32_t)read_u32(f));
+    add_uint(p, "peak_of_peaks_offset",    read_u64(f));
+    add_int(p, "peak_envelope_timestamp",  (int32_t)read_u32(f));
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 77);
+                add_int(p, "ebu_timestamp", (int64_t)read_u64(f));
+                break;
+            case 0x03:
+                read_assert_tag(f, 76);
+                // yes this is a string!
+                add_stripped_string(p, f, "timecode_framerate", MACROMAN);
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_mpga_descriptor(Buffer *f, Properties *p)
+{
+    check(read_audio_descriptor(f, p));
+
+    add_uint(p, "bit_rate", read_u32(f));
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 77);
+                add_uint(p, "sub_frame_alignment", read_u64(f));
+                break;
+            case 0x02:
+                read_assert_tag(f, 77);
+                add_uint(p, "origin", read_u64(f));
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_mpgi_descriptor(Buffer *f, Properties *p)
+{
+    check(read_cdci_descriptor_body(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    add_uint(p, "mpeg_version",  read_u8(f));
+    add_uint(p, "profile",       read_u8(f));
+    add_uint(p, "gop_structure", read_u8(f));
+    add_uint(p, "stream_type",   read_u8(f));
+    add_bool(p, "random_access",    read_bool(f));
+    add_bool(p, "leading_discard",  read_bool(f));
+    add_bool(p, "trailing_discard", read_bool(f));
+    add_uint(p, "min_gop_length", read_u16(f));
+    add_uint(p, "max_gop_length", read_u16(f));
+
+    int32_t hdrlen = (int32_t)read_u32(f);
+    if (hdrlen < 0) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+    check(add_bytes(p, f, "sequence_hdr", hdrlen));
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_jpeg_descriptor(Buffer *f, Properties *p)
+{
+    check(read_cdci_descriptor_body(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    add_int(p, "jpeg_table_id", (int32_t)read_u32(f));
+    add_uint(p, "jpeg_frame_index_offset", read_u64(f));
+
+    int32_t table_size = (int32_t)read_u32(f);
+    if (table_size < 0) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+    check(add_bytes(p, f, "quantization_tables", table_size));
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 71);
+                add_int(p, "image_start_align", (int32_t)read_u32(f));
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_rgba_descriptor(Buffer *f, Properties *p)
+{
+    check(read_did_descriptor(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    // this seems to be encode the same way as in AAF
+    vector<uint8_t> pixel_layout;
+    vector<uint8_t> pixel_struct;
+    check(read_bytes(f, pixel_layout, read_u32(f)));
+    check(read_bytes(f, pixel_struct, read_u32(f)));
+
+    if (pixel_layout.size() != pixel_struct.size()) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+
+    vector<Properties> &layout = add_children(p, "pixel_layout", DICT, pixel_layout.size());
+    for (size_t i = 0; i < pixel_layout.size(); i++) {
+        add_uint(&layout[i], "Code", pixel_layout[i]);
+        add_uint(&layout[i], "Size", pixel_struct[i]);
+    }
+
+    // palette_layout_size, palette_struct_size and palette_size
+    for (int i = 0; i < 3; i++) {
+        if (read_u32(f) != 0) {
+            f->error_message = ASSERT_MESSAGE;
+            return -1;
+        }
+    }
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 77);
+                add_uint(p, "frame_index_offset", read_u64(f));
+                break;
+            case 0x02:
+                read_assert_tag(f, 66);
+                add_bool(p, "has_comp_min_ref", read_bool(f));
+                read_assert_tag(f, 72);
+                add_uint(p, "comp_min_ref", read_u32(f));
+                read_assert_tag(f, 66);
+                add_bool(p, "has_comp_max_ref", read_bool(f));
+                read_assert_tag(f, 72);
+                add_uint(p, "comp_max_ref", read_u32(f));
+                break;
+            case 0x03:
+                read_assert_tag(f, 72);
+                add_uint(p, "alpha_min_ref", read_u32(f));
+                read_assert_tag(f, 72);
+                add_uint(p, "alpha_max_ref", read_u32(f));
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_data_descriptor(Buffer *f, Properties *p)
+{
+    check(read_media_file_descriptor(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    add_bool(p, "is_offset_to_frame_indexes_valid", read_bool(f));
+    add_uint(p, "offset_to_frame_indexes", read_u64(f));
+    add_int(p, "first_frame_offset", (int32_t)read_u32(f));
+    add_int(p, "min_sample_size",    (int32_t)read_u32(f));
+    add_int(p, "max_sample_size",    (int32_t)read_u32(f));
+
+    return 0;
+}
+
+static int read_ancdata_descriptor(Buffer *f, Properties *p)
+{
+    check(read_data_descriptor(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    add_int(p, "manifest_element_count", (int32_t)read_u32(f));
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+// locators
+
+static int read_file_locator(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x02);
+
+    add_stripped_string(p, f, "path", MACROMAN);
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 76);
+                add_stripped_string(p, f, "path_posix", MACROMAN);
+                break;
+            case 0x02:
+                read_assert_tag(f, 76);
+                add_stripped_string(p, f, "path_utf8", UTF8);
+                break;
+            case 0x03:
+                read_assert_tag(f, 76);
+                add_stripped_string(p, f, "path2_utf8", UTF8);
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_url_locator(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_msm_locator(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x02);
+
+    // mob_id_hi, mob_id_lo
+    read_u32(f);
+    read_u32(f);
+
+    add_stripped_string(p, f, "last_known_volume", MACROMAN);
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 71);
+                add_int(p, "domain_type", (int32_t)read_u32(f));
+                break;
+            case 0x02:
+                check(read_mob_id(p, f, "mob_id"));
+                break;
+            case 0x03:
+                read_assert_tag(f, 76);
+                add_stripped_string(p, f, "last_known_volume_utf8", UTF8);
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+// effect data
+
+// GRFX and SHLP
+static int read_bytes_object(Buffer *f, Properties *p, const char *name)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    int32_t size = (int32_t)read_u32(f);
+    if (size < 0) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+    check(add_bytes(p, f, name, size));
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_graphic_effect(Buffer *f, Properties *p)
+{
+    return read_bytes_object(f, p, "pict_data");
+}
+
+static int read_shapelist(Buffer *f, Properties *p)
+{
+    return read_bytes_object(f, p, "shape_data");
+}
+
+static int read_colorcorrection(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    int16_t size = (int16_t)read_u16(f);
+    if (size < 0) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+    check(add_bytes(p, f, "color_correction", size));
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_cfuserparam(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    int16_t byte_order = (int16_t)read_u16(f);
+    if (byte_order != 0x4949) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+    add_int(p, "byte_order", byte_order);
+    add_raw_uuid(p, "uuid", f);
+
+    // why twice?
+    int32_t value_size1 = (int32_t)read_u32(f);
+    int32_t value_size2 = (int32_t)read_u32(f);
+    if (value_size2 != value_size1 - 4 || value_size2 < 0) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+    check(add_bytes(p, f, "data", value_size2));
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+// positions
+
+static int read_position(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    // mob_id_hi, mob_id_lo
+    read_u32(f);
+    read_u32(f);
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                check(read_mob_id(p, f, "mob_id"));
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    return 0;
+}
+
+static int read_bob_position(Buffer *f, Properties *p)
+{
+    check(read_position(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    add_int(p, "sample_num",  (int32_t)read_u32(f));
+    add_int(p, "length",      (int32_t)read_u32(f));
+    add_int(p, "track_type",  (int16_t)read_u16(f));
+    add_int(p, "track_index", (int16_t)read_u16(f));
+
+    return 0;
+}
+
+static int read_did_position(Buffer *f, Properties *p)
+{
+    check(read_bob_position(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    add_int(p, "strip", (int32_t)read_u32(f));
+    add_uint(p, "offset", read_u64(f));
+    add_uint(p, "byte_length", read_u64(f));
+    add_bool(p, "spos_invalid", read_bool(f));
+
+    return 0;
+}
+
+static int read_mpg_position(Buffer *f, Properties *p)
+{
+    check(read_did_position(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    add_int(p, "trailing_discards", (int16_t)read_u16(f));
+    add_bool(p, "need_seq_hdr", read_bool(f));
+
+    // [picture_type, length]
+    vector<int64_t> &fields = add_int_array(p, "fields", 2);
+
+    int16_t leader_length = (int16_t)read_u16(f);
+    if (leader_length > 0) {
+        // leading_discard_fields
+        read_u16(f);
+        for (int i = 0; i < leader_length; i++) {
+            fields.push_back(read_u8(f));
+            fields.push_back(read_u32(f));
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+// wraps the read functions above that leave the end tag to subclasses
+#define read_with_end_tag(name, func) \
+static int name(Buffer *f, Properties *p) \
+{ \
+    check(func(f, p)); \
+    read_assert_tag(f, 0x03); \
+    return 0; \
+} \
+
+read_with_end_tag(read_position_only, read_position)
+read_with_end_tag(read_bob_position_only, read_bob_position)
+read_with_end_tag(read_did_position_only, read_did_position)
+read_with_end_tag(read_data_descriptor_only, read_data_descriptor)
+
+// references
+
+static int read_binref(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    add_int(p, "uid_high", (int32_t)read_u32(f));
+    add_int(p, "uid_low",  (int32_t)read_u32(f));
+    add_stripped_string(p, f, "name", MACROMAN);
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 76);
+                add_stripped_string(p, f, "name_utf8", UTF8);
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_mobref_body(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    // mob_hi, mob_lo
+    read_u32(f);
+    read_u32(f);
+
+    add_int(p, "position", (int32_t)read_u32(f));
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                check(read_mob_id(p, f, "mob_id"));
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    return 0;
+}
+
+read_with_end_tag(read_mobref, read_mobref_body)
+
+static int read_marker(Buffer *f, Properties *p)
+{
+    check(read_mobref_body(f, p));
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x03);
+
+    add_int(p, "comp_offset", (int32_t)read_u32(f));
+    add_object_ref(p, "attributes", read_u32(f));
+
+    // version
+    if ((int16_t)read_u16(f) != 1) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+
+    vector<int64_t> &color = add_int_array(p, "color");
+    color.push_back(read_u16(f));
+    color.push_back(read_u16(f));
+    color.push_back(read_u16(f));
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 66);
+                add_bool(p, "handled_codes", read_bool(f));
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+// trackers
+
+static int read_tracker_manager(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    add_object_ref(p, "data_slots",  read_u32(f));
+    add_object_ref(p, "param_slots", read_u32(f));
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_tracker_data_slot(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    int32_t count = (int32_t)read_u32(f);
+    vector<uint32_t> &tracker_data = add_reflist(p, "tracker_data");
+    for (int32_t i = 0; i < count; i++) {
+        tracker_data.push_back(read_u32(f));
+    }
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 66);
+                add_bool(p, "track_fg", read_bool(f));
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_tracker_parameter_slot(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    int16_t size = (int16_t)read_u16(f);
+    if (size < 0) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+    check(add_bytes(p, f, "settings", size));
+
+    int32_t count = (int32_t)read_u32(f);
+    if (count < 0) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+
+    vector<uint32_t> &params = add_reflist(p, "params");
+    for (int32_t i = 0; i < count; i++) {
+        params.push_back(read_u32(f));
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_tracker_data(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    int16_t setting_size = (int16_t)read_u16(f);
+    check(add_bytes(p, f, "settings", setting_size < 0 ? 0 : setting_size));
+    add_uint(p, "clip_version", read_u32(f));
+
+    int16_t count = (int16_t)read_u16(f);
+    vector<uint32_t> &clips = add_reflist(p, "clips");
+    for (int16_t i = 0; i < count; i++) {
+        clips.push_back(read_u32(f));
+    }
+
+    while (iter_ext(f)) {
+        uint8_t tag = read_u8(f);
+        switch (tag) {
+            case 0x01:
+                read_assert_tag(f, 72);
+                add_uint(p, "offset_tracking", read_u32(f));
+                break;
+            case 0x02:
+                read_assert_tag(f, 72);
+                add_uint(p, "smoothing", read_u32(f));
+                break;
+            case 0x03:
+                read_assert_tag(f, 72);
+                add_uint(p, "jitter_removal", read_u32(f));
+                break;
+            case 0x04:
+                read_assert_tag(f, 75);
+                add_double(p, "filter_amount", read_double(f));
+                break;
+            case 0x05:
+                read_assert_tag(f, 72);
+                add_object_ref(p, "clip5", read_u32(f));
+                break;
+            case 0x06:
+                read_assert_tag(f, 72);
+                add_object_ref(p, "clip6", read_u32(f));
+                break;
+            default:
+                unknown_ext_tag(f, tag);
+        }
+    }
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
+
+static int read_tracker_parameter(Buffer *f, Properties *p)
+{
+    read_assert_tag(f, 0x02);
+    read_assert_tag(f, 0x01);
+
+    int16_t size = (int16_t)read_u16(f);
+    if (size < 0) {
+        f->error_message = ASSERT_MESSAGE;
+        return -1;
+    }
+    check(add_bytes(p, f, "settings", size));
+
+    read_assert_tag(f, 0x03);
+    return 0;
+}
@@ -0,0 +1,91 @@
+from __future__ import (
+    unicode_literals,
+    absolute_import,
+    print_function,
+    division,
+    )
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .file import AVBFile
+
+# objects read per executor call by the async iterators
+BATCH_SIZE = 256
+
+# most threads the default executor runs blocking reads on
+MAX_WORKERS = 4
+
+default_executor = None
+
+def get_default_executor():
+    global default_executor
+    if default_executor is None:
+        default_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    return default_executor
+
+async def open(fileobject=None, executor=None, **kwargs):
+    """
+    Opens an AVBFile on the executor and returns it wrapped in an AsyncAVBFile.
+    executor defaults to a shared pool of MAX_WORKERS threads, keyword
+    arguments are passed on to AVBFile.
+    """
+    executor = executor or get_default_executor()
+    loop = asyncio.get_running_loop()
+    f = await loop.run_in_executor(executor, functools.partial(AVBFile, fileobject, **kwargs))
+    return AsyncAVBFile(f, executor)
+
+class AsyncAVBFile(object):
+    """
+    asyncio front end of an AVBFile. Reads and decoding, with the cython
+    READERS when available, run on the executor, the iterators fetch
+    batch_size objects per call so awaiting each object stays cheap. The
+    decoded objects are the regular ones, their attributes and refs can be
+    used synchronously once loaded.
+    """
+    def __init__(self, f, executor=None):
+        self.file = f
+        self.executor = executor or get_default_executor()
+
+    def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.executor, functools.partial(func, *args))
+
+    async def read_object(self, index):
+        return await self.run(self.file.read_object, index)
+
+    async def read_objects(self, indices):
+        return await self.run(self.file.read_objects, indices)
+
+    async def content(self):
+        return await self.run(getattr, self.file, 'content')
+
+    async def class_index(self):
+        return await self.run(getattr, self.file, 'class_index')
+
+    async def iter_class_ids(self, class_id_list, batch_size=BATCH_SIZE):
+        class_index = await self.class_index()
+        indices = []
+        for class_id in set(class_id_list):
+            indices.extend(class_index.get(class_id, ()))
+        indices.sort()
+
+        for start in range(0, len(indices), batch_size):
+            for obj in await self.read_objects(indices[start:start + batch_size]):
+                yield obj
+
+    async def mobs(self, batch_size=BATCH_SIZE):
+        content = await self.content()
+        for start in range(0, len(content.items), batch_size):
+            for mob in await self.run(content.mob_batch, start, batch_size):
+                yield mob
+
+    async def close(self):
+        await self.run(self.file.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
@@ -7,7 +7,7 @@ from __future__ import (
 
 from . import utils
 from . import core
-from .core import AVBPropertyDef, AVBPropertyData, AVBRefList
+from .core import AVBPropertyDef, AVBPropertyData, AVBRefList, PropertyDataBase
 from . utils import peek_data
 
 INT_ATTR  = 1
@@ -22,7 +22,10 @@ if bytes is not str:
 class Attributes(AVBPropertyData):
     class_id = b'ATTR'
     propertydefs = []
-    __slots__ = ('root', 'instance_id', )
+    __slots__ = ('root', 'instance_id')
+    # OrderedDict is weak referenceable already and disallows the slot
+    if PropertyDataBase is dict:
+        __slots__ += ('__weakref__',)
 
     def __new__(cls, *args, **kwargs):
         self = super(Attributes, cls).__new__(cls)
@@ -50,6 +53,21 @@ class Attributes(AVBPropertyData):
         self.mark_modified()
         return result
 
+    # dict's own update, setdefault and popitem don't go through __setitem__
+    def update(self, *args, **kwargs):
+        super(Attributes, self).update(*args, **kwargs)
+        self.mark_modified()
+
+    def setdefault(self, *args, **kwargs):
+        result = super(Attributes, self).setdefault(*args, **kwargs)
+        self.mark_modified()
+        return result
+
+    def popitem(self, *args, **kwargs):
+        result = super(Attributes, self).popitem(*args, **kwargs)
+        self.mark_modified()
+        return result
+
     def read(self, f):
         ctx = self.root.ictx
         ctx.read_assert_tag(f, 0x02)
@@ -125,8 +143,7 @@ class ParameterList(AVBRefList):
 
         count = ctx.read_s32(f)
         for i in range(count):
-            ref = ctx.read_object_ref(self.root, f)
-            self.append(ref)
+            self.append(ctx.read_object_index(self.root, f))
 
         ctx.read_assert_tag(f, 0x03)
 
@@ -153,8 +170,7 @@ class TimeCrumbList(AVBRefList):
 
         count = ctx.read_s16(f)
         for i in range(count):
-            ref = ctx.read_object_ref(self.root, f)
-            self.append(ref)
+            self.append(ctx.read_object_index(self.root, f))
 
         ctx.read_assert_tag(f, 0x03)
 
@@ -377,10 +377,22 @@ class Bin(core.AVBObject):
         bin_item.mob = mob
         self.items.append(bin_item)
 
+    def mob_batch(self, start, count):
+        """
+        Returns the mobs of items[start:start + count], read with a single read_objects.
+        """
+        batch = self.items[start:start + count]
+        if not self.root.debug_copy_refs:
+            refs = [dict.get(item.property_data, 'mob', None) for item in batch]
+            # held so the batch stays in the weak object cache
+            mobs = self.root.read_objects(core.ref_indices(refs))
+        return [item.mob for item in batch]
+
     @property
     def mobs(self):
-        for item in self.items:
-            yield item.mob
+        for start in range(0, len(self.items), core.PREFETCH_SIZE):
+            for mob in self.mob_batch(start, core.PREFETCH_SIZE):
+                yield mob
 
     def toplevel(self):
         for mob in self.mobs:
@@ -160,9 +160,7 @@ class Sequence(Component):
         count = ctx.read_u32(f)
         self.components = AVBRefList.__new__(AVBRefList, root=self.root)
         for i in range(count):
-            ref = ctx.read_object_ref(self.root, f)
-            # print ref
-            self.components.append(ref)
+            self.components.append(ctx.read_object_index(self.root, f))
 
         ctx.read_assert_tag(f, 0x03)
 
@@ -11,9 +11,14 @@ from . import utils
 
 sentinel = object()
 
+# refs AVBRefList and Bin.mobs read ahead with AVBFile.read_objects
+PREFETCH_SIZE = 256
+
 INT_FORMAT = int
+REF_FORMAT = (int, utils.AVBObjectRef)
 if sys.version_info.major < 3:
     INT_FORMAT = (int, long)
+    REF_FORMAT = (int, long, utils.AVBObjectRef)
 
 class AVBPropertyDef(object):
     __slots__ = ('name', 'long_name', 'type', 'default')
@@ -32,7 +37,13 @@ class AVBPropertyDef(object):
 
         return '<%s at 0x%x>' % (s, id(self))
 
-class AVBPropertyData(OrderedDict):
+# dicts keep insertion order from python 3.7 and take a fraction of the memory
+if sys.version_info >= (3, 7):
+    PropertyDataBase = dict
+else:
+    PropertyDataBase = OrderedDict
+
+class AVBPropertyData(PropertyDataBase):
     __slots__ = ()
     def deref(self, value):
         if isinstance(value, utils.AVBObjectRef):
@@ -99,16 +110,43 @@ class AVBRefList(list):
         self.mark_modified()
 
     def deref(self, value):
+        # object indices as read from the file, resolved without a ref object
         if isinstance(value, INT_FORMAT):
-            return utils.AVBObjectRef(self.root, value).value
+            if value <= 0:
+                return None
+            root = self.root
+            if root.debug_copy_refs:
+                return utils.AVBObjectRef(root, value)
+            return root.read_object(value)
 
         if isinstance(value, utils.AVBObjectRef):
             return value.value
         return value
 
+    def resolve(self):
+        """
+        Returns a list of the objects in the list, the ones not alive yet are
+        read with a single AVBFile.read_objects.
+        """
+        return self.resolve_values(list(list.__iter__(self)))
+
+    def resolve_values(self, values):
+        root = self.root
+        if root is None or root.debug_copy_refs:
+            return [self.deref(value) for value in values]
+
+        objects = iter(root.read_objects(ref_indices(values)))
+        return [next(objects) if isinstance(value, REF_FORMAT) else value for value in values]
+
     def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.resolve_values(super(AVBRefList, self).__getitem__(index))
         return self.deref(super(AVBRefList, self).__getitem__(index))
 
+    def __getslice__(self, i, j):
+        # python 2 slices lists without __getitem__
+        return self.__getitem__(slice(i, j))
+
     def __setitem__(self, index, value):
         super(AVBRefList, self).__setitem__(index, value)
         self.mark_modified()
@@ -118,37 +156,138 @@ class AVBRefList(list):
         self.mark_modified()
 
     def __iter__(self):
-        for value in super(AVBRefList, self).__iter__():
-            yield self.deref(value)
+        root = self.root
+        if root is None or root.debug_copy_refs:
+            for value in super(AVBRefList, self).__iter__():
+                yield self.deref(value)
+            return
 
-def walk_references(obj):
+        start = 0
+        while start < len(self):
+            values = list.__getitem__(self, slice(start, start + PREFETCH_SIZE))
+            for obj in self.resolve_values(values):
+                yield obj
+            start += len(values)
 
+def ref_indices(values):
+    indices = []
+    for value in values:
+        if isinstance(value, INT_FORMAT):
+            indices.append(value)
+        elif isinstance(value, utils.AVBObjectRef):
+            indices.append(value.index)
+    return indices
+
+def iter_walk_targets(obj, visited):
+    """
+    Yields what walk_references visits below obj, in order: the objects referenced
+    from obj and the lists items, helper objects and dicts that can hold more refs.
+    Refs to objects in visited are skipped without being dereferenced.
+    """
     if isinstance(obj, list):
-        property_values = obj
+        property_values = list.__iter__(obj)
     elif isinstance(obj, dict):
-        property_values = obj.values()
+        property_values = dict.values(obj)
     elif hasattr(obj, 'property_data'):
-        property_values = obj.property_data.values()
+        property_values = dict.values(obj.property_data)
     else:
-        property_values = []
+        return
 
+    is_reflist = isinstance(obj, AVBRefList)
     for v in property_values:
         if isinstance(v, utils.AVBObjectRef):
+            if v.index in visited:
+                continue
             v = v.value
+        elif is_reflist and isinstance(v, INT_FORMAT):
+            if v in visited:
+                continue
+            v = obj.deref(v)
+
         if v is None:
             continue
 
         if isinstance(v, list):
-            for item in v:
-                for sub_v in walk_references(item):
-                    yield sub_v
+            if isinstance(v, AVBRefList):
+                for item in list.__iter__(v):
+                    if isinstance(item, (utils.AVBObjectRef, INT_FORMAT)):
+                        index = getattr(item, 'index', item)
+                        if index in visited:
+                            continue
+                        item = v.deref(item)
+                    yield item
+            else:
+                for item in v:
+                    yield item
 
         if hasattr(v, 'class_id') and v.class_id:
-            for sub_v in walk_references(v):
-                yield sub_v
+            yield v
+
+def walk_references(obj):
+    """
+    Yields every object reachable from obj once, referenced objects before the
+    objects referring to them (obj itself comes last). Uses an explicit stack so
+    deep graphs do not hit the recursion limit, shared objects are only walked
+    the first time they are reached.
+    """
+    visited = set()
+    instance_id = getattr(obj, 'instance_id', None)
+    if instance_id is not None:
+        visited.add(instance_id)
+
+    stack = [(obj, iter_walk_targets(obj, visited))]
+    while stack:
+        node, targets = stack[-1]
+        for target in targets:
+            if target is None:
+                continue
+            if hasattr(target, 'class_id') and target.class_id:
+                instance_id = getattr(target, 'instance_id', None)
+                if instance_id is not None:
+                    if instance_id in visited:
+                        continue
+                    visited.add(instance_id)
+            elif not isinstance(target, (list, dict)) and not hasattr(target, 'property_data'):
+                continue
+
+            stack.append((target, iter_walk_targets(target, visited)))
+            break
+        else:
+            stack.pop()
+            if hasattr(node, 'class_id') and node.class_id:
+                yield node
+
+def iter_chunk_refs(obj):
+    """
+    Yields the instance ids of the objects written as refs in the chunk of obj,
+    mirroring walk_references but reading the raw values so nothing gets loaded.
+    """
+    is_reflist = isinstance(obj, AVBRefList)
+    if isinstance(obj, list):
+        property_values = list.__iter__(obj)
+    elif isinstance(obj, dict):
+        property_values = dict.values(obj)
+    elif hasattr(obj, 'property_data'):
+        property_values = dict.values(obj.property_data)
+    else:
+        property_values = []
 
-    if hasattr(obj, 'class_id') and obj.class_id:
-        yield obj
+    for v in property_values:
+        if isinstance(v, utils.AVBObjectRef):
+            if v.index > 0:
+                yield v.index
+        elif is_reflist and isinstance(v, INT_FORMAT):
+            if v > 0:
+                yield v
+        elif getattr(v, 'class_id', None):
+            yield v.instance_id
+        elif isinstance(v, list):
+            for sub_v in iter_chunk_refs(v):
+                yield sub_v
+        elif not is_reflist and isinstance(obj, list):
+            # helper objects and dicts stored in lists, like tracks
+            for sub_v in iter_chunk_refs(v):
+                yield sub_v
 
 
 class AVBObject(object):
@@ -184,21 +323,23 @@ class AVBObject(object):
                 return value
         return default
 
-    def __setattr__(self, name, value):
-        pdef = self.propertydefs_dict.get(name, None)
-        if pdef:
-            self.property_data[name] = value
-            self.mark_modified()
-            return
-
-        super(AVBObject, self).__setattr__(name, value)
-
     def __getattr__(self, name):
+        if name == 'property_data':
+            # objects read with AVBFile lazy are decoded on first use
+            try:
+                index = object.__getattribute__(self, 'instance_id')
+            except AttributeError:
+                index = 0
+            if index and self.root.decode_lazy(self, index):
+                return object.__getattribute__(self, 'property_data')
+            raise AttributeError("'%s' has no attribute '%s'" % (self.__class__.__name__, name))
+
         v = self.property_data.get(name, sentinel)
         if v is not sentinel:
             return v
 
-        raise AttributeError("'%s' has no attribute '%s'" % (self.__class__.__name__, name))
+        # slots set by read are only there once a lazy object is decoded
+        return object.__getattribute__(self, name)
 
     def read(self, f):
         pass
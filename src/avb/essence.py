@@ -219,8 +219,7 @@ class MultiDescriptor(MediaFileDescriptor):
         count = ctx.read_s32(f)
         self.descriptors = AVBRefList.__new__(AVBRefList, root=self.root)
         for i in range(count):
-            ref = ctx.read_object_ref(self.root, f)
-            self.descriptors.append(ref)
+            self.descriptors.append(ctx.read_object_index(self.root, f))
 
         ctx.read_assert_tag(f, 0x03)
 
@@ -1337,6 +1336,9 @@ class DataDescriptor(MediaFileDescriptor):
         self.min_sample_size = ctx.read_s32(f)
         self.max_sample_size = ctx.read_s32(f)
 
+        if self.class_id[:] == b'DATD':
+            ctx.read_assert_tag(f, 0x03)
+
     def write(self, f):
         super(DataDescriptor, self).write(f)
         ctx = self.root.octx
@@ -1349,6 +1351,9 @@ class DataDescriptor(MediaFileDescriptor):
         ctx.write_s32(f, self.min_sample_size)
         ctx.write_s32(f, self.max_sample_size)
 
+        if self.class_id[:] == b'DATD':
+            ctx.write_u8(f, 0x03)
+
 @utils.register_class
 class ANCDataDescriptor(DataDescriptor):
     class_id = b'ANCD'
@@ -10,21 +10,105 @@ import datetime
 import struct
 import io
 import os
+import sys
+import threading
 import binascii
 import traceback
+import hashlib
 import array
+import multiprocessing
 from weakref import WeakValueDictionary
+from uuid import UUID
+from collections import OrderedDict
+from mmap import mmap as memory_map, ACCESS_READ
 import struct
 
 from . import utils
-from .core import walk_references
-from .ioctx import AVBIOContext
+from .core import walk_references, iter_chunk_refs, AVBObject, AVBPropertyData
+from .ioctx import AVBIOContext, AVBBufferIOContext, AVBBufferReader
+from .trackgroups import MobSummary, read_composition_summary
 
 
 try:
-    from ._ext import READERS
+    from ._ext import READERS, BE_READERS
 except:
     READERS = {}
+    BE_READERS = {}
+
+try:
+    from ._ext import scan_headers as fast_scan_headers
+except:
+    fast_scan_headers = None
+
+try:
+    from ._ext import read_composition_summaries as fast_read_summaries
+except:
+    fast_read_summaries = None
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+try:
+    from ._ext import WRITERS, ChunkWriter
+except:
+    WRITERS = {}
+    ChunkWriter = None
+
+# positional reads, threads reading the same file don't share a file position
+pread = getattr(os, 'pread', None)
+
+# flush the fast writer buffer to the file once it grows past this size
+WRITE_BUFFER_SIZE = 1 << 20
+
+# runs of unchanged chunks at least this big are copied in the kernel
+COPY_FILE_RANGE_SIZE = 1 << 16
+
+# read_objects reads runs of neighbouring chunks up to this size at once
+READ_RUN_SIZE = 1 << 20
+
+# most objects a write worker encodes per task
+WRITE_BATCH_SIZE = 1024
+
+# property values that can't change without being assigned again
+IMMUTABLE_TYPES = (type(None), bool, int, float, bytes, type(u''),
+                   datetime.datetime, UUID, utils.AVBObjectRef)
+if bytes is str:
+    IMMUTABLE_TYPES += (long,)
+
+# the file being written, inherited by forked write workers
+write_root = None
+
+def init_write_worker():
+    root = write_root
+    # the file offset is shared with the parent after fork, pread doesn't use it
+    if root.buffer is None and root.fd is None and root.path is not None:
+        root.f = io.open(root.path, 'rb')
+    root.write_buffer = None
+    if root.use_ext and ChunkWriter:
+        root.write_buffer = ChunkWriter(root, root.octx.byte_order == 'big')
+
+def write_chunks(ids):
+    root = write_root
+    f = io.BytesIO()
+    for instance_id in ids:
+        root.write_object(f, root.read_object(instance_id))
+    if root.write_buffer is not None:
+        root.write_buffer.flush(f)
+    return f.getvalue()
+
+def fork_pool(processes):
+    if not hasattr(os, 'fork'):
+        return None
+    try:
+        ctx = multiprocessing.get_context('fork')
+    except AttributeError:
+        # python 2 always forks on posix
+        ctx = multiprocessing
+    except ValueError:
+        return None
+    return ctx.Pool(processes, init_write_worker)
 
 class AVBChunk(object):
     __slots__ = ('root', 'class_id', 'pos', 'size')
@@ -35,6 +119,10 @@ class AVBChunk(object):
         self.size = size
 
     def read(self):
+        read_at = getattr(self.root, 'read_at', None)
+        if read_at is not None:
+            return read_at(self.pos, self.size)
+
         self.root.f.seek(self.pos)
         return self.root.f.read(self.size)
 
@@ -43,17 +131,48 @@ class AVBChunk(object):
 
         header = ctx.reverse_str(self.class_id)
         size = struct.pack(b"<I", self.size)
-        data =  header + size + self.read()
+        data =  header + size + bytes(self.read())
         return binascii.hexlify(data)
 
 def read_chunk(root, f):
-    ctx = root.ictx
+    ctx = AVBIOContext(root.ictx.byte_order)
     class_id = ctx.read_fourcc(f)
     size = ctx.read_u32(f)
     pos = f.tell()
 
     return AVBChunk(root, class_id, pos, size)
 
+def scan_headers(data, data_pos, pos, count, little_endian, positions, sizes, class_ids):
+    """
+    Pure python version of _ext.scan_headers. Walks up to count object headers
+    starting at file position pos, data holds the file contents from data_pos.
+    """
+    if little_endian:
+        header_format = struct.Struct(str("<4sI"))
+    else:
+        header_format = struct.Struct(str(">4sI"))
+
+    unpack_from = header_format.unpack_from
+    end = len(data)
+    n = 0
+    while n < count:
+        offset = pos - data_pos
+        if offset < 0 or offset + 8 > end:
+            break
+
+        class_id, size = unpack_from(data, offset)
+        if little_endian:
+            class_id = class_id[::-1]
+
+        # positions last, readers check it without the scan lock
+        sizes.append(size)
+        class_ids.extend(class_id)
+        positions.append(pos)
+        pos += 8 + size
+        n += 1
+
+    return pos, n
+
 class AVBFactory(object):
 
     def __init__(self, root):
@@ -89,6 +208,86 @@ LE_BYTE_ORDER = b'\x06\x00'
 BE_BYTE_ORDER = b'\x00\x06'
 MAGIC=b'Domain'
 
+SCAN_BLOCK_SIZE = 256 * 1024
+
+INDEX_CACHE_EXT = '.pyavbidx'
+INDEX_CACHE_MAGIC = b'PYAVBIDX'
+INDEX_CACHE_VERSION = 2
+INDEX_CACHE_HEADER = struct.Struct(str('<8sHHcQddQH'))
+
+def read_index_cache(cache_path, path, key):
+    try:
+        with io.open(cache_path, 'rb') as f:
+            data = f.read()
+    except (IOError, OSError):
+        return None
+
+    if len(data) < INDEX_CACHE_HEADER.size:
+        return None
+
+    header = INDEX_CACHE_HEADER.unpack_from(data)
+    magic, version, itemsize, byte_order, size, mtime, last_save, num_objects, path_size = header
+
+    if magic != INDEX_CACHE_MAGIC or version != INDEX_CACHE_VERSION:
+        return None
+
+    positions = array.array(str('L'))
+    if itemsize != positions.itemsize or byte_order != sys.byteorder[:1].encode('ascii'):
+        return None
+
+    if (size, mtime, last_save, num_objects) != key:
+        return None
+
+    pos = INDEX_CACHE_HEADER.size
+    if data[pos:pos + path_size] != path.encode('utf-8'):
+        return None
+    pos += path_size
+
+    count = num_objects + 1
+    table_size = count * itemsize
+    if len(data) != pos + table_size * 2 + count * 4:
+        return None
+
+    sizes = array.array(str('L'))
+    for table in (positions, sizes):
+        if hasattr(table, 'frombytes'):
+            table.frombytes(data[pos:pos + table_size])
+        else:
+            table.fromstring(data[pos:pos + table_size])
+        pos += table_size
+
+    class_ids = bytearray(data[pos:])
+
+    return positions, sizes, class_ids
+
+def write_index_cache(cache_path, path, key, positions, sizes, class_ids):
+    size, mtime, last_save, num_objects = key
+    path = path.encode('utf-8')
+
+    header = INDEX_CACHE_HEADER.pack(INDEX_CACHE_MAGIC, INDEX_CACHE_VERSION,
+                                     positions.itemsize, sys.byteorder[:1].encode('ascii'),
+                                     size, mtime, last_save, num_objects, len(path))
+
+    # write to a temp file first so readers never see a partial index
+    tmp_path = cache_path + '.%d.tmp' % os.getpid()
+    with io.open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(path)
+        for table in (positions, sizes):
+            if hasattr(table, 'tobytes'):
+                f.write(table.tobytes())
+            else:
+                f.write(table.tostring())
+        f.write(class_ids)
+
+    try:
+        os.replace(tmp_path, cache_path)
+    except AttributeError:
+        # python 2
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        os.rename(tmp_path, cache_path)
+
 def is_fileobject_like(fileobject):
 
     for attr_name in ('read', 'readinto', 'seek', 'tell', 'close'):
@@ -97,18 +296,62 @@ def is_fileobject_like(fileobject):
 
     return True
 
+class ReadState(threading.local):
+    reading = False
+
 class AVBFile(object):
-    def __init__(self, fileobject=None, buffering=io.DEFAULT_BUFFER_SIZE, use_ext=True):
+    """
+    Reading is safe from several threads at once, chunks are read with
+    positional I/O and the index scan, decoding and caches are guarded by a
+    lock. Changing objects and writing still need to be serialized by the
+    caller. With lazy, read_object only creates the object and its chunk is
+    decoded the first time its properties are used, changed or written.
+    """
+    def __init__(self, fileobject=None, buffering=io.DEFAULT_BUFFER_SIZE, use_ext=True, mmap=False,
+                 index_cache=None, cache_size=0, cache_bytes=0, eager=False, lazy=False):
 
         self.check_refs = True
         self.debug_copy_refs = False
+        self.lock = threading.RLock()
+        self.thread_state = ReadState()
         self.reading = False
+        self.use_ext = use_ext
+        self.lazy = lazy
+        self.write_buffer = None
+        self.copy_range = None
+        self.kernel_copy = False
+        self.copied_chunks = 0
 
         self.create = AVBFactory(self)
         self.object_cache = WeakValueDictionary()
+
+        # optional strong LRU in front of object_cache, bounded by object count
+        # and/or the total chunk size of the objects it keeps alive
+        self.cache_size = cache_size
+        self.cache_bytes = cache_bytes
+        self.lru_cache = OrderedDict()
+        self.lru_cache_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+
+        # every object in the file by index, see load_all
+        self.loaded_objects = None
+        self.loaded_bytes = 0
+        self.load_memory = None
+
+        self.root_index = 0
+        self._content = None
         self.modified_objects = {}
+        self.object_count = 0
         self.next_object_id = 0
 
+        # when memory-mapped, chunks are read as zero-copy memoryview slices of the whole file
+        self.mmap = None
+        self.buffer = None
+        self.fd = None
+
+        self.path = None
         if fileobject is None:
             self.setup_empty()
             return
@@ -116,21 +359,45 @@ class AVBFile(object):
         if is_fileobject_like(fileobject):
             self.f = fileobject
         else:
+            self.path = fileobject
             self.f = io.open(fileobject, 'rb', buffering=buffering)
 
+        if mmap:
+            self.mmap = memory_map(self.f.fileno(), 0, access=ACCESS_READ)
+            if bytes is str:
+                # python 2 mmap has no buffer interface for memoryview, slices are copies
+                self.buffer = self.mmap
+            else:
+                self.buffer = memoryview(self.mmap)
+        elif pread is not None and (self.path is not None or
+                                    type(self.f) in (io.FileIO, io.BufferedReader)):
+            # wrapper streams like GzipFile return the fd of the file they wrap,
+            # those are read through the file object under the lock
+            try:
+                self.fd = self.f.fileno()
+            except (AttributeError, io.UnsupportedOperation):
+                pass
+
         f = self.f
         file_bytes = f.read(2)
         self.fast_readers = {}
+        self.scan_headers = scan_headers
+        if use_ext and fast_scan_headers:
+            self.scan_headers = fast_scan_headers
+
         if file_bytes == LE_BYTE_ORDER:
             ctx = AVBIOContext('little')
             if use_ext:
                 self.fast_readers = READERS
         elif file_bytes == BE_BYTE_ORDER:
             ctx = AVBIOContext('big')
+            if use_ext:
+                self.fast_readers = BE_READERS
         else:
             raise ValueError("not a avb file")
 
-        self.ictx = ctx
+        # objects are decoded from their chunk data, the header straight from the file
+        self.ictx = AVBBufferIOContext(ctx.byte_order)
 
         header = f.read(len(MAGIC))
         if header != MAGIC:
@@ -164,17 +431,176 @@ class AVBFile(object):
 
         self.root_chunk = AVBChunk(self, b'OBJD', pos, f.tell() - pos)
 
-        self.object_positions = array.array(str('L'), [0 for i in range(num_objects+1)])
-        self.next_object_id = len(self.object_positions)
+        # object positions are indexed lazily, see scan_objects
+        self.num_objects = num_objects
+        self.object_count = num_objects + 1
+        self.next_object_id = self.object_count
+        self.scan_pos = f.tell()
+        self.scan_block = b''
+        self.scan_block_pos = 0
+        self.positions = array.array(str('L'), [0])
+        self.sizes = array.array(str('L'), [self.root_chunk.size])
+        self.class_ids = bytearray(b'OBJD')
+        self._class_index = None
+
+        if index_cache and self.path:
+            self.setup_index_cache(index_cache)
+
+        if eager:
+            self.load_all()
+
+    @property
+    def reading(self):
+        """
+        True while this thread is decoding an object, changes made then are
+        not tracked in modified_objects.
+        """
+        return self.thread_state.reading
+
+    @reading.setter
+    def reading(self, value):
+        self.thread_state.reading = value
+
+    def read_at(self, pos, size):
+        """
+        Reads size bytes at file position pos without using the file position,
+        with os.pread or from the memory map. Other file objects are read under
+        the lock.
+        """
+        if self.buffer is not None:
+            return self.buffer[pos:pos + size]
+
+        if self.fd is not None:
+            data = pread(self.fd, size, pos)
+            while len(data) < size:
+                more = pread(self.fd, size - len(data), pos + len(data))
+                if not more:
+                    break
+                data += more
+            return data
+
+        with self.lock:
+            self.f.seek(pos)
+            return self.f.read(size)
+
+    @property
+    def content(self):
+        if self._content is None and self.root_index:
+            self._content = self.read_object(self.root_index)
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+
+    @property
+    def object_positions(self):
+        self.scan_objects(self.num_objects)
+        return self.positions
+
+    def object_position(self, index):
+        if index >= len(self.positions):
+            self.scan_objects(index)
+        return self.positions[index]
+
+    def scan_data(self, pos):
+        # a python 2 mmap isn't a buffer for the fast scanner, it's scanned in blocks
+        if self.buffer is not None and self.buffer is not self.mmap:
+            return self.buffer, 0
+
+        block = self.scan_block
+        start = pos - self.scan_block_pos
+        if start < 0 or start + 8 > len(block):
+            block = self.read_at(pos, SCAN_BLOCK_SIZE)
+            self.scan_block = block
+            self.scan_block_pos = pos
+
+        return block, self.scan_block_pos
+
+    def scan_objects(self, index):
+        """
+        Walks object headers until the position of object ``index`` is known.
+        Headers are parsed a SCAN_BLOCK_SIZE block at a time (or straight out of the
+        memory map) into the positions, sizes and class_ids tables.
+        """
+        if index > self.num_objects:
+            raise IndexError("object index out of range: %d" % index)
+
+        positions = self.positions
+        if index < len(positions):
+            return
 
-        for i in range(num_objects):
-            self.object_positions[i+1] = f.tell()
-            class_id = f.read(4)
-            size = ctx.read_u32(f)
+        with self.lock:
+            self.scan_objects_locked(index)
 
-            f.seek(size, os.SEEK_CUR)
+    def scan_objects_locked(self, index):
+        positions = self.positions
+        if index < len(positions):
+            return
 
-        self.content = self.read_object(self.root_index)
+        little_endian = self.ictx.byte_order == 'little'
+
+        pos = self.scan_pos
+        while len(positions) <= index:
+            data, data_pos = self.scan_data(pos)
+            count = index + 1 - len(positions)
+            pos, n = self.scan_headers(data, data_pos, pos, count, little_endian,
+                                       positions, self.sizes, self.class_ids)
+            if n == 0:
+                raise ValueError("truncated avb file, object %d at %d" % (len(positions), pos))
+
+        self.scan_pos = pos
+
+        # the block is only useful while scanning
+        if len(positions) > self.num_objects:
+            self.scan_block = b''
+
+    def object_class_id(self, index):
+        if index >= len(self.positions):
+            self.scan_objects(index)
+        return bytes(self.class_ids[index * 4:index * 4 + 4])
+
+    def object_size(self, index):
+        if index >= len(self.positions):
+            self.scan_objects(index)
+        return self.sizes[index]
+
+    def index_cache_key(self):
+        st = os.fstat(self.f.fileno())
+        last_save = AVBIOContext.datetime_to_timestamp(self.last_save)
+        return (st.st_size, st.st_mtime, last_save, self.num_objects)
+
+    def index_cache_path(self, index_cache):
+        path = os.path.abspath(self.path)
+        if index_cache is True:
+            return path + INDEX_CACHE_EXT
+
+        name = hashlib.sha1(path.encode('utf-8')).hexdigest() + INDEX_CACHE_EXT
+        return os.path.join(index_cache, name)
+
+    def setup_index_cache(self, index_cache):
+        """
+        Loads object positions and class ids from a sidecar index written by
+        a previous open. If it is missing or stale, the objects are scanned and
+        the sidecar is rewritten.
+        index_cache is True to store the index next to the bin or a directory path.
+        """
+        cache_path = self.index_cache_path(index_cache)
+        key = self.index_cache_key()
+        path = os.path.abspath(self.path)
+
+        index = read_index_cache(cache_path, path, key)
+        if index:
+            self.positions, self.sizes, self.class_ids = index
+            self.scan_block = b''
+            return
+
+        self.scan_objects(self.num_objects)
+        try:
+            write_index_cache(cache_path, path, key, self.positions, self.sizes, self.class_ids)
+        except (IOError, OSError):
+            # the cache is only an optimisation
+            pass
 
     def setup_empty(self):
         self.f = None
@@ -190,9 +616,12 @@ class AVBFile(object):
     def add_modified(self, obj):
         self.modified_objects[obj.instance_id] = obj
 
-    def write_header(self, f):
-
+    def header_data(self, object_count=0):
+        """
+        Returns the encoded file header and the offset of the object count in it.
+        """
         ctx = self.octx
+        f = io.BytesIO()
 
         if ctx.byte_order == 'little':
             f.write(LE_BYTE_ORDER)
@@ -206,8 +635,8 @@ class AVBFile(object):
         last_save_str = self.last_save.strftime(u'%Y/%m/%d %H:%M:%S')
         ctx.write_string(f, last_save_str)
         pos = f.tell()
-        ctx.write_u32(f, 0)
-        ctx.write_u32(f, 0)
+        ctx.write_u32(f, object_count)
+        ctx.write_u32(f, object_count)
 
         if ctx.byte_order == 'little':
             ctx.write_u32(f, 0x49494949)
@@ -233,91 +662,280 @@ class AVBFile(object):
             ctx.write_u8(f, 0x20)
         f.write(bytearray(16))
 
-        return pos
+        return f.getvalue(), pos
+
+    def write_header(self, f):
+        pos = f.tell()
+        data, count_pos = self.header_data()
+        f.write(data)
+        return pos + count_pos
 
     def read_chunk(self, index):
         if index == 0:
             return self.root_chunk
 
-        object_pos = self.object_positions[index]
-
-        f = self.f
-        f.seek(object_pos)
-
-        if self.ictx.byte_order == 'little':
-            class_id, size = struct.unpack(b"<4sI", f.read(8))
-            class_id = class_id[::-1]
-        else:
-            class_id, size = struct.unpack(b">4sI", f.read(8))
+        object_pos = self.object_position(index)
+        class_id = self.object_class_id(index)
+        size = self.sizes[index]
 
-        pos = f.tell()
-        chunk = AVBChunk(self, class_id, pos, size)
+        chunk = AVBChunk(self, class_id, object_pos + 8, size)
         return chunk
 
+    def read_chunk_data(self, object_pos, size):
+        data = self.read_at(object_pos + 8, size)
+        assert len(data) == size
+        return data
+
     def read_object(self, index):
         if index == 0:
             return None
 
+        loaded_objects = self.loaded_objects
+        if loaded_objects is not None and 0 < index < len(loaded_objects):
+            return loaded_objects[index]
+
         object_instance = self.object_cache.get(index, None)
         if object_instance is not None:
+            self.cache_hits += 1
+            self.cache_object(index, object_instance)
             return object_instance
 
-        object_pos = self.object_positions[index]
-
-        f = self.f
-        f.seek(object_pos)
-
-        if self.ictx.byte_order == 'little':
-            class_id, size = struct.unpack(b"<4sI", f.read(8))
-            class_id = class_id[::-1]
-        else:
-            class_id, size = struct.unpack(b">4sI", f.read(8))
+        object_pos = self.object_position(index)
+        data = None
+        if not self.lazy:
+            data = self.read_chunk_data(object_pos, self.sizes[index])
+
+        with self.lock:
+            # another thread might have decoded it meanwhile
+            object_instance = self.object_cache.get(index, None)
+            if object_instance is not None:
+                self.cache_hits += 1
+                self.cache_object(index, object_instance)
+                return object_instance
 
-        data = bytearray(size)
-        bytes_read = f.readinto(data)
-        assert bytes_read == size
+            self.cache_misses += 1
+            return self.decode_object(index, object_pos, data)
+
+    def read_objects(self, indices):
+        """
+        Returns the objects at indices, in the same order, like calling
+        read_object for each. The chunks missing from the cache are read in
+        file order, each run of neighbouring chunks with a single read.
+        """
+        # lazy reads don't touch the chunks
+        if self.loaded_objects is not None or self.lazy:
+            return [self.read_object(index) for index in indices]
+
+        objects = {}
+        missing = set()
+        for index in indices:
+            if index <= 0 or index in objects or index in missing:
+                continue
+            obj = self.object_cache.get(index, None)
+            if obj is None:
+                missing.add(index)
+            else:
+                objects[index] = obj
+                self.cache_hits += 1
+                self.cache_object(index, obj)
+
+        for run, run_start, data in self.chunk_runs(sorted(missing)):
+            with self.lock:
+                for index in run:
+                    obj = self.object_cache.get(index, None)
+                    if obj is not None:
+                        self.cache_hits += 1
+                        self.cache_object(index, obj)
+                    else:
+                        self.cache_misses += 1
+                        object_pos = self.object_position(index)
+                        pos = object_pos - run_start + 8
+                        obj = self.decode_object(index, object_pos, data[pos:pos + self.sizes[index]])
+                    objects[index] = obj
+
+        return [objects.get(index, None) for index in indices]
+
+    def chunk_runs(self, indices):
+        """
+        Reads the chunks at the sorted indices, each run of neighbouring chunks
+        with a single read. Yields the indices, file position and data, headers
+        included, of each run.
+        """
+        # chunks are stored in index order, neighbouring indices are neighbouring chunks
+        start = 0
+        while start < len(indices):
+            run_start = self.object_position(indices[start])
+            end = start + 1
+            run_end = run_start + self.sizes[indices[start]] + 8
+            while (end < len(indices) and indices[end] == indices[end-1] + 1 and
+                   run_end - run_start < READ_RUN_SIZE):
+                run_end = self.object_position(indices[end]) + self.sizes[indices[end]] + 8
+                end += 1
+
+            data = memoryview(self.read_at(run_start, run_end - run_start))
+            assert len(data) == run_end - run_start
+
+            yield indices[start:end], run_start, data
+            start = end
+
+    def mob_summaries(self):
+        """
+        Returns a MobSummary, with the index, name, mob_type_id, usage_code,
+        mob_id, last_modified and length, for every Composition stored in the
+        file, in file order. Only those fields are decoded from the chunks and
+        no objects get created, which makes listing the mobs of a bin much
+        cheaper than reading them. Changes not written yet aren't included.
+        """
+        big_endian = self.ictx.byte_order == 'big'
+        summaries = []
+        for run, run_start, data in self.chunk_runs(self.class_index.get(b'CMPO', ())):
+            if self.use_ext and fast_read_summaries:
+                for index, summary in zip(run, fast_read_summaries(data, len(run), big_endian)):
+                    summaries.append(MobSummary(index, *summary))
+                continue
+
+            for index in run:
+                object_pos = self.object_position(index)
+                pos = object_pos - run_start + 8
+                f = AVBBufferReader(data[pos:pos + self.sizes[index]])
+                try:
+                    summary = read_composition_summary(self, f)
+                    assert f.pos == f.size
+                except:
+                    chunk = AVBChunk(self, b'CMPO', object_pos + 8, f.size)
+                    print(chunk.hex())
+                    print(traceback.format_exc())
+                    raise
+                summaries.append(MobSummary(index, *summary))
+        return summaries
+
+    def load_all(self, workers=None):
+        """
+        Reads the file front to back once and decodes every object, they are
+        kept alive in loaded_objects and refs resolve straight from it until
+        close. Faster than lazy reads when most objects get used, at the cost
+        of holding the whole bin decoded in memory. Returns the number of
+        objects, their chunk bytes and, while tracemalloc is tracing, the
+        memory the decoded objects take. With more than one worker the objects
+        are decoded in worker processes, see parallel.load_all.
+        """
+        if workers and workers > 1:
+            from . import parallel
+            return parallel.load_all(self, workers)
+
+        if self.loaded_objects is None and self.object_count > 1:
+            tracing = tracemalloc is not None and tracemalloc.is_tracing()
+            if tracing:
+                memory = tracemalloc.get_traced_memory()[0]
+
+            self.object_positions
+            objects = self.read_objects(range(1, self.object_count))
+            self.loaded_objects = [None] + objects
+            self.loaded_bytes = sum(self.sizes[1:])
+            if tracing:
+                self.load_memory = tracemalloc.get_traced_memory()[0] - memory
+
+        return {
+            'objects': self.loaded_count,
+            'bytes': self.loaded_bytes,
+            'memory': self.load_memory,
+        }
+
+    @property
+    def loaded_count(self):
+        if self.loaded_objects is None:
+            return 0
+        return len(self.loaded_objects) - 1
+
+    def decode_object(self, index, object_pos, data=None):
+        class_id = self.object_class_id(index)
 
         obj_class = utils.AVBClaseID_dict.get(class_id, None)
-        if obj_class:
-            try:
-                self.reading = True
-                # NOTE: objects read from file do not run __init__
-                object_instance = obj_class.__new__(obj_class, root=self)
-
-                # Only OrderedDict needs run __init__ in order to work
-                if class_id == b'ATTR':
-                    object_instance.__init__(object_instance)
+        if not obj_class:
+            if data is None:
+                data = self.read_chunk_data(object_pos, self.sizes[index])
+            pos = object_pos + 8
+            chunk = AVBChunk(self, class_id, pos, len(data))
+            print(chunk.class_id)
+            print(chunk.hex())
+            raise NotImplementedError(chunk.class_id)
 
-                reader = self.fast_readers.get(class_id, None)
-
-                if reader:
-                    reader(self, object_instance, data)
-                else:
-                    r = io.BytesIO(data)
-                    object_instance.read(r)
-                    # print(len(r.read()))
-                    assert len(r.read()) == 0
-                self.object_cache[index] = object_instance
-                object_instance.instance_id = index
-                return object_instance
-            except:
-                pos = self.object_positions[index] + 8
-                chunk = AVBChunk(self, class_id, pos, len(data))
-                print(chunk.class_id)
-                print(chunk.hex())
-                print(traceback.format_exc())
-                raise
-            finally:
-                self.reading = False
+        # NOTE: objects read from file do not run __init__
+        object_instance = obj_class.__new__(obj_class, root=self)
 
+        if self.lazy and isinstance(object_instance, AVBObject):
+            # decoded by decode_lazy once its properties are used
+            del object_instance.property_data
         else:
-            pos = self.object_positions[index] + 8
+            if data is None:
+                data = self.read_chunk_data(object_pos, self.sizes[index])
+            self.read_into(object_instance, class_id, object_pos, data)
+
+        self.object_cache[index] = object_instance
+        object_instance.instance_id = index
+        self.cache_object(index, object_instance)
+        return object_instance
+
+    def decode_lazy(self, obj, index):
+        """
+        Decodes obj, read with lazy and not used yet, from its chunk. Returns
+        False if obj isn't waiting to be decoded.
+        """
+        if not self.lazy or not 0 < index < self.object_count:
+            return False
+
+        with self.lock:
+            try:
+                # another thread decoded it meanwhile
+                object.__getattribute__(obj, 'property_data')
+                return True
+            except AttributeError:
+                pass
+
+            object_pos = self.object_position(index)
+            data = self.read_chunk_data(object_pos, self.sizes[index])
+            obj.property_data = AVBPropertyData()
+            self.read_into(obj, self.object_class_id(index), object_pos, data)
+        return True
+
+    def read_into(self, object_instance, class_id, object_pos, data):
+        try:
+            self.reading = True
+
+            # Only OrderedDict needs run __init__ in order to work
+            if class_id == b'ATTR':
+                object_instance.__init__(object_instance)
+
+            reader = self.fast_readers.get(class_id, None)
+
+            if reader:
+                reader(self, object_instance, data)
+            else:
+                r = AVBBufferReader(data)
+                object_instance.read(r)
+                # print(len(r.read()))
+                assert len(r.read()) == 0
+        except:
+            pos = object_pos + 8
             chunk = AVBChunk(self, class_id, pos, len(data))
             print(chunk.class_id)
             print(chunk.hex())
-            raise NotImplementedError(chunk.class_id)
+            print(traceback.format_exc())
+            raise
+        finally:
+            self.reading = False
 
     def write_object(self, f, obj):
+        out = self.write_buffer
+        if out is not None:
+            writer = WRITERS.get(obj.class_id, None)
+            if writer:
+                writer(out, obj)
+                if len(out) >= WRITE_BUFFER_SIZE:
+                    out.flush(f)
+                return
+            out.flush(f)
+
         buffer = io.BytesIO()
         obj.write(buffer)
         data = buffer.getvalue()
@@ -338,13 +956,168 @@ class AVBFile(object):
         #     print(binascii.hexlify(data))
         #     raise Exception()
 
-    def write(self, path, byte_order='little'):
+    def chunk_unchanged(self, obj, tracked_only=True):
+        """
+        True if the source file chunk of obj is what write_object would produce:
+        obj was read from the file, is not in modified_objects and every object
+        it refers to keeps its index in the file being written. With tracked_only,
+        objects holding mutable values, like lists, MobIDs, bytearrays or helper
+        objects, which can be changed in place without marking obj modified,
+        never count as unchanged.
+        """
+        index = getattr(obj, 'instance_id', 0)
+        if not 0 < index < self.object_count or index in self.modified_objects:
+            return False
+
+        if tracked_only:
+            if hasattr(obj, 'property_data'):
+                values = dict.values(obj.property_data)
+            elif isinstance(obj, dict):
+                values = dict.values(obj)
+            else:
+                values = ()
+            for v in values:
+                if not isinstance(v, IMMUTABLE_TYPES):
+                    return False
+
+        ref_mapping = self.ref_mapping
+        for ref_id in iter_chunk_refs(obj):
+            if ref_mapping.get(ref_id, None) != ref_id:
+                return False
+        return True
+
+    def copy_chunk(self, f, index):
+        """
+        Queues chunk index to be copied as is from the source file, chunks that
+        follow each other in the source file are copied as one range.
+        """
+        pos = self.object_position(index)
+        end = pos + self.sizes[index] + 8
+        copy_range = self.copy_range
+        if copy_range is not None and copy_range[1] == pos:
+            self.copy_range = (copy_range[0], end)
+            return
+
+        self.flush_copy_range(f)
+        self.copy_range = (pos, end)
+
+    def flush_copy_range(self, f):
+        copy_range = self.copy_range
+        if copy_range is None:
+            return
+        self.copy_range = None
+
+        pos, end = copy_range
+        if end - pos >= COPY_FILE_RANGE_SIZE and self.copy_file_range(f, pos, end - pos):
+            return
+
+        data = self.read_at(pos, end - pos)
+        assert len(data) == end - pos
+
+        out = self.write_buffer
+        if out is not None:
+            out.write(data)
+            if len(out) >= WRITE_BUFFER_SIZE:
+                out.flush(f)
+        else:
+            f.write(data)
+
+    def copy_file_range(self, f, pos, size):
+        """
+        Copies size bytes at pos in the source file to f in the kernel with
+        os.copy_file_range or os.sendfile. Returns False if neither can be used.
+        """
+        copy = getattr(os, 'copy_file_range', None)
+        sendfile = getattr(os, 'sendfile', None)
+        if copy is None and sendfile is None:
+            return False
+
+        # only files opened by write, file-likes like GzipFile can have a fileno too
+        if not self.kernel_copy:
+            return False
+
+        # the source fd is only known to hold the avb data when it is the one
+        # pread or mmap use, wrapper streams like GzipFile return the fd they wrap
+        src = self.fd
+        if src is None and self.mmap is not None:
+            src = self.f.fileno()
+        if src is None:
+            return False
+
+        try:
+            dst = f.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            return False
+
+        if self.write_buffer is not None:
+            self.write_buffer.flush(f)
+        f.flush()
+        dst_pos = f.tell()
+
+        copied = 0
+        try:
+            while copied < size:
+                if copy is not None:
+                    n = copy(src, dst, size - copied, pos + copied, dst_pos + copied)
+                else:
+                    os.lseek(dst, dst_pos + copied, os.SEEK_SET)
+                    n = sendfile(dst, src, pos + copied, size - copied)
+                if n <= 0:
+                    break
+                copied += n
+        except OSError:
+            pass
+
+        # resync the buffered writer with the file descriptor
+        f.seek(dst_pos + copied)
+        if copied < size:
+            data = self.read_at(pos + copied, size - copied)
+            assert len(data) == size - copied
+            f.write(data)
+        return True
+
+    def begin_write(self, byte_order, incremental, passthrough):
         self.next_chunk_id = 0
         self.ref_mapping = {}
-        ctx = AVBIOContext(byte_order)
-        self.octx = ctx
+        self.copied_chunks = 0
+        self.copy_range = None
+        self.kernel_copy = False
+        self.octx = AVBIOContext(byte_order)
+
+        if self.use_ext and ChunkWriter:
+            self.write_buffer = ChunkWriter(self, byte_order == 'big')
+
+        return ((passthrough or incremental) and self.f is not None and
+                self.ictx.byte_order == byte_order)
+
+    def end_write(self, f):
+        self.flush_copy_range(f)
+        if self.write_buffer is not None:
+            self.write_buffer.flush(f)
+            self.write_buffer = None
+
+    def write(self, path, byte_order='little', incremental=False, passthrough=True, workers=None):
+        """
+        Writes every object reachable from content to path, or to a writable
+        file-like object with write_stream. With passthrough the chunks of
+        objects read from the file and left unchanged (see chunk_unchanged) are
+        copied from the source file instead of being encoded again, the result
+        is the same as a full write. incremental extends that to objects holding
+        mutable values, like tracks, MobIDs or bytearrays, which then need
+        mark_modified called when changed in place. With more than one worker
+        the chunks are encoded in parallel, see write_parallel.
+        """
+        if hasattr(path, 'write'):
+            return self.write_stream(path, byte_order, incremental, passthrough, workers)
+
+        passthrough = self.begin_write(byte_order, incremental, passthrough)
+        ctx = self.octx
 
         with io.open(path, 'wb') as f:
+            self.kernel_copy = True
+            if workers and workers > 1:
+                return self.write_ordered(f, passthrough, incremental, workers)
+
             count_pos = self.write_header(f)
             for obj in walk_references(self.content):
                 if obj.instance_id in self.ref_mapping:
@@ -352,7 +1125,14 @@ class AVBFile(object):
 
                 self.next_chunk_id += 1
                 self.ref_mapping[obj.instance_id] = self.next_chunk_id
-                self.write_object(f, obj)
+                if passthrough and self.chunk_unchanged(obj, not incremental):
+                    self.copy_chunk(f, obj.instance_id)
+                    self.copied_chunks += 1
+                else:
+                    self.flush_copy_range(f)
+                    self.write_object(f, obj)
+
+            self.end_write(f)
 
             pos = f.tell()
             f.seek(count_pos)
@@ -360,16 +1140,199 @@ class AVBFile(object):
             ctx.write_u32(f, self.next_chunk_id)
             f.seek(pos)
 
+    def write_stream(self, f, byte_order='little', incremental=False, passthrough=True, workers=None):
+        """
+        Writes front to back to any object with a write method, like a pipe,
+        socket or compressed stream, without seeking or telling. A first walk
+        works out the object order and count and which chunks can be passed
+        through, the objects that get encoded are fetched again by index while
+        streaming, so only their ids are kept in between.
+        """
+        passthrough = self.begin_write(byte_order, incremental, passthrough)
+        self.write_ordered(f, passthrough, incremental, workers)
+
+    def write_ordered(self, f, passthrough, incremental, workers=None):
+        order = array.array(str('L'))
+        copy = bytearray()
+        for obj in walk_references(self.content):
+            if obj.instance_id in self.ref_mapping:
+                continue
+
+            self.next_chunk_id += 1
+            self.ref_mapping[obj.instance_id] = self.next_chunk_id
+            order.append(obj.instance_id)
+            copy.append(passthrough and self.chunk_unchanged(obj, not incremental))
+
+        data, count_pos = self.header_data(self.next_chunk_id)
+        f.write(data)
+
+        if workers and workers > 1 and self.write_parallel(f, order, copy, workers):
+            return
+
+        for instance_id, copy_chunk in zip(order, copy):
+            if copy_chunk:
+                self.copy_chunk(f, instance_id)
+                self.copied_chunks += 1
+            else:
+                self.flush_copy_range(f)
+                self.write_object(f, self.read_object(instance_id))
+
+        self.end_write(f)
+
+    def write_parallel(self, f, order, copy, workers):
+        """
+        Encodes the chunks that are not passed through in forked worker
+        processes, in batches of up to WRITE_BATCH_SIZE objects, and writes the
+        results in order. Returns False if worker processes can't be forked here
+        or the source file can't be shared with them.
+        """
+        global write_root
+
+        if self.buffer is None and self.path is None and hasattr(self.f, 'fileno'):
+            return False
+
+        # copied chunks are ids, encoded runs are arrays of ids
+        runs = []
+        batch = None
+        for instance_id, copy_chunk in zip(order, copy):
+            if copy_chunk:
+                runs.append(instance_id)
+                batch = None
+                continue
+            if batch is None or len(batch) >= WRITE_BATCH_SIZE:
+                batch = array.array(str('L'))
+                runs.append(batch)
+            batch.append(instance_id)
+
+        write_root = self
+        try:
+            pool = fork_pool(workers)
+        finally:
+            write_root = None
+
+        if pool is None:
+            return False
+
+        # copied chunks go straight to f between the encoded runs
+        self.write_buffer = None
+        try:
+            results = pool.imap(write_chunks, [r for r in runs if isinstance(r, array.array)])
+            for run in runs:
+                if isinstance(run, array.array):
+                    self.flush_copy_range(f)
+                    f.write(next(results))
+                else:
+                    self.copy_chunk(f, run)
+                    self.copied_chunks += 1
+        finally:
+            pool.terminate()
+            pool.join()
+
+        self.end_write(f)
+        return True
+
     def chunks(self):
-        for i in range(len(self.object_positions)):
+        for i in range(self.object_count):
             yield self.read_chunk(i)
 
+    @property
+    def class_index(self):
+        """
+        dict mapping each class id in the file to an array of the object indices
+        that have it, built once from the header scan.
+        """
+        if self._class_index is None:
+            self.scan_objects(self.num_objects)
+            class_ids = bytes(self.class_ids)
+            index = {}
+            for i in range(1, self.object_count):
+                class_id = class_ids[i * 4:i * 4 + 4]
+                indices = index.get(class_id)
+                if indices is None:
+                    indices = index[class_id] = array.array(str('L'))
+                indices.append(i)
+            self._class_index = index
+
+        return self._class_index
+
+    def count_class_ids(self):
+        """
+        Returns a dict of class id to number of objects of that class in the file.
+        """
+        return dict((class_id, len(indices)) for class_id, indices in self.class_index.items())
+
     def iter_class_ids(self, class_id_list):
-        for i, chunk in enumerate(self.chunks()):
-            if chunk.class_id in class_id_list:
-                yield self.read_object(i)
+        class_index = self.class_index
+        indices = []
+        for class_id in set(class_id_list):
+            indices.extend(class_index.get(class_id, ()))
+        indices.sort()
+
+        for i in indices:
+            yield self.read_object(i)
+
+    def cache_object(self, index, obj):
+        if not self.cache_size and not self.cache_bytes:
+            return
+
+        with self.lock:
+            lru_cache = self.lru_cache
+            if index in lru_cache:
+                # move to most recently used
+                del lru_cache[index]
+                lru_cache[index] = obj
+                return
+
+            lru_cache[index] = obj
+            self.lru_cache_bytes += self.cached_size(index)
+
+            cache_size = self.cache_size
+            cache_bytes = self.cache_bytes
+            while lru_cache and ((cache_size and len(lru_cache) > cache_size) or
+                                 (cache_bytes and self.lru_cache_bytes > cache_bytes)):
+                evicted_index, evicted = lru_cache.popitem(last=False)
+                self.lru_cache_bytes -= self.cached_size(evicted_index)
+                self.cache_evictions += 1
+
+    def cached_size(self, index):
+        # objects created in memory have no chunk in the file, they count as empty
+        if index < self.object_count:
+            return self.sizes[index]
+        return 0
+
+    def cache_stats(self):
+        """
+        Returns a dict of object cache statistics, useful for tuning cache_size and cache_bytes.
+        """
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'evictions': self.cache_evictions,
+            'size': len(self.lru_cache),
+            'bytes': self.lru_cache_bytes,
+            'loaded': self.loaded_count,
+            'loaded_bytes': self.loaded_bytes,
+        }
 
     def close(self):
+        self.lru_cache.clear()
+        self.lru_cache_bytes = 0
+        self.loaded_objects = None
+
+        if self.buffer is not None:
+            if self.buffer is not self.mmap:
+                self.buffer.release()
+            self.buffer = None
+
+        if self.mmap is not None:
+            try:
+                self.mmap.close()
+            except BufferError:
+                # slices handed out by AVBChunk.read are still alive,
+                # the map is closed when they are garbage collected
+                pass
+            self.mmap = None
+
         if self.f:
             self.f.close()
 
@@ -7,7 +7,7 @@ from __future__ import (
 
 import time
 from datetime import datetime
-from struct import (pack, unpack)
+from struct import (pack, unpack, Struct)
 from uuid import UUID
 
 from .utils import AVBObjectRef
@@ -180,6 +180,12 @@ class AVBIOContext(object):
             return ref
         raise ValueError("bad index: %d" % index)
 
+    def read_object_index(self, root, f):
+        index = self.read_u32(f)
+        if not root.check_refs or index < root.object_count:
+            return index
+        raise ValueError("bad index: %d" % index)
+
     def write_object_ref(self, root, f, value):
         if value is None:
             index = 0
@@ -464,3 +470,211 @@ class AVBIOContext(object):
     def write_fourcc_be(f, value):
         assert len(value) == 4
         f.write(value)
+
+
+unpack_s8_from    = Struct(str("b")).unpack_from
+unpack_u16le_from = Struct(str("<H")).unpack_from
+unpack_s16le_from = Struct(str("<h")).unpack_from
+unpack_u32le_from = Struct(str("<I")).unpack_from
+unpack_s32le_from = Struct(str("<i")).unpack_from
+unpack_u64le_from = Struct(str("<Q")).unpack_from
+unpack_s64le_from = Struct(str("<q")).unpack_from
+unpack_u16be_from = Struct(str(">H")).unpack_from
+unpack_s16be_from = Struct(str(">h")).unpack_from
+unpack_u32be_from = Struct(str(">I")).unpack_from
+unpack_s32be_from = Struct(str(">i")).unpack_from
+unpack_u64be_from = Struct(str(">Q")).unpack_from
+unpack_s64be_from = Struct(str(">q")).unpack_from
+unpack_double_from = Struct(str("<d")).unpack_from
+
+class AVBBufferReader(object):
+    """
+    Minimal file-like cursor over a bytes, bytearray or memoryview object.
+    AVBBufferIOContext decodes fields straight out of data at pos,
+    read, tell and seek are there for read methods that use f directly.
+    """
+    __slots__ = ('data', 'pos', 'size')
+    def __init__(self, data, pos=0):
+        # indexing str and memoryview gives 1 char strings on python 2
+        if bytes is str and not isinstance(data, bytearray):
+            data = bytearray(data)
+        self.data = data
+        self.pos = pos
+        self.size = len(data)
+
+    def read(self, size=-1):
+        pos = self.pos
+        if size is None or size < 0:
+            end = self.size
+        else:
+            end = min(pos + size, self.size)
+        self.pos = end
+        return bytes(self.data[pos:end])
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, pos, whence=0):
+        if whence == 1:
+            pos += self.pos
+        elif whence == 2:
+            pos += self.size
+        self.pos = pos
+        return pos
+
+class AVBBufferIOContext(AVBIOContext):
+    """
+    AVBIOContext for reading from an AVBBufferReader. Fields are unpacked with
+    precompiled structs at the reader position instead of f.read calls,
+    so no intermediate bytes object is created per field.
+    """
+
+    @staticmethod
+    def read_assert_tag(f, version):
+        pos = f.pos
+        version_mark = f.data[pos]
+        f.pos = pos + 1
+        if version_mark != version:
+            raise AssertionError("%d != %d" % (version_mark, version))
+
+    @staticmethod
+    def iter_ext(f):
+        data = f.data
+        while True:
+            pos = f.pos
+            if data[pos] != 0x01:
+                break
+
+            f.pos = pos + 2
+            yield data[pos + 1]
+
+    @staticmethod
+    def read_u8(f):
+        pos = f.pos
+        result = f.data[pos]
+        f.pos = pos + 1
+        return result
+
+    @staticmethod
+    def read_s8(f):
+        pos = f.pos
+        f.pos = pos + 1
+        return unpack_s8_from(f.data, pos)[0]
+
+    @staticmethod
+    def read_bool(f):
+        pos = f.pos
+        result = f.data[pos]
+        f.pos = pos + 1
+        return result == 0x01
+
+    def read_string(self, f, encoding = 'macroman'):
+        size = self.read_u16(f)
+        if size >= 65535:
+            return u""
+
+        pos = f.pos
+        f.pos = min(pos + size, f.size)
+        s = bytes(f.data[pos:pos + size])
+        s = s.strip(b'\x00')
+        return s.decode(encoding)
+
+    # little
+
+    @staticmethod
+    def read_u16le(f):
+        pos = f.pos
+        f.pos = pos + 2
+        return unpack_u16le_from(f.data, pos)[0]
+
+    @staticmethod
+    def read_s16le(f):
+        pos = f.pos
+        f.pos = pos + 2
+        return unpack_s16le_from(f.data, pos)[0]
+
+    @staticmethod
+    def read_u32le(f):
+        pos = f.pos
+        f.pos = pos + 4
+        return unpack_u32le_from(f.data, pos)[0]
+
+    @staticmethod
+    def read_s32le(f):
+        pos = f.pos
+        f.pos = pos + 4
+        return unpack_s32le_from(f.data, pos)[0]
+
+    @staticmethod
+    def read_u64le(f):
+        pos = f.pos
+        f.pos = pos + 8
+        return unpack_u64le_from(f.data, pos)[0]
+
+    @staticmethod
+    def read_s64le(f):
+        pos = f.pos
+        f.pos = pos + 8
+        return unpack_s64le_from(f.data, pos)[0]
+
+    @staticmethod
+    def read_double_le(f):
+        pos = f.pos
+        f.pos = pos + 8
+        return unpack_double_from(f.data, pos)[0]
+
+    @staticmethod
+    def read_fourcc_le(f):
+        pos = f.pos
+        f.pos = pos + 4
+        return bytes(f.data[pos:pos + 4])[::-1]
+
+    # big
+
+    @staticmethod
+    def read_u16be(f):
+        pos = f.pos
+        f.pos = pos + 2
+        return unpack_u16be_from(f.data, pos)[0]
+
+    @staticmethod
+    def read_s16be(f):
+        pos = f.pos
+        f.pos = pos + 2
+        return unpack_s16be_from(f.data, pos)[0]
+
+    @staticmethod
+    def read_u32be(f):
+        pos = f.pos
+        f.pos = pos + 4
+        return unpack_u32be_from(f.data, pos)[0]
+
+    @staticmethod
+    def read_s32be(f):
+        pos = f.pos
+        f.pos = pos + 4
+        return unpack_s32be_from(f.data, pos)[0]
+
+    @staticmethod
+    def read_u64be(f):
+        pos = f.pos
+        f.pos = pos + 8
+        return unpack_u64be_from(f.data, pos)[0]
+
+    @staticmethod
+    def read_s64be(f):
+        pos = f.pos
+        f.pos = pos + 8
+        return unpack_s64be_from(f.data, pos)[0]
+
+    @staticmethod
+    def read_double_be(f):
+        pos = f.pos
+        f.pos = pos + 8
+        return unpack_double_from(f.data, pos)[0]
+
+    @staticmethod
+    def read_fourcc_be(f):
+        pos = f.pos
+        f.pos = pos + 4
+        return bytes(f.data[pos:pos + 4])
@@ -993,8 +993,7 @@ class TrackerDataSlot(core.AVBObject):
         count = ctx.read_s32(f)
         self.tracker_data = AVBRefList.__new__(AVBRefList, root=self.root)
         for i in range(count):
-            ref = ctx.read_object_ref(self.root, f)
-            self.tracker_data.append(ref)
+            self.tracker_data.append(ctx.read_object_index(self.root, f))
 
         for tag in ctx.iter_ext(f):
             if tag == 0x01:
@@ -1047,8 +1046,7 @@ class TrackerParameterSlot(core.AVBObject):
         assert count >= 0
         self.params = AVBRefList.__new__(AVBRefList, root=self.root)
         for i in range(count):
-            ref = ctx.read_object_ref(self.root, f)
-            self.params.append(ref)
+            self.params.append(ctx.read_object_index(self.root, f))
 
         ctx.read_assert_tag(f, 0x03)
 
@@ -1097,8 +1095,7 @@ class TrackerData(core.AVBObject):
         count = ctx.read_s16(f)
         self.clips = AVBRefList.__new__(AVBRefList, root=self.root)
         for i in range(count):
-            ref = ctx.read_object_ref(self.root, f)
-            self.clips.append(ref)
+            self.clips.append(ctx.read_object_index(self.root, f))
 
         for tag in ctx.iter_ext(f):
             if tag == 0x01:
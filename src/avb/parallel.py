@@ -0,0 +1,164 @@
+from __future__ import (
+    unicode_literals,
+    absolute_import,
+    print_function,
+    division,
+    )
+
+import io
+import sys
+import pickle
+import multiprocessing
+from collections import OrderedDict
+
+from . import core
+from .core import sentinel, PropertyDataBase
+from .attributes import Attributes
+from .file import AVBFile
+
+# the objects that keep the file they belong to in a root slot
+ROOT_TYPES = (core.AVBObject, core.AVBRefList, Attributes)
+
+# each worker task decodes about this many bytes of chunk data
+DECODE_TASK_SIZE = 4 << 20
+
+def object_slots(cls):
+    for klass in cls.__mro__:
+        slots = getattr(klass, '__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots, )
+        for name in slots:
+            if name not in ('root', '__weakref__', '__dict__'):
+                yield name
+
+def new_object(cls, root):
+    return cls.__new__(cls, root=root)
+
+def set_object_state(obj, state):
+    slots, items = state
+    for name, value in slots:
+        object.__setattr__(obj, name, value)
+    # the base class methods, the overrides mark the object modified
+    if isinstance(obj, dict):
+        for key, value in items:
+            PropertyDataBase.__setitem__(obj, key, value)
+    elif isinstance(obj, list):
+        list.extend(obj, items)
+
+class ObjectPickler(pickle.Pickler):
+    """
+    Pickles decoded objects without the file they were read from, refs stay
+    AVBObjectRef indices and are resolved against the file they are loaded into.
+    """
+    def persistent_id(self, obj):
+        if isinstance(obj, AVBFile):
+            return 'root'
+        return None
+
+    def reducer_override(self, obj):
+        if not isinstance(obj, ROOT_TYPES):
+            if type(obj) is not dict and isinstance(obj, dict) and not isinstance(obj, OrderedDict):
+                # property data, the default reduce of the cython extension one drops the items
+                return type(obj), (), None, None, iter(dict.items(obj))
+            return NotImplemented
+
+        cls = type(obj)
+        slots = []
+        for name in object_slots(cls):
+            value = getattr(obj, name, sentinel)
+            if value is not sentinel:
+                slots.append((name, value))
+
+        items = None
+        if isinstance(obj, dict):
+            items = list(PropertyDataBase.items(obj))
+        elif isinstance(obj, list):
+            items = list(list.__iter__(obj))
+
+        return new_object, (cls, obj.root), (slots, items), None, None, set_object_state
+
+class ObjectUnpickler(pickle.Unpickler):
+    def __init__(self, f, root):
+        pickle.Unpickler.__init__(self, f)
+        self.root = root
+
+    def persistent_load(self, pid):
+        if pid == 'root':
+            return self.root
+        raise pickle.UnpicklingError("unknown persistent id %r" % (pid,))
+
+def dump_objects(objects):
+    f = io.BytesIO()
+    ObjectPickler(f, pickle.HIGHEST_PROTOCOL).dump(objects)
+    return f.getvalue()
+
+def load_objects(root, data):
+    return ObjectUnpickler(io.BytesIO(data), root).load()
+
+def decode_range(args):
+    """
+    Worker side of load_all, decodes objects start to end of the file at path.
+    """
+    path, start, end, use_ext = args
+    with AVBFile(path, mmap=True, use_ext=use_ext) as f:
+        objects = f.read_objects(range(start, end))
+        return dump_objects(objects)
+
+def split_range(root, tasks):
+    """
+    Splits the object indices of root into ranges of about the same chunk size.
+    """
+    positions = root.object_positions
+    count = root.object_count
+    end_pos = positions[count - 1] + root.sizes[count - 1] + 8
+    task_size = max((end_pos - positions[1]) // tasks, 1)
+
+    ranges = []
+    start = 1
+    while start < count:
+        end = start + 1
+        limit = positions[start] + task_size
+        while end < count and positions[end] < limit:
+            end += 1
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+def load_all(root, workers=None):
+    """
+    Decodes every object of root like AVBFile.load_all, splitting the index
+    range over a pool of worker processes that each decode their slice from
+    their own memory map of the file. The decoded objects come back pickled with
+    their refs as indices and are put in the object cache of root, objects
+    already alive in root are kept. Returns the same stats as AVBFile.load_all.
+    """
+    if (root.loaded_objects is not None or root.path is None or root.object_count <= 1 or
+            sys.version_info < (3, 8)):
+        # reducer_override is needed to pickle the objects without their file
+        return root.load_all()
+
+    workers = workers or multiprocessing.cpu_count()
+    positions = root.object_positions
+    tasks = max(workers * 4, (positions[-1] - positions[1]) // DECODE_TASK_SIZE)
+    ranges = split_range(root, tasks)
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        args = [(root.path, start, end, root.use_ext) for start, end in ranges]
+        loaded_objects = [None]
+        for (start, end), data in zip(ranges, pool.imap(decode_range, args)):
+            objects = load_objects(root, data)
+            for index, obj in zip(range(start, end), objects):
+                cached = root.object_cache.get(index, None)
+                if cached is not None:
+                    obj = cached
+                else:
+                    root.object_cache[index] = obj
+                loaded_objects.append(obj)
+    finally:
+        pool.terminate()
+        pool.join()
+
+    root.loaded_objects = loaded_objects
+    root.loaded_bytes = sum(root.sizes[1:])
+    return root.load_all()
@@ -5,6 +5,7 @@ from __future__ import (
     division,
     )
 import datetime
+from collections import namedtuple
 
 from . import core
 from .core import AVBPropertyDef, AVBRefList
@@ -26,6 +27,31 @@ TRACK_SESSION_ATTR_FLAG     = 1 << 9
 
 TRACK_UNKNOWN_FLAGS         = 0xFC00
 
+# bytes each optional Track field takes in a chunk
+TRACK_FLAG_SIZES = (
+    (TRACK_LABEL_FLAG,            2),
+    (TRACK_ATTRIBUTES_FLAG,       4),
+    (TRACK_SESSION_ATTR_FLAG,     4),
+    (TRACK_COMPONENT_FLAG,        4),
+    (TRACK_FILLER_PROXY_FLAG,     4),
+    (TRACK_BOB_DATA_FLAG,         4),
+    (TRACK_CONTROL_CODE_FLAG,     2),
+    (TRACK_CONTROL_SUB_CODE_FLAG, 2),
+    (TRACK_START_POS_FLAG,        4),
+    (TRACK_READ_ONLY_FLAG,        1),
+)
+
+TRACK_SIZES = {}
+
+def track_size(flags):
+    size = TRACK_SIZES.get(flags, None)
+    if size is None:
+        if flags & TRACK_UNKNOWN_FLAGS:
+            raise ValueError("Unknown Track Flag: %d" % flags)
+        size = sum(flag_size for flag, flag_size in TRACK_FLAG_SIZES if flags & flag)
+        TRACK_SIZES[flags] = size
+    return size
+
 @utils.register_helper_class
 class Track(core.AVBObject):
     propertydefs_dict = {}
@@ -166,6 +192,9 @@ class TrackGroup(Component):
             else:
                 raise ValueError("%s: unknown ext tag 0x%02X %d" % (str(self.class_id), tag,tag))
 
+        if self.class_id[:] == b'TRKG':
+            ctx.read_assert_tag(f, 0x03)
+
     def write(self, f):
         super(TrackGroup, self).write(f)
         ctx = self.root.octx
@@ -225,6 +254,9 @@ class TrackGroup(Component):
                 else:
                     ctx.write_s16(f, 0)
 
+        if self.class_id[:] == b'TRKG':
+            ctx.write_u8(f, 0x03)
+
 
 @utils.register_class
 class TrackEffect(TrackGroup):
@@ -1127,3 +1159,82 @@ class Composition(TrackGroup):
             return "SourceMob"
         else:
             raise ValueError("Unknown mob type id: %d" % self.mob_type_id)
+
+MobSummary = namedtuple('MobSummary', ['index', 'name', 'mob_type_id', 'usage_code',
+                                       'mob_id', 'last_modified', 'length'])
+
+def skip_string(ctx, f):
+    size = ctx.read_u16(f)
+    if size < 65535:
+        f.seek(size, 1)
+
+def read_composition_summary(root, f):
+    """
+    Reads the name, mob_type_id, usage_code, mob_id, last_modified and length
+    of a CMPO chunk, skipping over everything else Composition.read decodes.
+    Returns them as a tuple in that order.
+    """
+    ctx = root.ictx
+
+    # Component
+    ctx.read_assert_tag(f, 0x02)
+    ctx.read_assert_tag(f, 0x03)
+    # left_bob, right_bob, media_kind_id, edit_rate
+    f.seek(4 + 4 + 2 + 6, 1)
+    name = ctx.read_string(f) or None
+    skip_string(ctx, f)
+    # attributes, session_attrs, precomputed
+    f.seek(4 + 4 + 4, 1)
+
+    for tag in ctx.iter_ext(f):
+        if tag == 0x01:
+            ctx.read_assert_tag(f, 72)
+            f.seek(4, 1)
+        else:
+            raise ValueError("CMPO: unknown ext tag 0x%02X %d" % (tag, tag))
+
+    # TrackGroup
+    ctx.read_assert_tag(f, 0x02)
+    ctx.read_assert_tag(f, 0x08)
+    # mc_mode
+    f.seek(1, 1)
+    length = ctx.read_s32(f)
+    # num_scalars
+    f.seek(4, 1)
+
+    track_count = ctx.read_s32(f)
+    for i in range(track_count):
+        flags = ctx.read_u16(f)
+        f.seek(track_size(flags), 1)
+
+    for tag in ctx.iter_ext(f):
+        if tag == 0x01:
+            # lock_number, tag and int16 per track
+            f.seek(3 * track_count, 1)
+        else:
+            raise ValueError("CMPO: unknown ext tag 0x%02X %d" % (tag, tag))
+
+    # Composition
+    ctx.read_assert_tag(f, 0x02)
+    ctx.read_assert_tag(f, 0x02)
+    # mob_id_lo, mob_id_hi
+    f.seek(8, 1)
+    last_modified = ctx.read_datetime(f)
+    mob_type_id = ctx.read_u8(f)
+    usage_code = ctx.read_s32(f)
+    # descriptor
+    f.seek(4, 1)
+
+    mob_id = None
+    for tag in ctx.iter_ext(f):
+        if tag == 0x01:
+            ctx.read_assert_tag(f, 71)
+            f.seek(4, 1)
+        elif tag == 0x02:
+            mob_id = ctx.read_mob_id(f)
+        else:
+            raise ValueError("CMPO: unknown ext tag 0x%02X %d" % (tag, tag))
+
+    ctx.read_assert_tag(f, 0x03)
+
+    return name, mob_type_id, usage_code, mob_id, last_modified, length
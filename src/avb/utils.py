@@ -36,7 +36,7 @@ class AVBObjectRef(object):
 
     @property
     def valid(self):
-        if self.index >= len(self.root.object_positions):
+        if self.index >= self.root.object_count:
             return False
         return True
 
@@ -99,17 +99,71 @@ def generate_uid():
 
 AVBClaseID_dict = {}
 AVBClassName_dict = {}
-def register_class(classobj):
-    AVBClaseID_dict[classobj.class_id] = classobj
-    AVBClassName_dict[classobj.__name__] = classobj
-
+class AVBProperty(object):
+    """
+    Descriptor generated for each AVBPropertyDef by register_class, reading
+    and writing the property straight in property_data. For classes with a
+    class_id assignments mark the object modified, unless they come from
+    reading the object, helper objects are never tracked.
+    """
+    __slots__ = ('name', 'tracked')
+    def __init__(self, name, tracked=True):
+        self.name = name
+        self.tracked = tracked
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            return dict.__getitem__(obj.property_data, self.name)
+        except KeyError:
+            raise AttributeError("'%s' has no attribute '%s'" % (type(obj).__name__, self.name))
+
+    def __set__(self, obj, value):
+        obj.property_data[self.name] = value
+        if self.tracked:
+            root = obj.root
+            if not root.reading and hasattr(obj, 'instance_id'):
+                root.add_modified(obj)
+
+class AVBRefProperty(AVBProperty):
+    """
+    AVBProperty of a reference, returns the object an AVBObjectRef points to.
+    """
+    __slots__ = ()
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            value = dict.__getitem__(obj.property_data, self.name)
+        except KeyError:
+            raise AttributeError("'%s' has no attribute '%s'" % (type(obj).__name__, self.name))
+        if isinstance(value, AVBObjectRef):
+            return value.value
+        return value
+
+def register_properties(classobj):
+    tracked = bool(classobj.class_id)
     for pdef in classobj.propertydefs:
         classobj.propertydefs_dict[pdef.name] = pdef
+        # methods and properties the class defines keep precedence
+        attr = getattr(classobj, pdef.name, None)
+        if attr is not None and not isinstance(attr, AVBProperty):
+            continue
+        if isinstance(attr, AVBProperty) and attr.tracked == tracked:
+            continue
+        if pdef.type == 'reference':
+            setattr(classobj, pdef.name, AVBRefProperty(pdef.name, tracked))
+        else:
+            setattr(classobj, pdef.name, AVBProperty(pdef.name, tracked))
 
+def register_class(classobj):
+    AVBClaseID_dict[classobj.class_id] = classobj
+    AVBClassName_dict[classobj.__name__] = classobj
+    register_properties(classobj)
     return classobj
 
 def register_helper_class(classobj):
     AVBClassName_dict[classobj.__name__] = classobj
-    for pdef in classobj.propertydefs:
-        classobj.propertydefs_dict[pdef.name] = pdef
+    register_properties(classobj)
     return classobj
@@ -0,0 +1,31 @@
+from __future__ import (
+    unicode_literals,
+    absolute_import,
+    print_function,
+    division,
+    )
+
+import os
+import asyncio
+import unittest
+import avb
+import avb.aio
+
+test_file_01 = os.path.join(os.path.dirname(__file__), 'test_files', 'test_file_01.avb')
+
+class TestAIO(unittest.TestCase):
+
+    def test_aio(self):
+        async def read():
+            async with await avb.aio.open(test_file_01) as f:
+                obj = await f.read_object(10)
+                assert obj.instance_id == 10
+                mob_ids = [mob.mob_id async for mob in f.mobs(batch_size=7)]
+                class_ids = [obj.class_id async for obj in f.iter_class_ids([b'CMPO'], batch_size=3)]
+                return mob_ids, class_ids
+
+        mob_ids, class_ids = asyncio.run(read())
+        with avb.open(test_file_01) as f:
+            assert mob_ids == [mob.mob_id for mob in f.content.mobs]
+            assert class_ids == [obj.class_id for obj in f.iter_class_ids([b'CMPO'])]
+            assert len(class_ids) == len(f.class_index[b'CMPO'])
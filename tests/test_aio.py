@@ -0,0 +1,16 @@
+from __future__ import (
+    unicode_literals,
+    absolute_import,
+    print_function,
+    division,
+    )
+
+import sys
+import unittest
+
+# the cases use async syntax and asyncio.run, keep them out of older pythons
+if sys.version_info >= (3, 7):
+    from aio_cases import TestAIO
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,6 +13,11 @@ import avb
 import avb.utils
 import glob
 
+try:
+    from avb._ext import READERS, BE_READERS
+except ImportError:
+    READERS = None
+
 def iter_chunks(chunk_type):
     chunk_dir = os.path.join(os.path.dirname(__file__), 'chunks', chunk_type, '*.chunk')
 
@@ -60,6 +65,23 @@ def read_write_chunk(path):
             print(binascii.hexlify(write_data))
             raise
 
+        try:
+            m.ictx = avb.ioctx.AVBBufferIOContext()
+            object_instance_buf = obj_class.__new__(obj_class, root=m)
+            r = avb.ioctx.AVBBufferReader(chunk_data)
+            object_instance_buf.read(r)
+            assert r.tell() == len(chunk_data)
+
+            r = io.BytesIO()
+            object_instance_buf.write(r)
+            assert r.getvalue() == chunk_data
+        except:
+            print('buffer read error:')
+            print(path)
+            print(chunk.class_id)
+            print(chunk.hex())
+            raise
+
         write_data_le = b''
         write_data_be = b''
 
@@ -89,9 +111,74 @@ def read_write_chunk(path):
             print(binascii.hexlify(write_data_le))
             raise
 
+def fast_read_write_chunk(path):
+
+    with io.open(path, 'rb') as f:
+        m = MockFile(f)
+        chunk = avb.file.read_chunk(m, f)
+        obj_class = avb.utils.AVBClaseID_dict.get(chunk.class_id, None)
+        chunk_data = chunk.read()
+
+        object_instance = obj_class.__new__(obj_class, root=m)
+        READERS[chunk.class_id](m, object_instance, chunk_data)
+
+        # keys must come out in the same order as the python reader,
+        # the extension's plain dicts only keep it where dicts are ordered
+        if avb.core.PropertyDataBase is dict and hasattr(object_instance, 'property_data'):
+            object_instance_py = obj_class.__new__(obj_class, root=m)
+            object_instance_py.read(io.BytesIO(chunk_data))
+            assert list(object_instance.property_data) == list(object_instance_py.property_data)
+
+        r = io.BytesIO()
+        object_instance.write(r)
+        write_data = r.getvalue()
+        if write_data != chunk_data:
+            print('fast reader error:')
+            print(path)
+            print(chunk.class_id)
+            print(binascii.hexlify(chunk_data))
+            print()
+            print(binascii.hexlify(write_data))
+        assert write_data == chunk_data
+
+        m.octx = avb.ioctx.AVBIOContext('big')
+        r = io.BytesIO()
+        object_instance.write(r)
+        write_data_be = r.getvalue()
+
+        m.ictx = m.octx
+        m.octx = avb.ioctx.AVBIOContext('little')
+        object_instance_be = obj_class.__new__(obj_class, root=m)
+        BE_READERS[chunk.class_id](m, object_instance_be, write_data_be)
+
+        r = io.BytesIO()
+        object_instance_be.write(r)
+        write_data_le = r.getvalue()
+        if write_data_le != chunk_data:
+            print('fast reader BE/LE error:')
+            print(path)
+            print(chunk.class_id)
+            print(binascii.hexlify(chunk_data))
+            print()
+            print(binascii.hexlify(write_data_le))
+        assert write_data_le == chunk_data
+
 
 class TestChuckDB(unittest.TestCase):
 
+    @unittest.skipIf(READERS is None, "requires cython extension")
+    def test_fast_readers(self):
+        self.assertEqual(set(READERS), set(avb.utils.AVBClaseID_dict))
+        for class_id in sorted(READERS):
+            if class_id == b'ATTR':
+                continue
+            for chunk_path in iter_chunks(class_id.decode('ascii')):
+                fast_read_write_chunk(chunk_path)
+
+    def test_abob_chunks(self):
+        for chunk_path in iter_chunks("ABOB"):
+            read_write_chunk(chunk_path)
+
     def test_aifc_chunks(self):
         for chunk_path in iter_chunks("AIFC"):
             read_write_chunk(chunk_path)
@@ -100,10 +187,18 @@ class TestChuckDB(unittest.TestCase):
         for chunk_path in iter_chunks("ANCD"):
             read_write_chunk(chunk_path)
 
+    def test_apos_chunks(self):
+        for chunk_path in iter_chunks("APOS"):
+            read_write_chunk(chunk_path)
+
     def test_aspi_chunks(self):
         for chunk_path in iter_chunks("ASPI"):
             read_write_chunk(chunk_path)
 
+    def test_avup_chunks(self):
+        for chunk_path in iter_chunks("AVUP"):
+            read_write_chunk(chunk_path)
+
     def test_binf_chunks(self):
         for chunk_path in iter_chunks("BINF"):
             read_write_chunk(chunk_path)
@@ -128,6 +223,10 @@ class TestChuckDB(unittest.TestCase):
         for chunk_path in iter_chunks("CTRL"):
             read_write_chunk(chunk_path)
 
+    def test_datd_chunks(self):
+        for chunk_path in iter_chunks("DATD"):
+            read_write_chunk(chunk_path)
+
     def test_didp_chunks(self):
         for chunk_path in iter_chunks("DIDP"):
             read_write_chunk(chunk_path)
@@ -240,6 +339,10 @@ class TestChuckDB(unittest.TestCase):
         for chunk_path in iter_chunks("TKDS"):
             read_write_chunk(chunk_path)
 
+    def test_tkmn_chunks(self):
+        for chunk_path in iter_chunks("TKMN"):
+            read_write_chunk(chunk_path)
+
     def test_tkpa_chunks(self):
         for chunk_path in iter_chunks("TKPA"):
             read_write_chunk(chunk_path)
@@ -252,10 +355,18 @@ class TestChuckDB(unittest.TestCase):
         for chunk_path in iter_chunks("TMBC"):
             read_write_chunk(chunk_path)
 
+    def test_tmcs_chunks(self):
+        for chunk_path in iter_chunks("TMCS"):
+            read_write_chunk(chunk_path)
+
     def test_tnfx_chunks(self):
         for chunk_path in iter_chunks("TNFX"):
             read_write_chunk(chunk_path)
 
+    def test_trkg_chunks(self):
+        for chunk_path in iter_chunks("TRKG"):
+            read_write_chunk(chunk_path)
+
     def test_urll_chunks(self):
         for chunk_path in iter_chunks("URLL"):
             read_write_chunk(chunk_path)
@@ -5,6 +5,7 @@ from __future__ import (
     division,
     )
 import os
+import sys
 import unittest
 import avb
 
@@ -188,6 +189,59 @@ class TestCreate(unittest.TestCase):
 
             f.write(result_file)
 
+    def test_create_nested_sequences(self):
+        result_file = os.path.join(result_dir, 'nested_sequences.avb')
+        depth = sys.getrecursionlimit() + 100
+        with avb.open() as f:
+            edit_rate = 25
+            comp = f.create.Composition(mob_type="CompositionMob")
+            track = f.create.Track()
+            track.index = 1
+
+            component = f.create.Filler(edit_rate=edit_rate, media_kind='picture')
+            for i in range(depth):
+                sequence = f.create.Sequence(edit_rate=edit_rate, media_kind='picture')
+                sequence.components.append(component)
+                component = sequence
+
+            track.component = component
+            comp.tracks.append(track)
+            f.content.add_mob(comp)
+            f.write(result_file)
+
+        with avb.open(result_file) as f:
+            objects = list(avb.core.walk_references(f.content))
+            class_ids = [obj.class_id for obj in objects]
+            assert class_ids.index(b'FILL') < class_ids.index(b'SEQU')
+            assert len([obj for obj in objects if obj.class_id == b'SEQU']) == depth
+
+    def test_property_access(self):
+        with avb.open() as f:
+            clip = f.create.SourceClip(edit_rate=25, media_kind='picture')
+            clip.track_id = 3
+            assert clip.track_id == 3
+            assert dict.__getitem__(clip.property_data, 'track_id') == 3
+            assert clip.media_kind == 'picture'
+            assert isinstance(type(clip).track_id, avb.utils.AVBProperty)
+
+            clip.attributes['test'] = 1
+            assert clip.attributes['test'] == 1
+            with self.assertRaises(AttributeError):
+                clip.param_list
+            assert getattr(clip, 'param_list', None) is None
+
+            del f.modified_objects[clip.instance_id]
+            f.reading = True
+            clip.length = 10
+            f.reading = False
+            assert clip.instance_id not in f.modified_objects
+            clip.length = 20
+            assert f.modified_objects[clip.instance_id] is clip
+
+            track = f.create.Track()
+            track.index = 1
+            assert type(track).index.tracked is False
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,7 +4,14 @@ from __future__ import (
     print_function,
     division,
     )
+import io
 import os
+import gzip
+import shutil
+import tempfile
+import threading
+import random
+import sys
 import unittest
 import avb
 
@@ -29,6 +36,321 @@ class TestRead(unittest.TestCase):
                     item = f.read_object(i)
                     # print(item)
 
+    def test_read_mmap(self):
+        with avb.open(test_file_01) as a:
+            with avb.open(test_file_01, mmap=True) as b:
+                for i, chunk in enumerate(b.chunks()):
+                    assert bytes(chunk.read()) == a.read_chunk(i).read()
+
+                    if chunk.class_id in avb.utils.AVBClaseID_dict:
+                        item = b.read_object(i)
+
+                for mob in b.content.mobs:
+                    pass
+
+    def test_lazy_index(self):
+        with avb.open(test_file_01) as a:
+            with avb.open(test_file_01) as b:
+                # opening doesn't scan any object headers
+                assert len(b.positions) == 1
+
+                chunk = b.read_chunk(10)
+                assert len(b.positions) == 11
+                assert chunk.read() == a.read_chunk(10).read()
+
+                assert list(b.object_positions) == list(a.object_positions)
+                assert len(b.object_positions) == b.num_objects + 1
+
+                with self.assertRaises(IndexError):
+                    b.read_chunk(b.num_objects + 1)
+
+    def test_scan_headers(self):
+        with avb.open(test_file_01) as f:
+            positions = list(f.object_positions)
+            sizes = list(f.sizes)
+            class_ids = bytes(f.class_ids)
+
+        with avb.open(test_file_01, use_ext=False) as f:
+            assert f.scan_headers is avb.file.scan_headers
+            assert list(f.object_positions) == positions
+            assert list(f.sizes) == sizes
+            assert bytes(f.class_ids) == class_ids
+
+            for i in (1, 10, f.num_objects):
+                chunk = f.read_chunk(i)
+                assert chunk.class_id == f.object_class_id(i)
+                assert chunk.size == sizes[i]
+
+    def test_class_index(self):
+        with avb.open(test_file_01) as f:
+            expected = {}
+            for i, chunk in enumerate(f.chunks()):
+                if i:
+                    expected[chunk.class_id] = expected.get(chunk.class_id, 0) + 1
+
+            assert f.count_class_ids() == expected
+
+            class_ids = [b'SCLP', b'CMPO']
+            objects = list(f.iter_class_ids(class_ids))
+            assert len(objects) == expected[b'SCLP'] + expected[b'CMPO']
+            for obj in objects:
+                assert obj.class_id in class_ids
+
+            assert list(f.iter_class_ids([b'NONE'])) == []
+
+    def test_lru_cache(self):
+        with avb.open(test_file_01, cache_size=2) as f:
+            mob_ids = [f.read_object(i).mob_id for i in f.class_index[b'CMPO'][:3]]
+            stats = f.cache_stats()
+            assert stats['misses'] == 3
+            assert stats['evictions'] == 1
+            assert stats['size'] == 2
+
+            # still alive through the lru cache
+            index = f.class_index[b'CMPO'][2]
+            assert f.read_object(index).mob_id == mob_ids[2]
+            assert f.cache_stats()['hits'] == 1
+
+        with avb.open(test_file_01, cache_bytes=1) as f:
+            for i in range(1, 20):
+                f.read_object(i)
+            # every object is over budget on its own
+            assert f.cache_stats()['size'] == 0
+            assert f.cache_stats()['bytes'] == 0
+
+        # objects created in memory have no chunk size in the file
+        for fileobject in (test_file_01, None):
+            with avb.open(fileobject, cache_size=2, cache_bytes=1 << 20) as f:
+                mob = f.create.Composition(mob_type="CompositionMob")
+                assert f.read_object(mob.instance_id) is mob
+                f.content.add_mob(mob)
+                f.write(io.BytesIO())
+
+    def test_read_objects(self):
+        indices = [0, 40, 12, 11, 10, 11, 300, 13]
+        with avb.open(test_file_01) as a:
+            for mmap in (False, True):
+                with avb.open(test_file_01, mmap=mmap) as b:
+                    objects = b.read_objects(indices)
+                    assert objects[0] is None
+                    assert objects[3] is objects[5]
+                    assert b.cache_stats()['misses'] == 6
+                    for index, obj in zip(indices[1:], objects[1:]):
+                        assert obj.instance_id == index
+                        assert obj.class_id == a.read_object(index).class_id
+                        assert b.read_object(index) is obj
+
+                    mob_ids = [mob.mob_id for mob in a.content.mobs]
+                    assert [mob.mob_id for mob in b.content.mobs] == mob_ids
+
+    def test_load_all(self):
+        with avb.open(test_file_01) as a:
+            with avb.open(test_file_01, eager=True) as b:
+                stats = b.cache_stats()
+                assert stats['loaded'] == b.num_objects
+                assert stats['loaded_bytes'] == sum(b.sizes[1:])
+                assert stats['misses'] == b.num_objects
+
+                mob_ids = [mob.mob_id for mob in a.content.mobs]
+                assert [mob.mob_id for mob in b.content.mobs] == mob_ids
+                # every ref resolves from the loaded objects
+                assert b.cache_stats()['misses'] == b.num_objects
+                assert b.load_all()['objects'] == b.num_objects
+
+    def test_load_all_workers(self):
+        with avb.open(test_file_01) as a:
+            with avb.open(test_file_01) as b:
+                assert b.load_all(workers=2)['objects'] == b.num_objects
+                if sys.version_info >= (3, 8):
+                    # older pythons load serially, see parallel.load_all
+                    assert b.cache_stats()['misses'] == 0
+
+                for i in range(1, b.object_count):
+                    obj = b.loaded_objects[i]
+                    assert obj.instance_id == i
+                    assert obj.root is b
+                    assert obj.class_id == a.read_object(i).class_id
+
+                mobs = [(mob.mob_id, mob.name, len(mob.tracks)) for mob in a.content.mobs]
+                assert [(mob.mob_id, mob.name, len(mob.tracks)) for mob in b.content.mobs] == mobs
+                assert not b.modified_objects
+
+    def test_concurrent_reads(self):
+        with avb.open(test_file_01) as a:
+            expected = [a.read_chunk(i).read() for i in range(a.object_count)]
+            mob_ids = [mob.mob_id for mob in a.content.mobs]
+
+        # switch threads as often as possible, python 2 counts bytecodes instead
+        if hasattr(sys, 'getswitchinterval'):
+            switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(1e-6)
+        else:
+            switch_interval = sys.getcheckinterval()
+            sys.setcheckinterval(1)
+        try:
+            with avb.open(test_file_01) as f:
+                errors = []
+                objects = [{} for i in range(4)]
+
+                def reader(n):
+                    try:
+                        indices = list(range(1, f.object_count))
+                        random.Random(n).shuffle(indices)
+                        for i in indices:
+                            assert f.read_chunk(i).read() == expected[i]
+                            obj = f.read_object(i)
+                            assert obj.instance_id == i
+                            objects[n][i] = obj
+                        assert [mob.mob_id for mob in f.content.mobs] == mob_ids
+                    except Exception as e:
+                        errors.append(e)
+
+                threads = [threading.Thread(target=reader, args=(n,)) for n in range(4)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+
+                assert not errors, errors
+                assert not f.modified_objects
+                # every thread got the same instance for every object
+                for i in range(1, f.object_count):
+                    assert len(set(id(obj[i]) for obj in objects)) == 1
+        finally:
+            if hasattr(sys, 'setswitchinterval'):
+                sys.setswitchinterval(switch_interval)
+            else:
+                sys.setcheckinterval(switch_interval)
+
+    def test_read_gzip(self):
+        with avb.open(test_file_01) as a:
+            mob_ids = [mob.mob_id for mob in a.content.mobs]
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            gz_file = os.path.join(tmp_dir, 'test_file_01.avb.gz')
+            with open(test_file_01, 'rb') as src:
+                with gzip.open(gz_file, 'wb') as gz:
+                    shutil.copyfileobj(src, gz)
+
+            # the fd of a GzipFile is the compressed file's
+            with avb.open(gzip.open(gz_file, 'rb')) as f:
+                assert f.fd is None
+                assert [mob.mob_id for mob in f.content.mobs] == mob_ids
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_ref_list(self):
+        for use_ext in (True, False):
+            with avb.open(test_file_01, use_ext=use_ext) as f:
+                sequences = list(f.iter_class_ids([b'SEQU']))
+                assert sequences
+                for sequence in sequences:
+                    components = sequence.components
+                    # indices as read from the file
+                    assert all(type(value) is int for value in list.__iter__(components))
+
+                    objects = list(components)
+                    assert [obj.instance_id for obj in objects] == list(list.__iter__(components))
+                    assert components.resolve() == objects
+                    assert components[1:] == objects[1:]
+                    assert components[-1] is objects[-1]
+
+    def test_lazy_decode(self):
+        def decoded(obj):
+            try:
+                object.__getattribute__(obj, 'property_data')
+            except AttributeError:
+                return False
+            return True
+
+        with avb.open(test_file_01) as a:
+            with avb.open(test_file_01, lazy=True) as b:
+                index = b.class_index[b'CMPO'][0]
+                mob = b.read_object(index)
+                assert not decoded(mob)
+                assert mob.mob_id == a.read_object(index).mob_id
+                assert decoded(mob)
+
+                mobs = [(mob.mob_id, mob.name, len(mob.tracks)) for mob in a.content.mobs]
+                assert [(mob.mob_id, mob.name, len(mob.tracks)) for mob in b.content.mobs] == mobs
+
+                sequence = b.read_object(b.class_index[b'SEQU'][0])
+                sequence.name = "lazy"
+                assert decoded(sequence)
+                assert b.modified_objects[sequence.instance_id] is sequence
+                a.read_object(sequence.instance_id).name = "lazy"
+
+                tmp_dir = tempfile.mkdtemp()
+                try:
+                    a_file = os.path.join(tmp_dir, 'a.avb')
+                    b_file = os.path.join(tmp_dir, 'b.avb')
+                    for passthrough in (False, True):
+                        a.write(a_file, passthrough=False)
+                        b.write(b_file, passthrough=passthrough)
+                        with open(a_file, 'rb') as fa:
+                            with open(b_file, 'rb') as fb:
+                                assert fa.read() == fb.read()
+                finally:
+                    shutil.rmtree(tmp_dir)
+
+    def test_mob_summaries(self):
+        def summarize(mob):
+            return (mob.instance_id, mob.name, mob.mob_type_id, mob.usage_code,
+                    mob.mob_id, mob.last_modified, mob.length)
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            big_file = os.path.join(tmp_dir, 'big.avb')
+            with avb.open(test_file_01) as a:
+                a.write(big_file, byte_order='big')
+
+            for path in (test_file_01, big_file):
+                with avb.open(path) as a:
+                    expected = [summarize(mob) for mob in a.iter_class_ids([b'CMPO'])]
+                    assert len(expected) == len(a.class_index[b'CMPO'])
+
+                for use_ext in (True, False):
+                    with avb.open(path, use_ext=use_ext) as b:
+                        summaries = b.mob_summaries()
+                        assert [tuple(s) for s in summaries] == expected
+                        assert summaries[0].name == expected[0][1]
+                        # summaries are read without creating objects
+                        assert b.cache_stats()['misses'] == 0
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_index_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            with avb.open(test_file_01) as a:
+                expected_positions = list(a.object_positions)
+                expected_class_ids = [chunk.class_id for chunk in a.chunks()]
+
+            # cold open writes the sidecar, warm open reads it
+            for i in range(2):
+                with avb.open(test_file_01, index_cache=cache_dir) as b:
+                    assert len(os.listdir(cache_dir)) == 1
+                    assert len(b.positions) == b.num_objects + 1
+                    assert list(b.positions) == expected_positions
+                    class_ids = [b.object_class_id(i) for i in range(b.object_count)]
+                    assert class_ids == expected_class_ids
+                    for mob in b.content.mobs:
+                        pass
+
+            # a stale sidecar is ignored and rewritten
+            cache_path = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+            with open(cache_path, 'r+b') as f:
+                f.seek(16)
+                f.write(b'\xff' * 8)
+
+            with avb.open(test_file_01, index_cache=cache_dir) as b:
+                assert list(b.positions) == expected_positions
+                key = b.index_cache_key()
+                assert avb.file.read_index_cache(cache_path, os.path.abspath(test_file_01), key)
+        finally:
+            shutil.rmtree(cache_dir)
+
 
 if __name__ == "__main__":
     unittest.main()
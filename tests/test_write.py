@@ -5,11 +5,15 @@ from __future__ import (
     division,
     )
 import os
+import io
+import gzip
+import uuid
 import unittest
 import avb
 
 import avb.utils
 from avb.ioctx import AVBIOContext
+from avb.file import WRITERS
 
 test_file_01 = os.path.join(os.path.dirname(__file__), 'test_files', 'test_file_01.avb')
 
@@ -72,7 +76,7 @@ class TestWrite(unittest.TestCase):
 
         result_file = os.path.join(result_dir, 'rewrite_all.avb')
         with avb.open(test_file_01) as f:
-            f.write(result_file)
+            f.write(result_file, passthrough=False)
 
         with avb.open(test_file_01, use_ext=False) as a:
             with avb.open(result_file, use_ext=False) as b:
@@ -82,12 +86,220 @@ class TestWrite(unittest.TestCase):
 
         result_file = os.path.join(result_dir, 'rewrite_be.avb')
         with avb.open(test_file_01) as f:
-            f.write(result_file, byte_order='big')
+            f.write(result_file, byte_order='big', passthrough=False)
+
+        with avb.open(test_file_01, use_ext=False) as a:
+            with avb.open(result_file, use_ext=False) as b:
+                compare(a.content, b.content)
+
+    def test_rewrite_from_be(self):
+        be_file = os.path.join(result_dir, 'rewrite_from_be_src.avb')
+        result_file = os.path.join(result_dir, 'rewrite_from_be.avb')
+        with avb.open(test_file_01) as f:
+            f.write(be_file, byte_order='big', passthrough=False)
+
+        # read back the big endian file using the fast readers if available
+        with avb.open(be_file) as f:
+            f.write(result_file, passthrough=False)
 
         with avb.open(test_file_01, use_ext=False) as a:
             with avb.open(result_file, use_ext=False) as b:
                 compare(a.content, b.content)
 
+    @unittest.skipIf(not WRITERS, "requires cython extension")
+    def test_fast_writers(self):
+        for byte_order in ('little', 'big'):
+            results = []
+            for use_ext in (True, False):
+                result_file = os.path.join(result_dir, 'fast_writers_%s_%d.avb' % (byte_order, use_ext))
+                with avb.open(test_file_01) as f:
+                    f.use_ext = use_ext
+                    f.write(result_file, byte_order=byte_order, passthrough=False)
+
+                with open(result_file, 'rb') as f:
+                    results.append(f.read())
+
+            assert results[0] == results[1]
+
+    def test_incremental_write(self):
+        src_file = os.path.join(result_dir, 'incremental_src.avb')
+        full_file = os.path.join(result_dir, 'incremental_full.avb')
+        result_file = os.path.join(result_dir, 'incremental.avb')
+
+        with avb.open(test_file_01) as f:
+            f.write(src_file)
+
+        with avb.open(src_file) as f:
+            for mob in f.content.mobs:
+                if mob.name:
+                    mob.name = mob.name + " renamed"
+                    break
+
+            f.write(full_file, passthrough=False)
+            with open(full_file, 'rb') as a:
+                full_data = a.read()
+
+            for incremental in (False, True):
+                f.write(result_file, incremental=incremental)
+                assert f.copied_chunks > 0
+                with open(result_file, 'rb') as b:
+                    assert b.read() == full_data
+
+    def test_passthrough_in_place_edits(self):
+        result_file = os.path.join(result_dir, 'passthrough_in_place.avb')
+
+        with avb.open(test_file_01) as f:
+            clip = f.read_object(f.class_index[b'SCLP'][0])
+            material = uuid.UUID(int=clip.mob_id.material.int ^ 1)
+            clip.mob_id.material = material
+            graphic = f.read_object(f.class_index[b'GRFX'][0])
+            graphic.pict_data[0] ^= 0xFF
+            pict_data = bytearray(graphic.pict_data)
+            clip_index = clip.instance_id
+            graphic_index = graphic.instance_id
+
+            # changed in place, nothing marks them modified
+            assert not f.modified_objects
+            f.write(result_file)
+
+        with avb.open(test_file_01) as a:
+            a_clip = a.read_object(clip_index)
+            a_graphic = a.read_object(graphic_index)
+            with avb.open(result_file) as b:
+                # written objects are renumbered, find them by their other properties
+                clips = [c for c in b.iter_class_ids([b'SCLP']) if c.mob_id.material == material]
+                assert len(clips) == 1
+                assert clips[0].start_time == a_clip.start_time
+                graphics = [g for g in b.iter_class_ids([b'GRFX']) if g.pict_data == pict_data]
+                assert len(graphics) == 1
+                assert a_graphic.pict_data != pict_data
+
+    def test_passthrough_copy_file_range(self):
+        src_file = os.path.join(result_dir, 'passthrough_src.avb')
+        full_file = os.path.join(result_dir, 'passthrough_full.avb')
+        result_file = os.path.join(result_dir, 'passthrough.avb')
+
+        with avb.open(test_file_01) as f:
+            f.write(src_file)
+
+        copy_size = avb.file.COPY_FILE_RANGE_SIZE
+        try:
+            # copy every run of unchanged chunks in the kernel
+            avb.file.COPY_FILE_RANGE_SIZE = 0
+            with avb.open(src_file) as f:
+                for mob in f.content.mobs:
+                    mob.name = "passthrough"
+                    break
+                f.write(full_file, passthrough=False)
+                f.write(result_file)
+        finally:
+            avb.file.COPY_FILE_RANGE_SIZE = copy_size
+
+        with open(full_file, 'rb') as a:
+            with open(result_file, 'rb') as b:
+                assert a.read() == b.read()
+
+    def test_passthrough_from_gzip(self):
+        src_file = os.path.join(result_dir, 'passthrough_gzip_src.avb')
+        gz_file = os.path.join(result_dir, 'passthrough_gzip_src.avb.gz')
+        full_file = os.path.join(result_dir, 'passthrough_gzip_full.avb')
+        result_file = os.path.join(result_dir, 'passthrough_gzip.avb')
+
+        with avb.open(test_file_01) as f:
+            f.write(src_file, passthrough=False)
+        with open(src_file, 'rb') as src:
+            data = src.read()
+        with gzip.open(gz_file, 'wb') as gz:
+            gz.write(data)
+
+        with avb.open(src_file) as f:
+            f.write(full_file, passthrough=False)
+
+        copy_size = avb.file.COPY_FILE_RANGE_SIZE
+        try:
+            # the fd of a GzipFile is the compressed file's, it can't be copied from
+            avb.file.COPY_FILE_RANGE_SIZE = 0
+            with avb.open(gzip.open(gz_file, 'rb')) as f:
+                f.write(result_file)
+                assert f.copied_chunks > 0
+        finally:
+            avb.file.COPY_FILE_RANGE_SIZE = copy_size
+
+        with open(full_file, 'rb') as a:
+            with open(result_file, 'rb') as b:
+                assert a.read() == b.read()
+
+    def test_write_stream(self):
+        src_file = os.path.join(result_dir, 'stream_src.avb')
+        result_file = os.path.join(result_dir, 'stream.avb.gz')
+
+        class WriteOnly(object):
+            def __init__(self):
+                self.data = bytearray()
+            def write(self, data):
+                self.data.extend(data)
+
+        with avb.open(test_file_01) as f:
+            f.write(src_file)
+
+        with avb.open(src_file) as f:
+            for mob in f.content.mobs:
+                mob.name = "stream"
+                break
+            f.write(src_file + '.full', passthrough=False)
+
+            buf = io.BytesIO()
+            f.write(buf)
+            out = WriteOnly()
+            f.write_stream(out, passthrough=False)
+            with gzip.open(result_file, 'wb') as gz:
+                f.write(gz)
+
+        with open(src_file + '.full', 'rb') as a:
+            data = a.read()
+        assert buf.getvalue() == data
+        assert bytes(out.data) == data
+        with gzip.open(result_file, 'rb') as gz:
+            assert gz.read() == data
+
+    def test_write_workers(self):
+        full_file = os.path.join(result_dir, 'workers_full.avb')
+        result_file = os.path.join(result_dir, 'workers.avb')
+
+        batch_size = avb.file.WRITE_BATCH_SIZE
+        try:
+            avb.file.WRITE_BATCH_SIZE = 16
+            for passthrough in (False, True):
+                with avb.open(test_file_01) as f:
+                    for mob in f.content.mobs:
+                        mob.name = "workers"
+                        break
+                    f.write(full_file, passthrough=False)
+                    f.write(result_file, passthrough=passthrough, workers=2)
+
+                with open(full_file, 'rb') as a:
+                    with open(result_file, 'rb') as b:
+                        assert a.read() == b.read()
+        finally:
+            avb.file.WRITE_BATCH_SIZE = batch_size
+
+        # a file created in memory has no path to reopen in the workers
+        with avb.open() as f:
+            for i in range(3):
+                mob = f.create.Composition(mob_type="CompositionMob")
+                mob.name = "workers %d" % i
+                f.content.add_mob(mob)
+            f.write(full_file)
+            f.write(result_file, workers=2)
+            buf = io.BytesIO()
+            f.write(buf, workers=2)
+
+        with open(full_file, 'rb') as a:
+            with open(result_file, 'rb') as b:
+                data = a.read()
+                assert data == b.read()
+                assert data == buf.getvalue()
+
     def test_rewrite(self):
         result_file = os.path.join(result_dir, 'rewrite.avb')
 
@@ -145,6 +357,22 @@ class TestWrite(unittest.TestCase):
                 assert mob.name == u"Cow"
                 assert mob.attributes['Test'] == 5
 
+    def test_modify_attributes_update(self):
+        result_file = os.path.join(result_dir, 'modifed_update.avb')
+        with avb.open(test_file_01) as f:
+            attrs = f.content.attributes
+            key = list(attrs.keys())[0]
+            assert attrs[key] != 12345
+            attrs.update({key: 12345})
+            attrs.setdefault('Test Default', 5)
+            assert attrs.instance_id in f.modified_objects
+            f.write(result_file)
+
+        with avb.open(result_file) as f:
+            attrs = f.content.attributes
+            assert attrs[key] == 12345
+            assert attrs['Test Default'] == 5
+
 
 if __name__ == "__main__":
     unittest.main()